@@ -0,0 +1,403 @@
+"""Load test for the API: boots main.app in-process on a seeded SQLite database.
+
+Every run creates a fresh database under --workdir, fills it with the synthetic
+dataset of migrations/seed.py (a tenth of its default sizes), then drives a
+weighted mix of scenarios from --concurrency closed-loop clients. Latency
+percentiles, throughput and DB queries/time per request (read from the
+Server-Timing header of utils/query_stats.py) are reported per scenario
+and can be written to JSON and compared with an earlier run. Run from the
+repository root:
+
+    python -m benchmarks.api_load --duration 20 --concurrency 16 --json before.json
+    python -m benchmarks.api_load --duration 20 --concurrency 16 --compare before.json
+    python -m benchmarks.api_load --mix events_user=1 --scale 1 --size users=100000
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MIX = {
+    "login": 1,
+    "events_superadmin": 2,
+    "events_admin": 2,
+    "events_user": 6,
+    "surveys_user": 3,
+    "answer_submit": 2,
+    "csv_import": 0.2,
+    "image_upload": 0.5,
+}
+PASSWORD = "bench-password"
+
+_SERVER_TIMING = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries')
+
+
+def _parse_mix(value: str) -> dict:
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - set(DEFAULT_MIX)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+    return mix
+
+
+def _parse_sizes(value: str) -> dict:
+    sizes = {}
+    for item in value.split(","):
+        name, _, count = item.partition("=")
+        sizes[name.strip().replace("-", "_")] = int(count)
+    return sizes
+
+
+def _configure_environment(args):
+    """Point every store at the work directory before any app module is imported."""
+    os.makedirs(args.workdir, exist_ok=True)
+    os.environ.update({
+        "DB_BACKEND": "sqlite",
+        "DB_AUTO_MIGRATE": "true",
+        "QUERY_STATS_ENABLED": "true",
+        "QUERY_STATS_HEADERS": "true",
+        "SQLITE_PATH": os.path.join(args.workdir, "app.sqlite3"),
+        "JOBS_DB_PATH": os.path.join(args.workdir, "jobs.sqlite3"),
+        "JOBS_UPLOAD_DIR": os.path.join(args.workdir, "job_uploads"),
+        "TOKEN_BLACKLIST_PATH": os.path.join(args.workdir, "token_blacklist.sqlite3"),
+        "DB_POOL_MAX_SIZE": str(max(args.concurrency, 10)),
+    })
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    # Uploaded images land in ./uploads, so keep them out of the checkout.
+    os.chdir(args.workdir)
+
+
+def seed(args) -> dict:
+    """Generate the dataset the scenarios run against (see migrations/seed.py)."""
+    from migrations.seed import DEFAULTS, Sizes, generate
+
+    unknown = set(args.size) - set(DEFAULTS)
+    if unknown:
+        raise SystemExit(f"unknown dataset size(s): {', '.join(sorted(unknown))}")
+    sizes = Sizes().scaled(args.scale)
+    for name, value in args.size.items():
+        setattr(sizes, name, value)
+    return generate(sizes, seed=args.seed, skew=args.skew, password=PASSWORD, log=lambda line: None)
+
+
+class Context:
+    def __init__(self, client, data: dict, rng: random.Random):
+        self.client = client
+        self.data = data
+        self.rng = rng
+        self.tokens = {}
+        self.sequence = 0
+
+    async def login(self, username: str) -> str:
+        response = await self.client.post("/api/v1/login", json={"username": username, "password": PASSWORD})
+        response.raise_for_status()
+        return response.json()["data"]["authorization"]["token"]
+
+    def auth(self, role: str) -> dict:
+        return {"Authorization": f"Bearer {self.tokens[role]}"}
+
+    def next_id(self) -> int:
+        self.sequence += 1
+        return self.sequence
+
+
+async def _login(ctx):
+    username = ctx.rng.choice(ctx.data["usernames"])
+    return await ctx.client.post("/api/v1/login", json={"username": username, "password": PASSWORD})
+
+
+async def _events_superadmin(ctx):
+    return await ctx.client.get("/api/v1/events/", headers=ctx.auth("superadmin"))
+
+
+async def _events_admin(ctx):
+    return await ctx.client.get("/api/v1/events/", headers=ctx.auth("admin"))
+
+
+async def _events_user(ctx):
+    return await ctx.client.get("/api/v1/events/", headers=ctx.auth("user"))
+
+
+async def _surveys_user(ctx):
+    return await ctx.client.get("/api/v1/survey/", headers=ctx.auth("user"))
+
+
+async def _answer_submit(ctx):
+    payload = {
+        "answer_data": json.dumps({"q1": ctx.rng.randint(1, 5), "q2": "benchmark"}),
+        "event_id": str(ctx.rng.choice(ctx.data["event_ids"])),
+        "group_id": str(ctx.rng.choice(ctx.data["group_ids"])),
+        "user_id": str(ctx.rng.choice(ctx.data["user_ids"])),
+    }
+    return await ctx.client.post("/api/v1/answers/", json=payload, headers=ctx.auth("user"))
+
+
+async def _csv_import(ctx):
+    batch = ctx.next_id()
+    rows = "".join(
+        f"csv{batch}_{i},csv{batch}_{i}@example.com,{PASSWORD}\n" for i in range(ctx.data["csv_rows"])
+    )
+    group_uuid = ctx.rng.choice(ctx.data["group_uuids"])
+    response = await ctx.client.post(
+        f"/api/v1/groups/upload/users/{group_uuid}",
+        files={"file": ("users.csv", "username,email,password\n" + rows, "text/csv")},
+        headers=ctx.auth("superadmin"),
+    )
+    if response.status_code == 202:
+        ctx.data["jobs"].append(response.json()["data"]["status_url"])
+    return response
+
+
+async def _image_upload(ctx):
+    return await ctx.client.post(
+        "/api/v1/images/upload",
+        data={"name": f"image{ctx.next_id()}"},
+        files={"file": ("bench.png", os.urandom(ctx.data["image_bytes"]), "image/png")},
+        headers=ctx.auth("user"),
+    )
+
+
+SCENARIOS = {
+    "login": (_login, "/api/v1/login"),
+    "events_superadmin": (_events_superadmin, "/api/v1/events/"),
+    "events_admin": (_events_admin, "/api/v1/events/"),
+    "events_user": (_events_user, "/api/v1/events/"),
+    "surveys_user": (_surveys_user, "/api/v1/survey/"),
+    "answer_submit": (_answer_submit, "/api/v1/answers/"),
+    "csv_import": (_csv_import, "/api/v1/groups/upload/users/{group_uuid}"),
+    "image_upload": (_image_upload, "/api/v1/images/upload"),
+}
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples: list, elapsed: float) -> dict:
+    latencies = sorted(sample["latency"] for sample in samples)
+    queries = [sample["queries"] for sample in samples]
+    db_ms = [sample["db_ms"] for sample in samples]
+    statuses = {}
+    for sample in samples:
+        statuses[str(sample["status"])] = statuses.get(str(sample["status"]), 0) + 1
+    errors = sum(count for status, count in statuses.items() if int(status) >= 400)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        "queries_per_request": round(sum(queries) / len(queries), 2) if queries else 0.0,
+        "db_ms_per_request": round(sum(db_ms) / len(db_ms), 3) if db_ms else 0.0,
+        "statuses": statuses,
+    }
+
+
+async def _drive(app, data: dict, args) -> tuple:
+    import httpx
+
+    available = set(app.openapi()["paths"])
+    mix = {}
+    for name, weight in args.mix.items():
+        route = SCENARIOS[name][1]
+        if weight <= 0:
+            continue
+        if route not in available:
+            print(f"skipping {name}: {route} is not mounted on main.app", file=sys.stderr)
+            continue
+        mix[name] = weight
+    if not mix:
+        raise SystemExit("no runnable scenarios in the mix")
+    names, weights = list(mix), list(mix.values())
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        setup = Context(client, data, random.Random(args.seed))
+        setup.tokens = tokens = {
+            "superadmin": await setup.login(data["superadmin_username"]),
+            "admin": await setup.login(data["admin_usernames"][0]),
+            # A member of the largest group: the most expensive event listing.
+            "user": await setup.login(data["heaviest_username"]),
+        }
+
+        samples = []
+        warmup_until = time.perf_counter() + args.warmup
+        deadline = warmup_until + args.duration
+
+        async def client_loop(worker: int):
+            ctx = Context(client, data, random.Random(args.seed * 1000 + worker))
+            ctx.tokens = tokens
+            ctx.sequence = worker * 1_000_000
+            while True:
+                started = time.perf_counter()
+                if started >= deadline or (args.requests and len(samples) >= args.requests):
+                    return
+                name = ctx.rng.choices(names, weights)[0]
+                try:
+                    response = await SCENARIOS[name][0](ctx)
+                    status = response.status_code
+                    timing = _SERVER_TIMING.search(response.headers.get("server-timing", ""))
+                except Exception:
+                    status, timing = 599, None
+                finished = time.perf_counter()
+                if started >= warmup_until:
+                    samples.append({
+                        "scenario": name,
+                        "latency": finished - started,
+                        "status": status,
+                        "queries": int(timing.group(2)) if timing else 0,
+                        "db_ms": float(timing.group(1)) if timing else 0.0,
+                    })
+
+        run_started = time.perf_counter()
+        await asyncio.gather(*(client_loop(worker) for worker in range(args.concurrency)))
+        elapsed = time.perf_counter() - max(run_started, warmup_until)
+
+        # Cancel leftover imports and wait for the running ones to stop, so
+        # shutdown does not cut them off mid-file.
+        for status_url in data["jobs"]:
+            await client.delete(status_url, headers=setup.auth("superadmin"))
+        for status_url in data["jobs"]:
+            while True:
+                job = (await client.get(status_url, headers=setup.auth("superadmin"))).json().get("data") or {}
+                if job.get("status") not in ("queued", "running"):
+                    break
+                await asyncio.sleep(0.1)
+    return samples, elapsed
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: dict, baseline: dict):
+    print(f"\ncompared with {baseline['meta'].get('revision')} ({baseline['meta'].get('started_at')})")
+    print(f"{'scenario':<20}{'p95 ms':>22}{'rps':>22}{'queries/req':>18}")
+    for name, row in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if not before:
+            continue
+
+        def delta(key):
+            old, new = before[key], row[key]
+            change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+            return f"{old:>8} -> {new:<8}{change:>7}"
+
+        print(f"{name:<20}{delta('p95_ms'):>22}{delta('throughput_rps'):>22}{before['queries_per_request']:>7} -> {row['queries_per_request']}")
+
+
+def print_report(result: dict):
+    print(f"{'scenario':<20}{'reqs':>7}{'err':>5}{'rps':>9}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'q/req':>7}")
+    for name, row in [*result["scenarios"].items(), ("TOTAL", result["total"])]:
+        print(
+            f"{name:<20}{row['requests']:>7}{row['errors']:>5}{row['throughput_rps']:>9}"
+            f"{row['p50_ms']:>11}{row['p95_ms']:>11}{row['p99_ms']:>11}{row['queries_per_request']:>7}"
+        )
+
+
+def run(args) -> dict:
+    _configure_environment(args)
+
+    import main
+    from utils import query_stats
+
+    main.on_startup()
+    try:
+        data = seed(args)
+        query_stats.reset()
+        data["csv_rows"] = args.csv_rows
+        data["image_bytes"] = args.image_bytes
+        data["jobs"] = []
+        started_at = datetime.now().isoformat(timespec="seconds")
+        samples, elapsed = asyncio.run(_drive(main.app, data, args))
+    finally:
+        main.on_shutdown()
+
+    by_scenario = {}
+    for sample in samples:
+        by_scenario.setdefault(sample["scenario"], []).append(sample)
+    return {
+        "meta": {
+            "revision": _git_revision(),
+            "started_at": started_at,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": "sqlite",
+            "args": {k: v for k, v in vars(args).items() if k not in ("json_path", "compare", "workdir")},
+        },
+        "scenarios": {name: summarize(rows, elapsed) for name, rows in sorted(by_scenario.items())},
+        "total": summarize(samples, elapsed),
+        # Includes the warmup; statements are the slowest by total time.
+        "db": query_stats.stats(top=10),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds excluded from the results")
+    parser.add_argument("--requests", type=int, default=0, help="stop after this many measured requests")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", type=_parse_mix, default=dict(DEFAULT_MIX), help="e.g. login=1,events_user=5")
+    parser.add_argument("--scale", type=float, default=0.1, help="dataset size relative to migrations.seed defaults")
+    parser.add_argument("--size", type=_parse_sizes, default={}, help="exact sizes, e.g. users=5000,answers=0")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent of group and event popularity")
+    parser.add_argument("--csv-rows", type=int, default=20)
+    parser.add_argument("--image-bytes", type=int, default=64 * 1024)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workdir", help="defaults to a temporary directory removed afterwards")
+    parser.add_argument("--json", dest="json_path", help="write the results to this file")
+    parser.add_argument("--compare", help="results JSON of an earlier run")
+    args = parser.parse_args()
+
+    for option in ("json_path", "compare"):
+        if getattr(args, option):
+            setattr(args, option, os.path.abspath(getattr(args, option)))
+    temporary = args.workdir is None
+    args.workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="api-bench-"))
+    try:
+        result = run(args)
+    finally:
+        if temporary:
+            shutil.rmtree(args.workdir, ignore_errors=True)
+
+    print_report(result)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(result, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Concurrent-login throughput: blocking auth path vs. the offloaded async path.
+
+The DB lookup is replaced with an in-memory user plus a fixed sleep, so the numbers
+isolate how much each path stalls the event loop. Run from the repository root:
+
+    python -m benchmarks.auth_login --logins 64 --db-latency-ms 2
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from model.user import UserInDB
+from services import auth_service, hash_service
+from utils.security import pwd_context
+
+
+async def _heartbeat(stop: asyncio.Event, interval: float, lags: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def _run(mode: str, logins: int, password: str):
+    async def blocking_login():
+        # What the endpoint did before: sync DB lookup and bcrypt on the event loop.
+        return auth_service.authenticate_user("bench", password)
+
+    async def offloaded_login():
+        return await auth_service.authenticate_user_async("bench", password)
+
+    login = blocking_login if mode == "blocking" else offloaded_login
+    stop = asyncio.Event()
+    lags = []
+    heartbeat = asyncio.create_task(_heartbeat(stop, 0.005, lags))
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(logins)), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await heartbeat
+    rejected = sum(isinstance(r, hash_service.HashServiceBusy) for r in results)
+    for result in results:
+        if isinstance(result, BaseException) and not isinstance(result, hash_service.HashServiceBusy):
+            raise result
+    assert all(r for r in results if not isinstance(r, BaseException)), "login failed"
+    accepted = logins - rejected
+    return {
+        "mode": mode,
+        "logins": logins,
+        "rejected": rejected,
+        "seconds": round(elapsed, 4),
+        "logins_per_sec": round(accepted / elapsed, 2),
+        "max_loop_stall_ms": round(max(lags, default=0) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--db-latency-ms", type=float, default=2.0)
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    password = "bench-password"
+    user = UserInDB(
+        id=1,
+        username="bench",
+        email="bench@example.com",
+        role="user",
+        status=1,
+        uuid="bench-uuid",
+        hashed_password=pwd_context.hash(password, rounds=args.rounds),
+    )
+
+    def get_user(username, db=None):
+        time.sleep(args.db_latency_ms / 1000)
+        return user
+
+    auth_service.get_user = get_user
+    hash_service.hash_password_sync(password)  # start the worker processes up front
+
+    results = [asyncio.run(_run(mode, args.logins, password)) for mode in ("blocking", "offloaded")]
+    for row in results:
+        print(
+            f"{row['mode']:>9}: {row['logins_per_sec']:>8} logins/s  "
+            f"{row['seconds']:>7}s total  max loop stall {row['max_loop_stall_ms']} ms  "
+            f"rejected {row['rejected']}"
+        )
+    hash_service.shutdown()
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
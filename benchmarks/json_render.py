@@ -0,0 +1,95 @@
+"""Encode time of the listing payloads: jsonable_encoder + stdlib json vs. FastJSONResponse.
+
+Builds real payloads by calling the services on a synthetic SQLite dataset
+(migrations/seed.py), then renders each one repeatedly both ways. Run from the
+repository root:
+
+    python -m benchmarks.json_render --scale 0.1 --limit 200 --repeat 200
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _time(fn, repeat: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def payloads(limit: int, dataset: dict) -> dict:
+    from config.connect_db import mydb
+    from services import answer_service, auth_service, event_service, recap_service, survey_service
+    from utils.pagination import ListParams
+
+    superadmin = auth_service.get_user(dataset["superadmin_username"])
+    member = auth_service.get_user(dataset["heaviest_username"])
+    return {
+        "get_all_events (superadmin)": event_service.get_all_events(superadmin, mydb(), ListParams(limit=limit)),
+        "get_all_events (user)": event_service.get_all_events(member, mydb(), ListParams(limit=limit)),
+        "get_all_surveys (superadmin)": survey_service.get_all_surveys(superadmin, mydb(), ListParams(limit=limit)),
+        "get_all_answers": answer_service.get_all_answers(mydb(), ListParams(limit=limit)),
+        "read_all_recaps": recap_service.read_all_recaps(mydb(), ListParams(limit=limit)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=0.1, help="dataset size relative to migrations.seed defaults")
+    parser.add_argument("--limit", type=int, default=200, help="rows per listing page")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--json", dest="json_path", help="write the results to this file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="json-bench-")
+    os.environ.update({"DB_BACKEND": "sqlite", "SQLITE_PATH": os.path.join(workdir, "app.sqlite3")})
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    try:
+        from fastapi.encoders import jsonable_encoder
+        from fastapi.responses import JSONResponse
+        from migrations.runner import migrate
+        from migrations.seed import Sizes, generate
+        from utils import response
+
+        migrate(log=lambda message: None)
+        dataset = generate(Sizes().scaled(args.scale), log=lambda line: None)
+        results = {}
+        print(f"orjson: {'yes' if response.orjson else 'no (stdlib fallback)'}")
+        print(f"{'payload':<30}{'rows':>6}{'KB':>8}{'stdlib us':>12}{'fast us':>10}{'speedup':>9}")
+        for name, payload in payloads(args.limit, dataset).items():
+            before = JSONResponse(jsonable_encoder(payload)).body
+            after = response.FastJSONResponse(payload).body
+            assert json.loads(before) == json.loads(after), f"{name}: renderings differ"
+
+            stdlib = _time(lambda: JSONResponse(jsonable_encoder(payload)), args.repeat)
+            fast = _time(lambda: response.FastJSONResponse(payload), args.repeat)
+            results[name] = {
+                "rows": next((len(v) for v in payload.values() if isinstance(v, list)), 0),
+                "bytes": len(after),
+                "stdlib_us": round(stdlib * 1e6, 1),
+                "fast_us": round(fast * 1e6, 1),
+                "speedup": round(stdlib / fast, 2),
+            }
+            row = results[name]
+            print(f"{name:<30}{row['rows']:>6}{row['bytes'] / 1024:>8.1f}{row['stdlib_us']:>12}{row['fast_us']:>10}{row['speedup']:>8}x")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,369 @@
+import threading
+import time
+from collections import deque
+
 import mysql.connector
+from fastapi import Depends
 
-def mydb():
-    mydb = mysql.connector.connect(
-    host="localhost",
-    user="root",
-    password="",
-    database="projek"
+from config import sqlite_db
+from config.env import (
+    DB_BACKEND,
+    DB_HOST,
+    DB_PORT,
+    DB_USER,
+    DB_PASSWORD,
+    DB_NAME,
+    DB_POOL_MIN_SIZE,
+    DB_POOL_MAX_SIZE,
+    DB_POOL_MAX_LIFETIME,
+    DB_POOL_WAIT_TIMEOUT,
+    DB_POOL_PING_AFTER,
+)
+from utils.query_stats import instrument
+
+
+class PoolTimeoutError(Exception):
+    pass
+
+
+def _connect():
+    return mysql.connector.connect(
+        host=DB_HOST,
+        port=DB_PORT,
+        user=DB_USER,
+        password=DB_PASSWORD,
+        database=DB_NAME,
+        consume_results=True,
     )
-    return mydb
\ No newline at end of file
+
+
+class _PoolEntry:
+    __slots__ = ("raw", "created_at", "last_used")
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class PooledConnection:
+    """Checked-out connection. ``close()`` hands it back to the pool."""
+
+    def __init__(self, pool, entry):
+        self._pool = pool
+        self._entry = entry
+
+    def __getattr__(self, name):
+        entry = self.__dict__.get("_entry")
+        if entry is None:
+            raise AttributeError(name)
+        return getattr(entry.raw, name)
+
+    def cursor(self, *args, **kwargs):
+        return instrument(self.__getattr__("cursor")(*args, **kwargs))
+
+    def close(self):
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool.release(entry)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __del__(self):
+        # Safety net for code paths that raise before closing.
+        if self.__dict__.get("_entry") is not None:
+            self.close()
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        connect=_connect,
+        min_size=DB_POOL_MIN_SIZE,
+        max_size=DB_POOL_MAX_SIZE,
+        max_lifetime=DB_POOL_MAX_LIFETIME,
+        wait_timeout=DB_POOL_WAIT_TIMEOUT,
+        ping_after=DB_POOL_PING_AFTER,
+    ):
+        if max_size < 1 or min_size > max_size:
+            raise ValueError("Invalid pool size")
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.wait_timeout = wait_timeout
+        self.ping_after = ping_after
+
+        self._idle = deque()
+        self._size = 0
+        self._cond = threading.Condition()
+        self._stats = {"checkouts": 0, "created": 0, "discarded": 0, "timeouts": 0, "waits": 0}
+
+    def warm(self):
+        while True:
+            with self._cond:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                entry = self._open()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                raise
+            self.release(entry)
+
+    def connection(self):
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            entry = self._checkout(deadline)
+            if entry is None:
+                entry = self._open_reserved()
+            elif not self._healthy(entry):
+                self._discard(entry)
+                continue
+            entry.last_used = time.monotonic()
+            with self._cond:
+                self._stats["checkouts"] += 1
+            return PooledConnection(self, entry)
+
+    def release(self, entry):
+        if self._expired(entry):
+            self._discard(entry)
+            return
+        try:
+            # Never hand out a connection holding someone else's open transaction.
+            if entry.raw.in_transaction:
+                entry.raw.rollback()
+        except Exception:
+            self._discard(entry)
+            return
+
+        entry.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+        for entry in idle:
+            try:
+                entry.raw.close()
+            except Exception:
+                pass
+
+    def stats(self):
+        with self._cond:
+            return {
+                **self._stats,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self.max_size,
+            }
+
+    def _checkout(self, deadline):
+        """Pop an idle entry, or return None after reserving a slot for a new one."""
+        with self._cond:
+            waited = False
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeoutError(
+                        f"Timed out after {self.wait_timeout}s waiting for a database connection"
+                    )
+                if not waited:
+                    self._stats["waits"] += 1
+                    waited = True
+                self._cond.wait(remaining)
+
+    def _open_reserved(self):
+        try:
+            return self._open()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def _open(self):
+        entry = _PoolEntry(self._connect())
+        with self._cond:
+            self._stats["created"] += 1
+        return entry
+
+    def _expired(self, entry):
+        return self.max_lifetime > 0 and time.monotonic() - entry.created_at > self.max_lifetime
+
+    def _healthy(self, entry):
+        if self._expired(entry):
+            return False
+        if time.monotonic() - entry.last_used < self.ping_after:
+            return True
+        try:
+            entry.raw.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, entry):
+        try:
+            entry.raw.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._stats["discarded"] += 1
+            self._cond.notify()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                if DB_BACKEND == "sqlite":
+                    # Connections never go stale; the pool only keeps them exclusive
+                    # to one request at a time.
+                    _pool = ConnectionPool(connect=sqlite_db.connect, max_lifetime=0)
+                else:
+                    _pool = ConnectionPool()
+    return _pool
+
+
+def mydb():
+    return get_pool().connection()
+
+
+class RequestConnection:
+    """One connection shared by every service call made while serving a request.
+
+    ``commit()`` from a service only sets a savepoint; the transaction is committed
+    once by ``get_db`` when the request finishes without raising. Work done after
+    the last ``commit()`` is discarded, just as it was when each service closed
+    its own uncommitted connection. ``close()`` is a no-op.
+
+    The pooled connection is checked out on first use, and ``release()`` hands it
+    back while the request waits on something slow that needs no database.
+
+    Callbacks passed to ``on_commit()`` run once the transaction is committed.
+    """
+
+    def __init__(self, connect=None):
+        self._connect = connect or mydb
+        self._conn = None
+        self._has_savepoint = False
+        self._on_commit = []
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = self._connect()
+        return self._conn
+
+    def __getattr__(self, name):
+        return getattr(self._connection(), name)
+
+    def _execute(self, sql):
+        cursor = self._connection().cursor()
+        try:
+            cursor.execute(sql)
+        finally:
+            cursor.close()
+
+    def commit(self):
+        self._execute("SAVEPOINT request_uow")
+        self._has_savepoint = True
+
+    def close(self):
+        pass
+
+    def release(self):
+        """Return the connection to the pool if it holds nothing to commit yet.
+
+        Uncommitted work is rolled back, as it would be at the end of the request.
+        """
+        if self._conn is not None and not self._has_savepoint:
+            conn, self._conn = self._conn, None
+            conn.rollback()
+            conn.close()
+
+    def on_commit(self, callback):
+        self._on_commit.append(callback)
+
+    def finish(self):
+        if self._has_savepoint:
+            self._execute("ROLLBACK TO SAVEPOINT request_uow")
+            self._conn.commit()
+            # Callbacks may take connections of their own; don't hold this one meanwhile.
+            self._return()
+            for callback in self._on_commit:
+                callback()
+
+    def abort(self):
+        if self._conn is not None:
+            try:
+                self._conn.rollback()
+            finally:
+                self._return()
+
+    def _return(self):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            conn.close()
+
+
+def release(db):
+    """Let go of ``db``'s pooled connection before a slow wait, when ``db`` is a
+    request's unit of work with nothing to commit yet."""
+    release_connection = getattr(db, "release", None)
+    if release_connection is not None:
+        release_connection()
+
+
+def after_commit(db, callback):
+    """Run ``callback`` once the writes made through ``db`` are committed.
+
+    A request's unit of work commits when the request finishes; any other
+    connection is expected to have been committed by the caller already.
+    """
+    on_commit = getattr(db, "on_commit", None)
+    if on_commit is not None:
+        on_commit(callback)
+    else:
+        callback()
+
+
+def get_db():
+    uow = RequestConnection()
+    try:
+        yield uow
+        uow.finish()
+    except Exception:
+        uow.abort()
+        raise
+    finally:
+        uow._return()
+
+
+# The commit has to land before the response is sent; newer FastAPI releases only
+# guarantee that for function-scoped dependencies.
+try:
+    DbSession = Depends(get_db, scope="function")
+except TypeError:
+    DbSession = Depends(get_db)
@@ -6,3 +6,82 @@ load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+
+# "mysql" or "sqlite" (embedded, single node).
+DB_BACKEND = os.getenv("DB_BACKEND", "mysql").lower()
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "true" if DB_BACKEND == "sqlite" else "false").lower() in ("1", "true", "yes")
+
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = int(os.getenv("DB_PORT", 3306))
+DB_USER = os.getenv("DB_USER", "root")
+DB_PASSWORD = os.getenv("DB_PASSWORD", "")
+DB_NAME = os.getenv("DB_NAME", "projek")
+
+SQLITE_PATH = os.getenv("SQLITE_PATH", "var/app.sqlite3")
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", 5000))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", 65536))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 1))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 10))
+DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", 1800))
+DB_POOL_WAIT_TIMEOUT = float(os.getenv("DB_POOL_WAIT_TIMEOUT", 10))
+DB_POOL_PING_AFTER = float(os.getenv("DB_POOL_PING_AFTER", 5))
+
+QUERY_STATS_ENABLED = os.getenv("QUERY_STATS_ENABLED", "true").lower() in ("1", "true", "yes")
+# Server-Timing response headers; meant for development.
+QUERY_STATS_HEADERS = os.getenv("QUERY_STATS_HEADERS", "false").lower() in ("1", "true", "yes")
+QUERY_STATS_MAX_STATEMENTS = int(os.getenv("QUERY_STATS_MAX_STATEMENTS", 500))
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 100))
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", 5))
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+COMPRESSION_CACHE_SIZE = int(os.getenv("COMPRESSION_CACHE_SIZE", 256))
+COMPRESSION_CACHE_TTL = float(os.getenv("COMPRESSION_CACHE_TTL", 300))
+COMPRESSION_CACHE_MAX_BODY = int(os.getenv("COMPRESSION_CACHE_MAX_BODY", 1024 * 1024))
+
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", os.cpu_count() or 1))
+HASH_QUEUE_SIZE = int(os.getenv("HASH_QUEUE_SIZE", HASH_WORKERS * 8))
+HASH_BULK_CHUNK = int(os.getenv("HASH_BULK_CHUNK", 4))
+
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 1024))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", 30))
+
+SERVICE_CACHE_ENABLED = os.getenv("SERVICE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+SERVICE_CACHE_SIZE = int(os.getenv("SERVICE_CACHE_SIZE", 4096))
+SERVICE_CACHE_TTL = float(os.getenv("SERVICE_CACHE_TTL", 30))
+SERVICE_CACHE_MAX_BYTES = int(os.getenv("SERVICE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() in ("1", "true", "yes")
+
+EVENT_BUNDLE_CACHE_SIZE = int(os.getenv("EVENT_BUNDLE_CACHE_SIZE", 1024))
+EVENT_BUNDLE_TTL = float(os.getenv("EVENT_BUNDLE_TTL", 60))
+
+STATUS_STREAM_HISTORY = int(os.getenv("STATUS_STREAM_HISTORY", 1024))
+STATUS_STREAM_KEEPALIVE = float(os.getenv("STATUS_STREAM_KEEPALIVE", 15))
+STATUS_STREAM_RECHECK = float(os.getenv("STATUS_STREAM_RECHECK", 60))
+
+AUTH_CLAIMS_ONLY = os.getenv("AUTH_CLAIMS_ONLY", "false").lower() in ("1", "true", "yes")
+TOKEN_VERSION_CACHE_SIZE = int(os.getenv("TOKEN_VERSION_CACHE_SIZE", 100000))
+
+TOKEN_BLACKLIST_BACKEND = os.getenv("TOKEN_BLACKLIST_BACKEND", "memory")
+TOKEN_BLACKLIST_PATH = os.getenv("TOKEN_BLACKLIST_PATH", "var/token_blacklist.sqlite3")
+TOKEN_BLACKLIST_PURGE_INTERVAL = float(os.getenv("TOKEN_BLACKLIST_PURGE_INTERVAL", 60))
+
+CSV_IMPORT_CHUNK = int(os.getenv("CSV_IMPORT_CHUNK", 500))
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", "var/jobs.sqlite3")
+JOBS_UPLOAD_DIR = os.getenv("JOBS_UPLOAD_DIR", "var/job_uploads")
+
+STATUS_SCHEDULER_ENABLED = os.getenv("STATUS_SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+STATUS_SCHEDULER_MAX_SLEEP = float(os.getenv("STATUS_SCHEDULER_MAX_SLEEP", 60))
+STATUS_SCHEDULER_SETTLE = float(os.getenv("STATUS_SCHEDULER_SETTLE", 1))
+
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", 50))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", 200))
@@ -1,3 +1,5 @@
-from connect_db import mydb
+from config.connect_db import mydb
 
-mydb()
\ No newline at end of file
+conn = mydb()
+conn.ping(reconnect=False)
+conn.close()
@@ -0,0 +1,155 @@
+import os
+import re
+import sqlite3
+import uuid
+from datetime import datetime
+from functools import lru_cache
+
+from config.env import SQLITE_PATH, SQLITE_BUSY_TIMEOUT, SQLITE_CACHE_SIZE_KB, SQLITE_MMAP_SIZE
+
+# The services are written against mysql.connector: ``%s`` placeholders,
+# ``cursor(dictionary=True)``, NOW()/UUID() and datetime values. This module
+# provides just enough of that interface on top of sqlite3.
+
+_WRITE = re.compile(r"^\s*(INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER)\b", re.I)
+_SAVEPOINT = re.compile(r"^\s*SAVEPOINT\b", re.I)
+_TRANSACTION = re.compile(r"^\s*(BEGIN|COMMIT|END|ROLLBACK(?!\s+TO\b))\b", re.I)
+_PLACEHOLDER = re.compile(r"'(?:[^']|'')*'|%s")
+
+
+def _adapt_datetime(value: datetime) -> str:
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value.isoformat(" ", timespec="seconds")
+
+
+def _convert_datetime(value: bytes) -> datetime:
+    return datetime.fromisoformat(value.decode())
+
+
+sqlite3.register_adapter(datetime, _adapt_datetime)
+sqlite3.register_converter("DATETIME", _convert_datetime)
+
+
+@lru_cache(maxsize=512)
+def translate(sql: str) -> str:
+    """Rewrite ``%s`` placeholders outside string literals to ``?``."""
+    return _PLACEHOLDER.sub(lambda m: "?" if m.group(0) == "%s" else m.group(0), sql)
+
+
+def _now() -> str:
+    return _adapt_datetime(datetime.now())
+
+
+class SQLiteCursor:
+    def __init__(self, conn: "SQLiteConnection", dictionary: bool = False):
+        self._conn = conn
+        self._cursor = conn.raw.cursor()
+        self._dictionary = dictionary
+
+    def execute(self, sql: str, params=()):
+        self._conn.prepare(sql)
+        self._cursor.execute(translate(sql), tuple(params or ()))
+        return self
+
+    def executemany(self, sql: str, seq_of_params):
+        self._conn.prepare(sql)
+        self._cursor.executemany(translate(sql), [tuple(p) for p in seq_of_params])
+        return self
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return {column[0]: value for column, value in zip(self._cursor.description, row)}
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        if not self._dictionary:
+            return rows
+        columns = [column[0] for column in self._cursor.description]
+        return [dict(zip(columns, row)) for row in rows]
+
+    def fetchmany(self, size: int = 1):
+        return [self._row(row) for row in self._cursor.fetchmany(size)]
+
+    def __iter__(self):
+        return (self._row(row) for row in self._cursor)
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """A sqlite3 connection behaving like a mysql.connector one with autocommit off.
+
+    Reads run in autocommit mode; the first write (or savepoint) opens a
+    ``BEGIN IMMEDIATE`` transaction, so concurrent writers queue on the busy
+    timeout instead of failing to upgrade a read snapshot.
+    """
+
+    def __init__(self, path: str = SQLITE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.raw = sqlite3.connect(
+            path,
+            timeout=SQLITE_BUSY_TIMEOUT / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+        )
+        self.raw.execute("PRAGMA journal_mode=WAL")
+        self.raw.execute("PRAGMA synchronous=NORMAL")
+        self.raw.execute("PRAGMA foreign_keys=ON")
+        self.raw.execute("PRAGMA temp_store=MEMORY")
+        self.raw.execute(f"PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT)}")
+        self.raw.execute(f"PRAGMA cache_size=-{int(SQLITE_CACHE_SIZE_KB)}")
+        self.raw.execute(f"PRAGMA mmap_size={int(SQLITE_MMAP_SIZE)}")
+        self.raw.create_function("NOW", 0, _now)
+        self.raw.create_function("UUID", 0, lambda: str(uuid.uuid4()))
+
+    def prepare(self, sql: str):
+        if self.raw.in_transaction or _TRANSACTION.match(sql):
+            return
+        if _WRITE.match(sql) or _SAVEPOINT.match(sql):
+            self.raw.execute("BEGIN IMMEDIATE")
+
+    def cursor(self, dictionary: bool = False, **kwargs) -> SQLiteCursor:
+        return SQLiteCursor(self, dictionary)
+
+    @property
+    def in_transaction(self) -> bool:
+        return self.raw.in_transaction
+
+    def commit(self):
+        if self.raw.in_transaction:
+            self.raw.execute("COMMIT")
+
+    def rollback(self):
+        if self.raw.in_transaction:
+            self.raw.execute("ROLLBACK")
+
+    def ping(self, reconnect: bool = False):
+        self.raw.execute("SELECT 1").fetchone()
+
+    def close(self):
+        self.raw.close()
+
+
+def connect() -> SQLiteConnection:
+    return SQLiteConnection(SQLITE_PATH)
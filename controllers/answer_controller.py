@@ -1,40 +1,43 @@
 from fastapi import APIRouter, Depends
 from model.answer import Answer, AnswerUpdate
+from config.connect_db import DbSession
 from services import answer_service
 from model.event import UserInDB
 from services.auth_service import get_current_active_user
 from services.event_service import admin_required
+from utils.pagination import ListParams, list_params
+from utils.response import FastJSONResponse
 
 router = APIRouter()
 
 @router.post("/")
-def create_answer(answer: Answer, current_user: UserInDB = Depends(get_current_active_user)):
-    return answer_service.create_answer(answer)
+def create_answer(answer: Answer, current_user: UserInDB = Depends(get_current_active_user), db=DbSession):
+    return answer_service.create_answer(answer, db)
 
 @router.get("/")
-def get_all_answers(current_user: UserInDB = Depends(get_current_active_user)):
-    return answer_service.get_all_answers()
+def get_all_answers(params: ListParams = Depends(list_params), current_user: UserInDB = Depends(get_current_active_user), db=DbSession):
+    return FastJSONResponse(answer_service.get_all_answers(db, params))
 
 @router.get("/answers/{uuid}")
-def get_answer_by_uuid(uuid: str, current_user: UserInDB = Depends(get_current_active_user)):
-    return answer_service.get_answer_by_uuid(uuid, current_user)
+def get_answer_by_uuid(uuid: str, current_user: UserInDB = Depends(get_current_active_user), db=DbSession):
+    return answer_service.get_answer_by_uuid(uuid, db)
 
 @router.get("/answers/event/{survey_id}")
-def get_answers_by_event(survey_id: int, current_user: UserInDB = Depends(get_current_active_user)):
-    return answer_service.get_answers_by_event(survey_id, current_user)
+def get_answers_by_event(survey_id: int, current_user: UserInDB = Depends(get_current_active_user), db=DbSession):
+    return answer_service.get_answers_by_event(survey_id, current_user, db)
 
 @router.get("/answers/event/{survey_id}/group/{group_id}")
-def get_answers_by_event_and_group(survey_id: int, group_id: int, current_user: UserInDB = Depends(get_current_active_user)):
-    return answer_service.get_answers_by_event_and_group(survey_id, group_id, current_user)
+def get_answers_by_event_and_group(survey_id: int, group_id: int, current_user: UserInDB = Depends(get_current_active_user), db=DbSession):
+    return answer_service.get_answers_by_event_and_group(survey_id, group_id, current_user, db)
 
 @router.get("/{answer_uuid}")
-def get_answer_by_uuid(answer_uuid: str, current_user: UserInDB = Depends(get_current_active_user)):
-    return answer_service.get_answer_by_uuid(answer_uuid)
+def get_answer_by_uuid(answer_uuid: str, current_user: UserInDB = Depends(get_current_active_user), db=DbSession):
+    return answer_service.get_answer_by_uuid(answer_uuid, db)
 
 @router.patch("/{answer_uuid}")
-def update_answer(answer_uuid: str, update_data: AnswerUpdate, current_user: UserInDB = Depends(admin_required)):
-    return answer_service.update_answer(answer_uuid, update_data)
+def update_answer(answer_uuid: str, update_data: AnswerUpdate, current_user: UserInDB = Depends(admin_required), db=DbSession):
+    return answer_service.update_answer(answer_uuid, update_data, db)
 
 @router.delete("/{answer_uuid}")
-def delete_answer(answer_uuid: str, current_user: UserInDB = Depends(admin_required)):
-    return answer_service.delete_answer(answer_uuid)
+def delete_answer(answer_uuid: str, current_user: UserInDB = Depends(admin_required), db=DbSession):
+    return answer_service.delete_answer(answer_uuid, db)
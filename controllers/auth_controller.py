@@ -1,33 +1,40 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 from model.user import LoginRequest, Token, User, UserCreate, UserInDB, UserResponse, UserUpdate
+from fastapi.concurrency import run_in_threadpool
 from services.auth_service import (
-    authenticate_user,
-    create_user,
-    get_user,
+    authenticate_user_async,
+    create_user_async,
+    get_user_async,
     create_access_token,
+    remember_token_version,
     get_current_active_user,
-    verify_password,
-    update_user_in_db,
+    update_user_in_db_async,
     get_all_users,
-    get_user_by_email,
-    get_user_by_uuid,
-    set_user_status_by_uuid
+    get_user_by_email_async,
+    get_user_by_uuid_async,
+    set_user_status_by_uuid_async,
+    token_versions
 )
 from datetime import timedelta
 from typing import List, Optional
 from config.env import ACCESS_TOKEN_EXPIRE_MINUTES
-from utils.security import pwd_context
-from utils.response import success_response, error_response
+from services import hash_service
+from services.hash_service import HashServiceBusy
+from utils.response import success_response, error_response, paginated_response
+from utils.pagination import ListParams, list_params
+from utils.etag import conditional
 from services.token_blacklist import blacklist_token
+from config.connect_db import DbSession, release
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/login")
 
 @router.post("/login")
-async def login_for_access_token(login_data: LoginRequest):
+async def login_for_access_token(login_data: LoginRequest, db=DbSession):
     try:
-        user = authenticate_user(login_data.username, login_data.password)
+        version_generation = token_versions.generation
+        user = await authenticate_user_async(login_data.username, login_data.password, db)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -48,7 +55,9 @@ async def login_for_access_token(login_data: LoginRequest):
                 "user_id": user.id,
                 "name": user.username,
                 "email": user.email,
-                "role": user.role
+                "role": user.role,
+                "uuid": user.uuid,
+                "ver": remember_token_version(user, version_generation)
             },
             expires_delta=access_token_expires,
         )
@@ -60,7 +69,9 @@ async def login_for_access_token(login_data: LoginRequest):
         user_data["authorization"] = {"token": access_token}
 
         return success_response("Login successfully", user_data)
-    
+
+    except HashServiceBusy:
+        raise
     except Exception as e:
         return error_response(f"Failed to login: {str(e)}", 500)
 
@@ -68,7 +79,8 @@ async def login_for_access_token(login_data: LoginRequest):
 @router.post("/users")
 async def register_user(
     user: UserCreate,
-    current_user: UserInDB = Depends(get_current_active_user)
+    current_user: UserInDB = Depends(get_current_active_user),
+    db=DbSession
 ):
     if current_user.role not in ["admin", "superadmin"]:
         raise HTTPException(
@@ -76,21 +88,21 @@ async def register_user(
             detail={"message": "Only admins can register new users"}
         )
 
-    existing_user = get_user(user.username)
+    existing_user = await get_user_async(user.username, db)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={"message": "Username already registered"}
         )
 
-    existing_email = get_user_by_email(user.email)
+    existing_email = await get_user_by_email_async(user.email, db)
     if existing_email:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={"message": "Email already registered"}
         )
 
-    created_user = create_user(user)
+    created_user = await create_user_async(user, db)
     return success_response("User registered successfully", created_user)
 
 
@@ -98,28 +110,30 @@ async def register_user(
 async def update_user(
     uuid: str,
     update_data: UserUpdate,
-    current_user: UserInDB = Depends(get_current_active_user)
+    current_user: UserInDB = Depends(get_current_active_user),
+    db=DbSession
 ):
-    target_user = get_user_by_uuid(uuid)
+    target_user = await get_user_by_uuid_async(uuid, db)
     if not target_user:
         raise HTTPException(status_code=404, detail={"message": "User not found"})
 
     updates = {}
     if current_user.role == "superadmin":
         if update_data.new_username and update_data.new_username != target_user["username"]:
-            if get_user(update_data.new_username):
+            if await get_user_async(update_data.new_username, db):
                 raise HTTPException(status_code=409, detail={"message": "Username already exists"})
             updates["username"] = update_data.new_username
 
         if update_data.email and update_data.email != target_user["email"]:
-            if get_user_by_email(update_data.email):
+            if await get_user_by_email_async(update_data.email, db):
                 raise HTTPException(status_code=409, detail={"message": "Email already exists"})
             updates["email"] = update_data.email
 
         if update_data.role:
             updates["role"] = update_data.role
         if update_data.password:
-            updates["password"] = pwd_context.hash(update_data.password)
+            await run_in_threadpool(release, db)
+            updates["password"] = await hash_service.hash_password(update_data.password)
         if update_data.status is not None:
             updates["status"] = update_data.status
 
@@ -128,12 +142,12 @@ async def update_user(
             raise HTTPException(status_code=403, detail={"message": "You can't update a superadmin"})
 
         if update_data.new_username and update_data.new_username != target_user["username"]:
-            if get_user(update_data.new_username):
+            if await get_user_async(update_data.new_username, db):
                 raise HTTPException(status_code=409, detail={"message": "Username already exists"})
             updates["username"] = update_data.new_username
 
         if update_data.email and update_data.email != target_user["email"]:
-            if get_user_by_email(update_data.email):
+            if await get_user_by_email_async(update_data.email, db):
                 raise HTTPException(status_code=409, detail={"message": "Email already exists"})
             updates["email"] = update_data.email
 
@@ -143,7 +157,8 @@ async def update_user(
             updates["role"] = update_data.role
 
         if update_data.password:
-            updates["password"] = pwd_context.hash(update_data.password)
+            await run_in_threadpool(release, db)
+            updates["password"] = await hash_service.hash_password(update_data.password)
         if update_data.status is not None:
             updates["status"] = update_data.status
 
@@ -152,28 +167,30 @@ async def update_user(
             raise HTTPException(status_code=403, detail={"message": "Only password update is allowed for users"})
         if not update_data.old_password:
             raise HTTPException(status_code=400, detail={"message": "Old password is required"})
-        if not verify_password(update_data.old_password, target_user["hashed_password"]):
+        # Lookups only so far; give the connection back during the bcrypt rounds.
+        await run_in_threadpool(release, db)
+        if not await hash_service.verify_password(update_data.old_password, target_user["hashed_password"]):
             raise HTTPException(status_code=401, detail={"message": "Old password is incorrect"})
-        updates["password"] = pwd_context.hash(update_data.password)
+        updates["password"] = await hash_service.hash_password(update_data.password)
     else:
         raise HTTPException(status_code=403, detail={"message": "You don't have permission"})
 
     if not updates:
         raise HTTPException(status_code=400, detail={"message": "No valid fields to update"})
 
-    update_user_in_db(uuid, updates)
+    await update_user_in_db_async(uuid, updates, db)
     updated_username = updates.get("username", target_user["username"])
-    updated_user_data = get_user(updated_username)
+    updated_user_data = await get_user_async(updated_username, db)
 
     return success_response("User updated successfully", UserResponse.from_user_in_db(updated_user_data))
 
 
 @router.delete("/users/{uuid}/close")
-async def close_user_account(uuid: str, current_user: UserInDB = Depends(get_current_active_user)):
+async def close_user_account(uuid: str, current_user: UserInDB = Depends(get_current_active_user), db=DbSession):
     if current_user.role not in ["admin", "superadmin"]:
         raise HTTPException(status_code=403, detail={"message": "You don't have permission"})
 
-    target_user = get_user_by_uuid(uuid)
+    target_user = await get_user_by_uuid_async(uuid, db)
     if not target_user:
         raise HTTPException(status_code=404, detail={"message": "User not found"})
 
@@ -183,7 +200,7 @@ async def close_user_account(uuid: str, current_user: UserInDB = Depends(get_cur
     if current_user.role == "admin" and target_user["role"] == "superadmin":
         raise HTTPException(status_code=403, detail={"message": "Admins cannot deactivate superadmins"})
 
-    set_user_status_by_uuid(uuid, 0)
+    await set_user_status_by_uuid_async(uuid, 0, db)
     return success_response(f"User '{target_user['username']}' has been deactivated.")
 
 
@@ -198,9 +215,9 @@ async def read_users_me(current_user: UserInDB = Depends(get_current_active_user
     return success_response("Fetched current user data", UserResponse.from_user_in_db(current_user))
 
 
-@router.get("/users/{uuid}")
-async def get_user_by_uuid_route(uuid: str, current_user: UserInDB = Depends(get_current_active_user)):
-    user_data = get_user_by_uuid(uuid)
+@router.get("/users/{uuid}", dependencies=[Depends(conditional("user", "group", "relation_group_user"))])
+async def get_user_by_uuid_route(uuid: str, current_user: UserInDB = Depends(get_current_active_user), db=DbSession):
+    user_data = await get_user_by_uuid_async(uuid, db)
     if not user_data:
         raise HTTPException(status_code=404, detail={"message": "User not found"})
     if current_user.role not in ["admin", "superadmin"] and current_user.uuid != uuid:
@@ -220,8 +237,13 @@ async def get_user_by_uuid_route(uuid: str, current_user: UserInDB = Depends(get
     return success_response("User fetched successfully", formatted_user)
 
 
-@router.get("/users")
-async def list_all_users(current_user: UserInDB = Depends(get_current_active_user)):
-    users_in_db = get_all_users()
+@router.get("/users", dependencies=[Depends(conditional("user", per_user=False))])
+async def list_all_users(
+    status: Optional[int] = None,
+    params: ListParams = Depends(list_params),
+    current_user: UserInDB = Depends(get_current_active_user),
+    db=DbSession
+):
+    users_in_db, next_cursor = await run_in_threadpool(get_all_users, db, params, status)
     formatted = [UserResponse.from_user_in_db(user) for user in users_in_db]
-    return success_response("All users fetched successfully", formatted)
+    return paginated_response("All users fetched successfully", formatted, next_cursor)
@@ -1,38 +1,83 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Optional
 from model.event import Event, EventUpdate, UserInDB, AssignGroupToEventByUUID
-from services import event_service
-from services.auth_service import get_current_active_user
+from config.connect_db import DbSession
+from services import bundle_service, event_service, status_stream
+from services.auth_service import get_current_active_user, oauth2_scheme
+from utils.pagination import ListParams, list_params
+from utils.response import FastJSONResponse
+from utils.compression import negotiate
+from utils.etag import conditional, matches
 
 router = APIRouter()
 
-@router.get("/")
-def get_all_events(current_user: UserInDB = Depends(get_current_active_user)):
-    return event_service.get_all_events(current_user)
+@router.get("/", dependencies=[Depends(conditional(
+    "event", "survey", "relation_event_survey", "relation_user_event", "relation_group_event", "relation_group_user"
+))])
+def get_all_events(
+    status: Optional[str] = None,
+    params: ListParams = Depends(list_params),
+    current_user: UserInDB = Depends(get_current_active_user),
+    db=DbSession
+):
+    # Row lists are large; skip jsonable_encoder and render them directly.
+    return FastJSONResponse(event_service.get_all_events(current_user, db, params, status))
+
+# Declared before /{event_uuid}, which would otherwise take "stream" for a uuid.
+@router.get("/stream")
+async def stream_status_changes(
+    current_user: UserInDB = Depends(get_current_active_user),
+    token: str = Depends(oauth2_scheme),
+):
+    return StreamingResponse(
+        status_stream.listen(current_user, token),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-@router.get("/{event_uuid}")
-def get_event_by_uuid(event_uuid: str, current_user: UserInDB = Depends(get_current_active_user)):
-    return event_service.get_event_by_uuid(event_uuid)
+@router.get("/{event_uuid}", dependencies=[Depends(conditional("event", "survey", "relation_event_survey", per_user=False))])
+def get_event_by_uuid(event_uuid: str, current_user: UserInDB = Depends(get_current_active_user), db=DbSession):
+    return event_service.get_event_by_uuid(event_uuid, db)
+
+@router.get("/{event_uuid}/bundle")
+def get_event_bundle(
+    event_uuid: str,
+    request: Request,
+    current_user: UserInDB = Depends(get_current_active_user),
+    db=DbSession
+):
+    bundle = bundle_service.get_bundle(event_uuid, current_user, db)
+    headers = {"ETag": bundle.etag, "Cache-Control": "private, no-cache", "Vary": "Accept-Encoding"}
+    if matches(request.headers.get("if-none-match", ""), bundle.etag):
+        return Response(status_code=304, headers=headers)
+    encoding = negotiate(request.headers.get("accept-encoding", ""))
+    if encoding in bundle.encoded:
+        headers["Content-Encoding"] = encoding
+        return Response(bundle.encoded[encoding], media_type="application/json", headers=headers)
+    return Response(bundle.body, media_type="application/json", headers=headers)
 
 @router.post("/")
-def create_event(event: Event, current_user: UserInDB = Depends(event_service.admin_required)):
-    return event_service.create_event(event, current_user)
+def create_event(event: Event, current_user: UserInDB = Depends(event_service.admin_required), db=DbSession):
+    return event_service.create_event(event, current_user, db)
 
 @router.patch("/{event_uuid}")
-def update_event(event_uuid: str, event: EventUpdate, current_user: UserInDB = Depends(event_service.admin_required)):
-    return event_service.update_event(event_uuid, event)
+def update_event(event_uuid: str, event: EventUpdate, current_user: UserInDB = Depends(event_service.admin_required), db=DbSession):
+    return event_service.update_event(event_uuid, event, db)
 
 @router.patch("/{event_uuid}/publish")
-def publish_event(event_uuid: str, current_user: UserInDB = Depends(event_service.admin_required)):
-    return event_service.publish_event(event_uuid, current_user)
+def publish_event(event_uuid: str, current_user: UserInDB = Depends(event_service.admin_required), db=DbSession):
+    return event_service.publish_event(event_uuid, current_user, db)
 
 @router.delete("/{event_uuid}")
-def delete_event(event_uuid: str, current_user: UserInDB = Depends(event_service.admin_required)):
-    return event_service.delete_event(event_uuid)
+def delete_event(event_uuid: str, current_user: UserInDB = Depends(event_service.admin_required), db=DbSession):
+    return event_service.delete_event(event_uuid, db)
 
 @router.post("/{event_uuid}/assign_group")
 def assign_group_to_event(
     event_uuid: str,
     payload: AssignGroupToEventByUUID,
-    current_user: UserInDB = Depends(event_service.admin_required)
+    current_user: UserInDB = Depends(event_service.admin_required),
+    db=DbSession
 ):
-    return event_service.assign_group_to_event(event_uuid, payload.group_uuid)
+    return event_service.assign_group_to_event(event_uuid, payload.group_uuid, db)
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Path
 from utils.hash_util import hash_filename
-from config.connect_db import mydb
+from fastapi.concurrency import run_in_threadpool
+from config.connect_db import DbSession
 from uuid import uuid4
 from model.user import FileMetadata
 from controllers.auth_controller import get_current_active_user
@@ -12,53 +13,24 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 router = APIRouter()
 
-@router.post("/upload", response_model=FileMetadata)
-async def upload_file(
-    name: str = Form(...),
-    file: UploadFile = File(...),
-    current_user: UserInDB = Depends(get_current_active_user)
-):
-    try:
-        content = await file.read()
-        file_hash = hash_filename(file.filename + str(uuid4()))
-        ext = os.path.splitext(file.filename)[1]
-        hashed_filename = f"{file_hash}{ext}"
-        file_path = os.path.join(UPLOAD_DIR, hashed_filename)
-        url_path = f"http://localhost:8000/{UPLOAD_DIR}/{hashed_filename}"
 
-        with open(file_path, "wb") as f:
-            f.write(content)
+def _store_upload(db, file_path, content, name, file_hash, file_original, url_path):
+    with open(file_path, "wb") as f:
+        f.write(content)
 
-        conn = mydb()
-        cursor = conn.cursor()
+    cursor = db.cursor()
+    try:
         cursor.execute("""
             INSERT INTO images (name, file_hash, file_original, url)
             VALUES (%s, %s, %s, %s)
-        """, (name, file_hash, file.filename, url_path))
-        conn.commit()
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        """, (name, file_hash, file_original, url_path))
+        db.commit()
     finally:
         cursor.close()
-        conn.close()
 
-    return FileMetadata(
-        name=name,
-        file_hash=file_hash,
-        file_original=file.filename,
-        url=url_path
-    )
-
-@router.patch("/upload/{id}", response_model=FileMetadata)
-async def update_file_metadata(
-    id: int = Path(..., description="The ID of the image record in the database"),
-    name: str = Form(...),
-    file: UploadFile = File(None),
-    current_user: UserInDB = Depends(get_current_active_user)
-):
-    conn = mydb()
-    cursor = conn.cursor()
 
+def _update_upload(db, id, name, content, filename):
+    cursor = db.cursor()
     try:
         cursor.execute("SELECT file_hash, file_original, url FROM images WHERE id = %s", (id,))
         result = cursor.fetchone()
@@ -69,9 +41,8 @@ async def update_file_metadata(
         new_file_name = old_filename
         new_url = old_url
 
-        if file:
-            content = await file.read()
-            ext = os.path.splitext(file.filename)[1]
+        if filename:
+            ext = os.path.splitext(filename)[1]
             new_filename = f"{file_hash}{ext}"
             file_path = os.path.join(UPLOAD_DIR, new_filename)
             new_url = f"http://localhost:8000/{UPLOAD_DIR}/{new_filename}"
@@ -79,7 +50,7 @@ async def update_file_metadata(
             with open(file_path, "wb") as f:
                 f.write(content)
 
-            new_file_name = file.filename
+            new_file_name = filename
 
         # Update DB record
         cursor.execute("""
@@ -87,29 +58,14 @@ async def update_file_metadata(
             SET name = %s, file_original = %s, url = %s
             WHERE id = %s
         """, (name, new_file_name, new_url, id))
-        conn.commit()
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        db.commit()
     finally:
         cursor.close()
-        conn.close()
+    return file_hash, new_file_name, new_url
 
-    return FileMetadata(
-        name=name,
-        file_hash=file_hash,
-        file_original=new_file_name,
-        url=new_url
-    )
-
-@router.delete("/upload/{id}", status_code=204)
-async def delete_file_by_id(
-    id: int = Path(..., description="ID of the image to delete"),
-    current_user: UserInDB = Depends(get_current_active_user)
-):
-    conn = mydb()
-    cursor = conn.cursor()
 
+def _delete_upload(db, id):
+    cursor = db.cursor()
     try:
         cursor.execute("SELECT file_hash, file_original FROM images WHERE id = %s", (id,))
         result = cursor.fetchone()
@@ -124,10 +80,68 @@ async def delete_file_by_id(
             os.remove(file_path)
 
         cursor.execute("DELETE FROM images WHERE id = %s", (id,))
-        conn.commit()
+        db.commit()
+    finally:
+        cursor.close()
 
+
+@router.post("/upload", response_model=FileMetadata)
+async def upload_file(
+    name: str = Form(...),
+    file: UploadFile = File(...),
+    current_user: UserInDB = Depends(get_current_active_user),
+    db=DbSession
+):
+    try:
+        content = await file.read()
+        file_hash = hash_filename(file.filename + str(uuid4()))
+        ext = os.path.splitext(file.filename)[1]
+        hashed_filename = f"{file_hash}{ext}"
+        file_path = os.path.join(UPLOAD_DIR, hashed_filename)
+        url_path = f"http://localhost:8000/{UPLOAD_DIR}/{hashed_filename}"
+
+        # Disk and database calls block; keep them off the event loop.
+        await run_in_threadpool(_store_upload, db, file_path, content, name, file_hash, file.filename, url_path)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        cursor.close()
-        conn.close()
\ No newline at end of file
+
+    return FileMetadata(
+        name=name,
+        file_hash=file_hash,
+        file_original=file.filename,
+        url=url_path
+    )
+
+@router.patch("/upload/{id}", response_model=FileMetadata)
+async def update_file_metadata(
+    id: int = Path(..., description="The ID of the image record in the database"),
+    name: str = Form(...),
+    file: UploadFile = File(None),
+    current_user: UserInDB = Depends(get_current_active_user),
+    db=DbSession
+):
+    try:
+        content = await file.read() if file else None
+        file_hash, new_file_name, new_url = await run_in_threadpool(
+            _update_upload, db, id, name, content, file.filename if file else None
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return FileMetadata(
+        name=name,
+        file_hash=file_hash,
+        file_original=new_file_name,
+        url=new_url
+    )
+
+@router.delete("/upload/{id}", status_code=204)
+async def delete_file_by_id(
+    id: int = Path(..., description="ID of the image to delete"),
+    current_user: UserInDB = Depends(get_current_active_user),
+    db=DbSession
+):
+    try:
+        await run_in_threadpool(_delete_upload, db, id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -1,65 +1,76 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Depends
+from config.connect_db import DbSession
 from services import group_service
 from model.group import Group, GroupUpdate, UserInDB
-from services.group_service import insert_users_from_csv, admin_required
+from services.group_service import admin_required
+from utils.response import success_response, error_response
+from utils.pagination import ListParams, list_params
+from utils.etag import conditional
 router = APIRouter()
 
-@router.get("/")
-def list_groups(current_user: UserInDB = Depends(admin_required)):
-    return group_service.get_all_groups()
+@router.get("/", dependencies=[Depends(conditional("group", per_user=False))])
+def list_groups(params: ListParams = Depends(list_params), current_user: UserInDB = Depends(admin_required), db=DbSession):
+    return group_service.get_all_groups(db, params)
 
-@router.get("/{group_uuid}")
-def get_group(group_uuid: str, current_user: UserInDB = Depends(admin_required)):
-    group = group_service.get_group_by_uuid(group_uuid)
+@router.get("/{group_uuid}", dependencies=[Depends(conditional("group", per_user=False))])
+def get_group(group_uuid: str, current_user: UserInDB = Depends(admin_required), db=DbSession):
+    group = group_service.get_group_by_uuid(group_uuid, db)
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
     return group
 
 @router.post("/")
-def create(group: Group, current_user: UserInDB = Depends(admin_required)):
-    return group_service.create_group(group)
+def create(group: Group, current_user: UserInDB = Depends(admin_required), db=DbSession):
+    return group_service.create_group(group, db)
 
 @router.patch("/{group_uuid}")
-def update(group_uuid: str, group: GroupUpdate, current_user: UserInDB = Depends(admin_required)):
-    if group_service.is_group_in_active_event(group_uuid):
+def update(group_uuid: str, group: GroupUpdate, current_user: UserInDB = Depends(admin_required), db=DbSession):
+    if group_service.is_group_in_active_event(group_uuid, db):
         raise HTTPException(
             status_code=403,
             detail="User Group cant be changed when the group used in event"
         )
-    return group_service.update_group(group_uuid, group)
+    return group_service.update_group(group_uuid, group, db)
 
 @router.delete("/{group_uuid}")
-def delete(group_uuid: str, current_user: UserInDB = Depends(admin_required)):
-    return group_service.delete_group(group_uuid)
+def delete(group_uuid: str, current_user: UserInDB = Depends(admin_required), db=DbSession):
+    return group_service.delete_group(group_uuid, db)
 
-@router.post("/upload/users/{group_uuid}")
-async def upload_users_from_csv_endpoint(
+@router.post("/upload/users/{group_uuid}", status_code=202)
+def upload_users_from_csv_endpoint(
     group_uuid: str,
     file: UploadFile = File(...),
-    current_user: UserInDB = Depends(admin_required)
+    current_user: UserInDB = Depends(admin_required),
+    db=DbSession
 ):
-    return insert_users_from_csv(file, group_uuid)
+    if not group_service.get_group_by_uuid(group_uuid, db)["success"]:
+        raise HTTPException(status_code=404, detail=error_response("Group not found"))
+    job = group_service.queue_csv_import(file, group_uuid, current_user)
+    return success_response("User import queued", {"job": job, "status_url": f"/api/v1/jobs/{job['id']}"})
 
 @router.post("/{group_uuid}/assign_user/{user_uuid}")
 def assign_user_to_group(
     group_uuid: str,
     user_uuid: str,
-    current_user: UserInDB = Depends(admin_required)
+    current_user: UserInDB = Depends(admin_required),
+    db=DbSession
 ):
-    return group_service.assign_user_to_group(group_uuid, user_uuid)
+    return group_service.assign_user_to_group(group_uuid, user_uuid, db)
 
 @router.delete("/{group_uuid}/remove_user/{user_uuid}")
 def remove_user_from_group(
     group_uuid: str,
     user_uuid: str,
-    current_user: UserInDB = Depends(admin_required)
+    current_user: UserInDB = Depends(admin_required),
+    db=DbSession
 ):
-    return group_service.remove_user_from_group(group_uuid, user_uuid)
+    return group_service.remove_user_from_group(group_uuid, user_uuid, db)
 
 @router.delete("/{group_uuid}/event/{event_uuid}")
 def unlink_group_from_event(
     group_uuid: str,
     event_uuid: str,
-    current_user: UserInDB = Depends(admin_required)
+    current_user: UserInDB = Depends(admin_required),
+    db=DbSession
 ):
-    return group_service.unlink_group_from_event(group_uuid, event_uuid)
+    return group_service.unlink_group_from_event(group_uuid, event_uuid, db)
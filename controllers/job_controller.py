@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, HTTPException
+from model.event import UserInDB
+from services import job_service
+from services.event_service import admin_required
+from utils.response import success_response, error_response
+
+router = APIRouter()
+
+@router.get("/{job_id}")
+def get_job(job_id: str, current_user: UserInDB = Depends(admin_required)):
+    job = job_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=error_response("Job not found"))
+    return success_response("Job fetched successfully", job)
+
+@router.delete("/{job_id}")
+def cancel_job(job_id: str, current_user: UserInDB = Depends(admin_required)):
+    job = job_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=error_response("Job not found"))
+    if job["status"] in job_service.FINISHED:
+        raise HTTPException(status_code=409, detail=error_response(f"Job already {job['status']}"))
+    return success_response("Job cancellation requested", job_service.cancel(job_id))
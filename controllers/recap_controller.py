@@ -1,28 +1,32 @@
 from fastapi import APIRouter, Depends
 from model.event import UserInDB
 from model.recap import Recap, RecapUpdate
+from config.connect_db import DbSession
 from services import recap_service
 from services.auth_service import get_current_active_user
 from services.event_service import admin_required
+from utils.pagination import ListParams, list_params
+from utils.response import FastJSONResponse
+from utils.etag import conditional
 
 router = APIRouter()
 
 @router.post("/")
-def create_recap(data: Recap, current_user: UserInDB = Depends(admin_required)):
-    return recap_service.create_recap(data)
+def create_recap(data: Recap, current_user: UserInDB = Depends(admin_required), db=DbSession):
+    return recap_service.create_recap(data, db)
 
-@router.get("/")
-def get_all_recaps(current_user: UserInDB = Depends(get_current_active_user)):
-    return recap_service.read_all_recaps()
+@router.get("/", dependencies=[Depends(conditional("recap", per_user=False))])
+def get_all_recaps(params: ListParams = Depends(list_params), current_user: UserInDB = Depends(get_current_active_user), db=DbSession):
+    return FastJSONResponse(recap_service.read_all_recaps(db, params))
 
-@router.get("/{recap_uuid}")
-def get_recap_by_uuid(recap_uuid: str, current_user: UserInDB = Depends(get_current_active_user)):
-    return recap_service.get_recap_by_uuid(recap_uuid)
+@router.get("/{recap_uuid}", dependencies=[Depends(conditional("recap", per_user=False))])
+def get_recap_by_uuid(recap_uuid: str, current_user: UserInDB = Depends(get_current_active_user), db=DbSession):
+    return recap_service.get_recap_by_uuid(recap_uuid, db)
 
 @router.patch("/{recap_uuid}")
-def update_recap(recap_uuid: str, update_data: RecapUpdate, current_user: UserInDB = Depends(admin_required)):
-    return recap_service.update_recap(recap_uuid, update_data)
+def update_recap(recap_uuid: str, update_data: RecapUpdate, current_user: UserInDB = Depends(admin_required), db=DbSession):
+    return recap_service.update_recap(recap_uuid, update_data, db)
 
 @router.delete("/{recap_uuid}")
-def delete_recap(recap_uuid: str, current_user: UserInDB = Depends(admin_required)):
-    return recap_service.delete_recap(recap_uuid)
+def delete_recap(recap_uuid: str, current_user: UserInDB = Depends(admin_required), db=DbSession):
+    return recap_service.delete_recap(recap_uuid, db)
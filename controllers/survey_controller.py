@@ -1,33 +1,44 @@
 from fastapi import APIRouter, Depends, HTTPException
 from model.survey import Survey, AssignSurveyToEvent, SurveyUpdate
 from model.event import UserInDB
+from config.connect_db import DbSession
 from services import survey_service
 from services.event_service import admin_required
 from fastapi.responses import FileResponse
 from services.auth_service import get_current_active_user
+from typing import Optional
+from utils.pagination import ListParams, list_params
+from utils.response import FastJSONResponse
+from utils.etag import conditional
 
 router = APIRouter()
 
-@router.get("/")
-def get_all_surveys(current_user: UserInDB = Depends(get_current_active_user)):
-    return survey_service.get_all_surveys(current_user)
+@router.get("/", dependencies=[Depends(conditional("survey", "event", "relation_event_survey", per_user=False))])
+def get_all_surveys(
+    status: Optional[str] = None,
+    params: ListParams = Depends(list_params),
+    current_user: UserInDB = Depends(get_current_active_user),
+    db=DbSession
+):
+    return FastJSONResponse(survey_service.get_all_surveys(current_user, db, params, status))
 
-@router.get("/{survey_uuid}")
-def get_survey_by_uuid(survey_uuid: str, current_user: UserInDB = Depends(get_current_active_user)):
-    return survey_service.get_survey_by_uuid(survey_uuid, current_user)
+@router.get("/{survey_uuid}", dependencies=[Depends(conditional("survey", "event", "relation_event_survey", per_user=False))])
+def get_survey_by_uuid(survey_uuid: str, current_user: UserInDB = Depends(get_current_active_user), db=DbSession):
+    return survey_service.get_survey_by_uuid(survey_uuid, current_user, db)
 
 @router.post("/")
-def create_survey(survey: Survey, current_user: UserInDB = Depends(admin_required)):
-    return survey_service.create_survey(survey)
+def create_survey(survey: Survey, current_user: UserInDB = Depends(admin_required), db=DbSession):
+    return survey_service.create_survey(survey, db)
 
 @router.post("/{event_uuid}/assign_survey")
-def assign_survey_to_event(event_uuid: str, payload: AssignSurveyToEvent, current_user: UserInDB = Depends(admin_required)):
-    return survey_service.assign_survey_to_event(event_uuid, payload.survey_uuid)
+def assign_survey_to_event(event_uuid: str, payload: AssignSurveyToEvent, current_user: UserInDB = Depends(admin_required), db=DbSession):
+    return survey_service.assign_survey_to_event(event_uuid, payload.survey_uuid, db)
 
 @router.patch("/{survey_uuid}")
 def update_survey_by_uuid(
     survey_uuid: str,
     update_data: SurveyUpdate,
-    current_user: UserInDB = Depends(admin_required)
+    current_user: UserInDB = Depends(admin_required),
+    db=DbSession
 ):
-    return survey_service.update_survey_by_uuid(survey_uuid, update_data)
\ No newline at end of file
+    return survey_service.update_survey_by_uuid(survey_uuid, update_data, db)
\ No newline at end of file
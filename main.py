@@ -1,10 +1,21 @@
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from controllers import auth_controller, file_controller, group_controller, event_controller, survey_controller
+from controllers import auth_controller, file_controller, group_controller, event_controller, survey_controller, job_controller
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+import anyio
+from config.connect_db import get_pool, PoolTimeoutError
+from config.env import DB_AUTO_MIGRATE, METRICS_ENABLED, COMPRESSION_ENABLED
+from migrations.runner import migrate
+from services import bundle_service, hash_service, job_service, status_scheduler
+from services.hash_service import HashServiceBusy
+from utils import metrics
+from utils.compression import CompressionMiddleware
+from utils.etag import ConditionalGetMiddleware, NotModified
+from utils.response import FastJSONResponse
+from utils.query_stats import QueryStatsMiddleware
 
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
 
 origins = [
     'http://localhost:3000',  
@@ -22,15 +33,69 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(ConditionalGetMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+if METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
 
 app.include_router(auth_controller.router, prefix="/api/v1")
 app.include_router(file_controller.router, prefix="/api/v1/images")
 app.include_router(group_controller.router, prefix="/api/v1/groups")
 app.include_router(event_controller.router, prefix="/api/v1/events")
 app.include_router(survey_controller.router, prefix="/api/v1/survey")
+app.include_router(job_controller.router, prefix="/api/v1/jobs")
+
+if METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def get_metrics():
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        threadpool = {"busy": limiter.borrowed_tokens, "limit": limiter.total_tokens}
+        return PlainTextResponse(metrics.render(threadpool), media_type=metrics.CONTENT_TYPE)
 
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
+@app.on_event("startup")
+def on_startup():
+    if DB_AUTO_MIGRATE:
+        migrate(log=lambda message: None)
+    try:
+        get_pool().warm()
+    except Exception:
+        # The pool fills lazily once the database becomes reachable.
+        pass
+    job_service.start()
+    status_scheduler.start()
+
+@app.on_event("shutdown")
+def on_shutdown():
+    status_scheduler.shutdown()
+    get_pool().close()
+    hash_service.shutdown()
+    job_service.shutdown()
+    bundle_service.shutdown()
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    return JSONResponse(
+        status_code=503,
+        content={"success": False, "message": str(exc)},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(HashServiceBusy)
+async def hash_busy_handler(request: Request, exc: HashServiceBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"success": False, "message": str(exc)},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(NotModified)
+async def not_modified_handler(request: Request, exc: NotModified):
+    return Response(status_code=304, headers={"ETag": exc.etag, "Cache-Control": "private, no-cache"})
+
 @app.exception_handler(HTTPException)
 async def custom_http_exception_handler(request: Request, exc: HTTPException):
     return JSONResponse(
@@ -0,0 +1,272 @@
+"""Run EXPLAIN on every query in the services and fail on full table scans.
+
+Usage:
+    python -m migrations.explain_check          # needs a migrated database
+    python -m migrations.explain_check --list   # only print the extracted queries
+
+Queries are extracted statically: every ``cursor.execute(...)`` whose SQL is a
+string literal, an f-string or a name assigned from one. Placeholder lists
+(``', '.join(['%s'] * n)``) render as a single ``%s``, ``params.order_by(...)``
+renders through the real pagination helper and ``where(...)`` renders empty, i.e.
+as the first page of a listing. A query that cannot be rendered, or whose
+EXPLAIN fails, counts as a failure unless it is allowlisted.
+
+Plans depend on table statistics, so run this against a database holding
+representative data rather than an empty schema. Accepted scans are listed in
+explain_allowlist.txt as ``path::function::table`` (``*`` matches any table);
+queries accepted without a plan as ``path::function::UNEXPLAINED``.
+"""
+import argparse
+import ast
+import os
+import re
+import sys
+from glob import glob
+
+from config.connect_db import mydb
+from config.env import DB_BACKEND
+from utils.pagination import ListParams
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCES = ("services/*.py", "controllers/*.py")
+# These talk to local SQLite stores, not to the application database.
+EXCLUDE = ("services/job_service.py", "services/token_blacklist.py")
+ALLOWLIST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "explain_allowlist.txt")
+
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|UPDATE|DELETE|INSERT\s+INTO\s+\S+\s*(\([^)]*\))?\s*SELECT)\b", re.I | re.S)
+_PARAM = re.compile(r"%s")
+
+
+class Unrenderable(Exception):
+    pass
+
+
+class Query:
+    def __init__(self, path: str, function: str, lineno: int, sql: str = None, reason: str = None):
+        self.path = path
+        self.function = function
+        self.lineno = lineno
+        self.sql = sql
+        self.reason = reason
+
+    @property
+    def location(self) -> str:
+        return f"{self.path}:{self.lineno} ({self.function})"
+
+
+def _assignments(body) -> dict:
+    """name -> [(lineno, value node)] for every simple or tuple assignment in ``body``."""
+    names = {}
+    for node in body:
+        for child in ast.walk(node):
+            if isinstance(child, ast.Assign):
+                for target in child.targets:
+                    if isinstance(target, ast.Name):
+                        names.setdefault(target.id, []).append((child.lineno, child.value))
+                    elif isinstance(target, ast.Tuple) and isinstance(target.elts[0], ast.Name):
+                        # ``sql, values = params.order_by(...)`` binds the first element.
+                        names.setdefault(target.elts[0].id, []).append((child.lineno, child.value))
+    for entries in names.values():
+        entries.sort(key=lambda entry: entry[0])
+    return names
+
+
+class _Renderer:
+    def __init__(self, module_names: dict, local_names: dict):
+        self.module_names = module_names
+        self.local_names = local_names
+
+    def render(self, node, lineno: int) -> str:
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            return node.value
+        if isinstance(node, ast.JoinedStr):
+            parts = []
+            for value in node.values:
+                if isinstance(value, ast.Constant):
+                    parts.append(value.value)
+                else:
+                    parts.append(self.render_expression(value.value, lineno))
+            return "".join(parts)
+        if isinstance(node, ast.Name):
+            return self.render(*self.resolve(node.id, lineno))
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "order_by":
+            return self.render_order_by(node)
+        raise Unrenderable(ast.unparse(node))
+
+    def render_expression(self, node, lineno: int) -> str:
+        source = ast.unparse(node)
+        if "'%s'" in source or '"%s"' in source or re.search(r"placeholder|marks", source):
+            return "%s"
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "where":
+            return ""
+        if isinstance(node, ast.Subscript) and isinstance(node.value, ast.Call):
+            return self.render(node.value, lineno)
+        if isinstance(node, ast.Name):
+            return self.render(*self.resolve(node.id, lineno))
+        raise Unrenderable(source)
+
+    def render_order_by(self, call: ast.Call) -> str:
+        try:
+            args = [ast.literal_eval(arg) for arg in call.args]
+            kwargs = {kw.arg: ast.literal_eval(kw.value) for kw in call.keywords}
+        except ValueError:
+            raise Unrenderable(ast.unparse(call))
+        return ListParams().order_by(*args, **kwargs)[0]
+
+    def resolve(self, name: str, lineno: int) -> tuple:
+        """Latest assignment of ``name`` before ``lineno`` as ``(value, line)``.
+
+        The value is rendered at its own line, so ``sql = f"{sql} ..."`` sees the
+        earlier ``sql``. Module constants are visible from every line.
+        """
+        candidates = [entry for entry in self.local_names.get(name, ()) if entry[0] < lineno]
+        if not candidates:
+            candidates = self.module_names.get(name)
+        if not candidates:
+            raise Unrenderable(name)
+        line, value = candidates[-1]
+        return value, line
+
+
+def extract(path: str) -> list:
+    with open(os.path.join(ROOT, path), encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    module_names = _assignments([n for n in tree.body if isinstance(n, ast.Assign)])
+    queries = []
+    for function in ast.walk(tree):
+        if not isinstance(function, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        renderer = _Renderer(module_names, _assignments(function.body))
+        for call in ast.walk(function):
+            if not (
+                isinstance(call, ast.Call)
+                and isinstance(call.func, ast.Attribute)
+                and call.func.attr in ("execute", "executemany")
+                and call.args
+            ):
+                continue
+            try:
+                sql = renderer.render(call.args[0], call.lineno)
+            except Unrenderable as e:
+                queries.append(Query(path, function.name, call.lineno, reason=f"dynamic SQL: {e}"))
+                continue
+            queries.append(Query(path, function.name, call.lineno, sql=sql))
+    return queries
+
+
+def _literal(sql: str, match: re.Match) -> str:
+    before = sql[:match.start()].rstrip()
+    if re.search(r"\b(LIMIT|OFFSET)$", before, re.I):
+        return "1"
+    column = re.search(r"(\w+)\s*(=|<=|>=|<>|!=|<|>)$", before)
+    if column and (column.group(1).endswith("_at") or column.group(1).startswith("time")):
+        return "'2000-01-01 00:00:00'"
+    return "'1'"
+
+
+def bind(sql: str) -> str:
+    """Substitute representative literals for the ``%s`` placeholders."""
+    return _PARAM.sub(lambda match: _literal(sql, match), sql)
+
+
+def load_allowlist(path: str = ALLOWLIST) -> set:
+    entries = set()
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.split("#", 1)[0].strip()
+                if line:
+                    entries.add(line)
+    return entries
+
+
+UNEXPLAINED = "UNEXPLAINED"
+
+
+def _allowed(allowlist: set, query: Query, table: str) -> bool:
+    return f"{query.path}::{query.function}::{table}" in allowlist or f"{query.path}::{query.function}::*" in allowlist
+
+
+def full_scans(cursor, sql: str) -> list:
+    """Tables (or aliases) the plan reads in full, derived tables excluded."""
+    if DB_BACKEND == "sqlite":
+        cursor.execute("EXPLAIN QUERY PLAN " + sql)
+        details = [row["detail"] for row in cursor.fetchall()]
+        derived = {d.split()[1] for d in details if re.match(r"(CO-ROUTINE|MATERIALIZE) ", d)}
+        return [
+            d.split()[1] for d in details
+            if re.match(r"SCAN \S+$", d) and d.split()[1] not in derived
+        ]
+    cursor.execute("EXPLAIN " + sql)
+    return [
+        str(row["table"]) for row in cursor.fetchall()
+        if row.get("type") == "ALL" and not str(row.get("table") or "").startswith("<")
+    ]
+
+
+def check(queries: list, db=None, allowlist: set = None, log=print) -> int:
+    allowlist = load_allowlist() if allowlist is None else allowlist
+    db = db or mydb()
+    cursor = db.cursor(dictionary=True)
+    failures = 0
+    try:
+        for query in queries:
+            if query.sql is not None and not _EXPLAINABLE.match(query.sql):
+                continue
+            reason = query.reason
+            if query.sql is not None:
+                try:
+                    scans = [
+                        table for table in full_scans(cursor, bind(query.sql))
+                        if not _allowed(allowlist, query, table)
+                    ]
+                except Exception as e:
+                    reason = f"EXPLAIN failed: {e}"
+            if reason is not None:
+                # ``*`` does not cover these: a query nobody looked at must be listed by name.
+                if f"{query.path}::{query.function}::{UNEXPLAINED}" in allowlist:
+                    log(f"SKIP  {query.location}: {reason} (allowlisted)")
+                else:
+                    failures += 1
+                    log(f"FAIL  {query.location}: not explained, {reason}")
+                continue
+            if scans:
+                failures += 1
+                tables = ", ".join(scans)
+                log(f"FAIL  {query.location}: full scan of {tables}\n      {' '.join(query.sql.split())}")
+            else:
+                log(f"ok    {query.location}")
+    finally:
+        cursor.close()
+        db.close()
+    return failures
+
+
+def collect() -> list:
+    queries = []
+    for pattern in SOURCES:
+        for path in sorted(glob(os.path.join(ROOT, pattern))):
+            path = os.path.relpath(path, ROOT)
+            if path not in EXCLUDE:
+                queries.extend(extract(path))
+    return queries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--list", action="store_true", help="print the extracted queries without connecting")
+    args = parser.parse_args(argv)
+
+    queries = collect()
+    if args.list:
+        for query in queries:
+            print(f"{query.location}: {' '.join(bind(query.sql).split()) if query.sql else 'SKIP ' + query.reason}")
+        return 0
+
+    failures = check(queries)
+    print(f"{len(queries)} queries checked, {failures} with full table scans or no plan")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
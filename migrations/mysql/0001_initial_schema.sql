@@ -0,0 +1,139 @@
+-- Baseline schema. Databases created before migrations existed can be marked
+-- as being at this version with `python -m migrations.runner --baseline 1`.
+
+CREATE TABLE IF NOT EXISTS user (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    uuid CHAR(36) NOT NULL,
+    username VARCHAR(100) NOT NULL,
+    email VARCHAR(255) NOT NULL,
+    password VARCHAR(255) NOT NULL,
+    role VARCHAR(20) NOT NULL DEFAULT 'user',
+    status TINYINT NOT NULL DEFAULT 1,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS `group` (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    uuid CHAR(36) NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    description TEXT,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS event (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    uuid CHAR(36) NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    time_start DATETIME NULL,
+    time_end DATETIME NULL,
+    description TEXT,
+    status VARCHAR(20) NOT NULL DEFAULT 'archived',
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS survey (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    uuid CHAR(36) NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    form LONGTEXT,
+    status VARCHAR(20) NOT NULL DEFAULT 'active',
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS answers (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    uuid CHAR(36) NOT NULL,
+    answer_data LONGTEXT,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS recap (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    uuid CHAR(36) NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    summarize LONGTEXT,
+    history_chat LONGTEXT,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS images (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    file_hash VARCHAR(64) NOT NULL,
+    file_original VARCHAR(255) NOT NULL,
+    url VARCHAR(512) NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS survey_answer (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    survey_id INT NOT NULL,
+    group_id INT NOT NULL,
+    user_id INT NOT NULL,
+    answer_data LONGTEXT,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS relation_group_user (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    groupid INT NOT NULL,
+    userid INT NOT NULL,
+    FOREIGN KEY (groupid) REFERENCES `group` (id) ON DELETE CASCADE,
+    FOREIGN KEY (userid) REFERENCES user (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS relation_group_event (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    groupid INT NOT NULL,
+    eventid INT NOT NULL,
+    FOREIGN KEY (groupid) REFERENCES `group` (id) ON DELETE CASCADE,
+    FOREIGN KEY (eventid) REFERENCES event (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS relation_user_event (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    userid INT NOT NULL,
+    eventid INT NOT NULL,
+    FOREIGN KEY (userid) REFERENCES user (id) ON DELETE CASCADE,
+    FOREIGN KEY (eventid) REFERENCES event (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS relation_event_survey (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    eventid INT NOT NULL,
+    surveyid INT NOT NULL,
+    FOREIGN KEY (eventid) REFERENCES event (id) ON DELETE CASCADE,
+    FOREIGN KEY (surveyid) REFERENCES survey (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS relation_answer_events (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    answerid INT NOT NULL,
+    eventid INT NOT NULL,
+    FOREIGN KEY (answerid) REFERENCES answers (id) ON DELETE CASCADE,
+    FOREIGN KEY (eventid) REFERENCES event (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS relation_answer_group (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    answerid INT NOT NULL,
+    groupid INT NOT NULL,
+    FOREIGN KEY (answerid) REFERENCES answers (id) ON DELETE CASCADE,
+    FOREIGN KEY (groupid) REFERENCES `group` (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS relation_answer_user (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    answerid INT NOT NULL,
+    userid INT NOT NULL,
+    FOREIGN KEY (answerid) REFERENCES answers (id) ON DELETE CASCADE,
+    FOREIGN KEY (userid) REFERENCES user (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
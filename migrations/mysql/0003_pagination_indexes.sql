@@ -0,0 +1,15 @@
+-- Keyset pagination of the list endpoints:
+-- ORDER BY created_at DESC, id DESC, optionally filtered by status.
+
+CREATE INDEX idx_event_created ON event (created_at, id);
+CREATE INDEX idx_event_status_created ON event (status, created_at, id);
+
+CREATE INDEX idx_survey_created ON survey (created_at, id);
+CREATE INDEX idx_survey_status_created ON survey (status, created_at, id);
+
+CREATE INDEX idx_user_created ON user (created_at, id);
+CREATE INDEX idx_user_status_created ON user (status, created_at, id);
+
+CREATE INDEX idx_group_created ON `group` (created_at, id);
+CREATE INDEX idx_recap_created ON recap (created_at, id);
+CREATE INDEX idx_answers_created ON answers (created_at, id);
@@ -0,0 +1,18 @@
+-- Events each user can see through their groups, i.e. the pairs of
+-- relation_group_user joined to relation_group_event. Kept in step by
+-- services/access_service.py whenever either relation changes, so a member's
+-- event listing is one primary-key range instead of a join per request.
+
+CREATE TABLE user_event_access (
+    userid INT NOT NULL,
+    eventid INT NOT NULL,
+    PRIMARY KEY (userid, eventid),
+    KEY idx_user_event_access_event (eventid, userid),
+    FOREIGN KEY (userid) REFERENCES user (id) ON DELETE CASCADE,
+    FOREIGN KEY (eventid) REFERENCES event (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+INSERT INTO user_event_access (userid, eventid)
+SELECT DISTINCT rgu.userid, rge.eventid
+FROM relation_group_user rgu
+JOIN relation_group_event rge ON rge.groupid = rgu.groupid;
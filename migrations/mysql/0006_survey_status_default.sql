@@ -0,0 +1,7 @@
+-- Surveys only ever move between 'ongoing' (with their event) and 'done' (after
+-- it); the 'active' default from 0001 matched nothing the services look for, so
+-- such surveys were never shown to members nor closed by the scheduler.
+
+ALTER TABLE survey ALTER COLUMN status SET DEFAULT 'ongoing';
+UPDATE survey SET status = 'ongoing' WHERE status = 'active';
+UPDATE data_version SET version = version + 1 WHERE name = 'survey';
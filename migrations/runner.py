@@ -0,0 +1,223 @@
+"""Apply the versioned SQL migrations in migrations/<backend>/.
+
+Usage:
+    python -m migrations.runner             # apply pending migrations
+    python -m migrations.runner --status    # list applied and pending versions
+    python -m migrations.runner --baseline 1  # mark 0001..0001 as applied without running them
+
+Files are named ``NNNN_description.sql`` and hold ``;``-terminated statements.
+Applied versions are recorded in ``schema_migrations`` together with a checksum,
+so editing a migration after it ran is reported instead of silently ignored.
+
+A ``-- require-empty: SELECT ...`` line is a precondition: the query runs before
+any statement of the migration, and if it returns rows the migration is aborted
+with those rows in the error, e.g. duplicates that would break a unique index.
+"""
+import argparse
+import hashlib
+import os
+import re
+import sys
+from datetime import datetime
+
+from config.connect_db import mydb
+from config.env import DB_BACKEND
+
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+_FILENAME = re.compile(r"^(\d{4})_(\w+)\.sql$")
+_TRIGGER = re.compile(r"^\s*CREATE\s+TRIGGER\b", re.I)
+_REQUIRE_EMPTY = re.compile(r"^\s*--\s*require-empty:\s*(.+?);?\s*$")
+_REPORT_ROWS = 20
+
+
+class MigrationError(Exception):
+    pass
+
+
+class Migration:
+    def __init__(self, version: int, name: str, path: str):
+        self.version = version
+        self.name = name
+        self.path = path
+        with open(path, encoding="utf-8") as f:
+            self.sql = f.read()
+        self.checksum = hashlib.sha256(self.sql.encode()).hexdigest()
+
+    def preconditions(self) -> list:
+        return [match.group(1) for match in map(_REQUIRE_EMPTY.match, self.sql.splitlines()) if match]
+
+    def statements(self) -> list:
+        lines = [line for line in self.sql.splitlines() if not line.strip().startswith("--")]
+        statements, buffer = [], ""
+        for part in "\n".join(lines).split(";"):
+            buffer = f"{buffer};{part}" if buffer else part
+            # Trigger bodies contain ``;`` themselves and run until END.
+            if _TRIGGER.match(buffer) and not re.search(r"\bEND\s*$", buffer, re.I):
+                continue
+            if buffer.strip():
+                statements.append(buffer.strip())
+            buffer = ""
+        return statements
+
+
+def discover(backend: str = DB_BACKEND) -> list:
+    directory = os.path.join(MIGRATIONS_DIR, backend)
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        match = _FILENAME.match(filename)
+        if match:
+            migrations.append(Migration(int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise MigrationError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+def _ensure_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            applied_at DATETIME NOT NULL
+        )
+    """)
+
+
+def applied_versions(db) -> dict:
+    cursor = db.cursor()
+    try:
+        _ensure_table(cursor)
+        cursor.execute("SELECT version, checksum FROM schema_migrations ORDER BY version")
+        return {version: checksum for version, checksum in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def _record(cursor, migration: Migration):
+    cursor.execute(
+        "INSERT INTO schema_migrations (version, name, checksum, applied_at) VALUES (%s, %s, %s, %s)",
+        (migration.version, migration.name, migration.checksum, datetime.now()),
+    )
+
+
+def _check_preconditions(cursor, migration: Migration):
+    for query in migration.preconditions():
+        cursor.execute(query)
+        rows = cursor.fetchall()
+        if rows:
+            report = "\n".join(f"  {tuple(row)}" for row in rows[:_REPORT_ROWS])
+            more = "\n  ..." if len(rows) > _REPORT_ROWS else ""
+            raise MigrationError(
+                f"{os.path.basename(migration.path)}: fix these rows before migrating\n{query}\n{report}{more}"
+            )
+
+
+def migrate(db=None, backend: str = DB_BACKEND, target: int = None, log=print) -> list:
+    """Apply pending migrations up to ``target`` (default: all) and return their versions.
+
+    MySQL commits DDL implicitly, so each migration is recorded right after its
+    last statement; a failure leaves the earlier migrations applied. On SQLite
+    the whole run is one transaction holding the write lock, so worker processes
+    starting together apply each migration exactly once.
+    """
+    db = db or mydb()
+    transactional = backend == "sqlite"
+    try:
+        if transactional:
+            lock = db.cursor()
+            lock.execute("BEGIN IMMEDIATE")
+            lock.close()
+        applied = applied_versions(db)
+        done = []
+        cursor = db.cursor()
+        try:
+            for migration in discover(backend):
+                if target is not None and migration.version > target:
+                    break
+                if migration.version in applied:
+                    if applied[migration.version] != migration.checksum:
+                        log(f"warning: {os.path.basename(migration.path)} changed after it was applied")
+                    continue
+                log(f"applying {os.path.basename(migration.path)}")
+                _check_preconditions(cursor, migration)
+                for statement in migration.statements():
+                    try:
+                        cursor.execute(statement)
+                    except Exception as e:
+                        raise MigrationError(f"{os.path.basename(migration.path)}: {e}\n{statement}") from e
+                _record(cursor, migration)
+                if not transactional:
+                    db.commit()
+                done.append(migration.version)
+            db.commit()
+        finally:
+            cursor.close()
+        return done
+    finally:
+        db.close()
+
+
+def baseline(version: int, db=None, backend: str = DB_BACKEND, log=print) -> list:
+    """Mark migrations up to ``version`` as applied without running them."""
+    db = db or mydb()
+    try:
+        applied = applied_versions(db)
+        cursor = db.cursor()
+        marked = []
+        try:
+            for migration in discover(backend):
+                if migration.version > version:
+                    break
+                if migration.version not in applied:
+                    _record(cursor, migration)
+                    marked.append(migration.version)
+                    log(f"baselined {os.path.basename(migration.path)}")
+            db.commit()
+        finally:
+            cursor.close()
+        return marked
+    finally:
+        db.close()
+
+
+def status(db=None, backend: str = DB_BACKEND) -> list:
+    db = db or mydb()
+    try:
+        applied = applied_versions(db)
+    finally:
+        db.close()
+    return [
+        (migration, migration.version in applied, applied.get(migration.version, migration.checksum) != migration.checksum)
+        for migration in discover(backend)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default=DB_BACKEND)
+    parser.add_argument("--target", type=int, help="stop after this version")
+    parser.add_argument("--baseline", type=int, metavar="VERSION", help="mark versions up to VERSION as applied")
+    parser.add_argument("--status", action="store_true", help="show applied and pending migrations")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.status:
+            for migration, is_applied, changed in status(backend=args.backend):
+                state = "applied" if is_applied else "pending"
+                if changed:
+                    state += " (changed since applied)"
+                print(f"{migration.version:04d} {migration.name:<30} {state}")
+        elif args.baseline is not None:
+            baseline(args.baseline, backend=args.backend)
+        else:
+            done = migrate(backend=args.backend, target=args.target)
+            print(f"{len(done)} migration(s) applied")
+    except MigrationError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
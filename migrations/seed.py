@@ -0,0 +1,334 @@
+"""Fill a migrated database with synthetic data at production-like volumes.
+
+Usage:
+    python -m migrations.seed                                  # defaults below
+    python -m migrations.seed --users 100000 --answers 1000000 --groups 2000
+    python -m migrations.seed --scale 0.1 --seed 7             # every size x0.1
+
+Rows are written with multi-row INSERTs of --batch rows and explicit ids, so
+relations are generated without reading anything back and a million answers
+load in well under a minute. Ids continue after the current MAX(id) of each
+table, so running the generator twice adds a second dataset next to the first.
+
+Sizes are skewed the way real installations are: group popularity follows a
+Zipf distribution (--skew), so a few groups hold most users and events while
+the long tail has a handful each. All accounts share one password (--password);
+``seed_superadmin`` and ``seed_admin<N>`` are created next to ``seed_user<N>``
+(later runs prefix the names with the first new user id).
+"""
+import argparse
+import bisect
+import itertools
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from config.connect_db import mydb
+from config.env import DB_BACKEND
+from utils import data_version
+from utils.security import pwd_context
+
+DEFAULTS = {
+    "users": 10_000,
+    "admins": 10,
+    "groups": 500,
+    "events": 2_000,
+    "surveys": 2_000,
+    "answers": 100_000,
+    "survey_answers": 100_000,
+    "recaps": 1_000,
+}
+_WORDS = (
+    "event survey group answer score feedback session speaker venue schedule question rating "
+    "attendance summary topic follow-up improvement suggestion participant organizer"
+).split()
+
+
+class Sizes:
+    def __init__(self, **sizes):
+        for name, default in DEFAULTS.items():
+            setattr(self, name, int(sizes.get(name, default)))
+
+    def scaled(self, factor: float) -> "Sizes":
+        return Sizes(**{name: max(1, round(getattr(self, name) * factor)) for name in DEFAULTS})
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in DEFAULTS}
+
+
+class _Weighted:
+    """Draw indexes ``0..n-1`` with probability proportional to ``1 / (i + 1) ** skew``."""
+
+    def __init__(self, n: int, skew: float, rng: random.Random):
+        self.rng = rng
+        self.cum = list(itertools.accumulate(1 / (i + 1) ** skew for i in range(n)))
+
+    def draw(self) -> int:
+        return bisect.bisect_left(self.cum, self.rng.random() * self.cum[-1])
+
+    def distinct(self, k: int) -> list:
+        chosen = set()
+        for _ in range(k * 4):
+            chosen.add(self.draw())
+            if len(chosen) >= k:
+                break
+        return sorted(chosen)
+
+
+def _next_id(cursor, table: str) -> int:
+    cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+    return cursor.fetchone()[0] + 1
+
+
+def _insert(cursor, table: str, columns: tuple, rows, batch: int) -> int:
+    """Insert ``rows`` (any iterable of tuples) with one statement per ``batch`` rows."""
+    row_marks = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    head = f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+    rows = iter(rows)
+    total = 0
+    while True:
+        chunk = list(itertools.islice(rows, batch))
+        if not chunk:
+            return total
+        cursor.execute(head + ", ".join([row_marks] * len(chunk)), [value for row in chunk for value in row])
+        total += len(chunk)
+
+
+def _event_status(start: datetime, end: datetime, now: datetime, rng: random.Random) -> str:
+    if rng.random() < 0.1:
+        return "archived"
+    if end < now:
+        return "done"
+    return "ongoing" if start <= now else "published"
+
+
+def generate(
+    sizes: Sizes = None,
+    db=None,
+    seed: int = 1,
+    skew: float = 1.1,
+    days: int = 365,
+    password: str = "password",
+    batch: int = 1000,
+    log=print,
+) -> dict:
+    """Write one synthetic dataset and return the ids and names it created."""
+    sizes = sizes or Sizes()
+    rng = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    hashed = pwd_context.hash(password)
+    db = db or mydb()
+    cursor = db.cursor()
+
+    def created_at() -> datetime:
+        return now - timedelta(seconds=rng.randrange(days * 86400))
+
+    def step(name: str, rows: int, started: float):
+        db.commit()
+        log(f"{name:<22}{rows:>10} rows  {time.perf_counter() - started:6.1f}s")
+
+    try:
+        if DB_BACKEND == "mysql":
+            cursor.execute("SET SESSION unique_checks = 0, foreign_key_checks = 0")
+
+        # Users: regular accounts first, then admins and one superadmin.
+        started = time.perf_counter()
+        first_user = _next_id(cursor, "user")
+        prefix = "seed_" if first_user == 1 else f"seed{first_user}_"
+        accounts = [(f"{prefix}user{i}", "user") for i in range(sizes.users)]
+        accounts += [(f"{prefix}admin{i}", "admin") for i in range(sizes.admins)]
+        accounts.append((f"{prefix}superadmin", "superadmin"))
+        _insert(cursor, "user", ("id", "uuid", "username", "email", "password", "role", "status", "created_at", "updated_at"), (
+            (first_user + i, str(uuid.uuid4()), name, f"{name}@example.com", hashed, role, 1, stamp, stamp)
+            for i, (name, role) in enumerate(accounts)
+            for stamp in (created_at(),)
+        ), batch)
+        user_ids = list(range(first_user, first_user + sizes.users))
+        admin_ids = list(range(first_user + sizes.users, first_user + sizes.users + sizes.admins))
+        step("user", len(accounts), started)
+
+        started = time.perf_counter()
+        first_group = _next_id(cursor, "`group`")
+        group_uuids = [str(uuid.uuid4()) for _ in range(sizes.groups)]
+        _insert(cursor, "`group`", ("id", "uuid", "name", "description", "created_at", "updated_at"), (
+            (first_group + i, group_uuids[i], f"{prefix}group{i}", "synthetic group", stamp, stamp)
+            for i in range(sizes.groups)
+            for stamp in (created_at(),)
+        ), batch)
+        group_ids = list(range(first_group, first_group + sizes.groups))
+        step("group", sizes.groups, started)
+
+        # Membership: every user joins 1-3 groups drawn from the skewed distribution,
+        # so group 0 ends up with a large share of all users.
+        started = time.perf_counter()
+        popularity = _Weighted(sizes.groups, skew, rng)
+        members = [[] for _ in group_ids]
+        for user_id in user_ids:
+            for index in popularity.distinct(rng.choice((1, 1, 1, 2, 2, 3))):
+                members[index].append(user_id)
+        memberships = _insert(cursor, "relation_group_user", ("groupid", "userid"), (
+            (group_ids[index], user_id) for index, users in enumerate(members) for user_id in users
+        ), batch)
+        step("relation_group_user", memberships, started)
+
+        started = time.perf_counter()
+        first_event = _next_id(cursor, "event")
+        events = []
+        for i in range(sizes.events):
+            start = now + timedelta(seconds=rng.randrange(-days * 86400, 60 * 86400))
+            end = start + timedelta(hours=rng.choice((2, 8, 24, 72, 168)))
+            events.append((first_event + i, str(uuid.uuid4()), f"{prefix}event{i}", start, end,
+                           "synthetic event", _event_status(start, end, now, rng), created_at()))
+        _insert(cursor, "event", ("id", "uuid", "name", "time_start", "time_end", "description", "status", "created_at", "updated_at"), (
+            (*event, event[-1]) for event in events
+        ), batch)
+        event_ids = [event[0] for event in events]
+        step("event", sizes.events, started)
+
+        started = time.perf_counter()
+        event_groups = [popularity.distinct(rng.randint(1, 4)) for _ in events]
+        links = _insert(cursor, "relation_group_event", ("groupid", "eventid"), (
+            (group_ids[index], event_id) for event_id, indexes in zip(event_ids, event_groups) for index in indexes
+        ), batch)
+        step("relation_group_event", links, started)
+
+        if admin_ids:
+            started = time.perf_counter()
+            owners = _insert(cursor, "relation_user_event", ("userid", "eventid"), (
+                (rng.choice(admin_ids), event_id) for event_id in event_ids
+            ), batch)
+            step("relation_user_event", owners, started)
+
+        started = time.perf_counter()
+        cursor.execute("""
+            INSERT INTO user_event_access (userid, eventid)
+            SELECT DISTINCT rgu.userid, rge.eventid FROM relation_group_event rge
+            JOIN relation_group_user rgu ON rge.groupid = rgu.groupid
+            WHERE rge.eventid >= %s
+        """, (first_event,))
+        step("user_event_access", cursor.rowcount, started)
+
+        started = time.perf_counter()
+        first_survey = _next_id(cursor, "survey")
+        survey_events = [rng.randrange(len(events)) for _ in range(sizes.surveys)]
+        form = json.dumps({"questions": [{"id": f"q{i}", "type": "scale", "max": 5} for i in range(5)]})
+        _insert(cursor, "survey", ("id", "uuid", "name", "form", "status", "created_at", "updated_at"), (
+            (first_survey + i, str(uuid.uuid4()), f"{prefix}survey{i}", form,
+             "done" if events[index][6] == "done" else "ongoing", events[index][7], events[index][7])
+            for i, index in enumerate(survey_events)
+        ), batch)
+        survey_ids = list(range(first_survey, first_survey + sizes.surveys))
+        _insert(cursor, "relation_event_survey", ("eventid", "surveyid"), (
+            (event_ids[index], survey_id) for survey_id, index in zip(survey_ids, survey_events)
+        ), batch)
+        step("survey", sizes.surveys, started)
+
+        def respondent(event_index: int) -> tuple:
+            index = rng.choice(event_groups[event_index])
+            users = members[index] or user_ids
+            return group_ids[index], rng.choice(users)
+
+        # Answers follow event popularity too: events of big groups collect most of them.
+        started = time.perf_counter()
+        first_answer = _next_id(cursor, "answers")
+        event_popularity = _Weighted(len(events), skew / 2, rng)
+        for offset in range(0, sizes.answers, batch):
+            rows = []
+            for answer_id in range(first_answer + offset, first_answer + min(offset + batch, sizes.answers)):
+                event_index = event_popularity.draw()
+                group_id, user_id = respondent(event_index)
+                stamp = events[event_index][3] + timedelta(seconds=rng.randrange(3600))
+                rows.append((answer_id, event_ids[event_index], group_id, user_id, stamp))
+            _insert(cursor, "answers", ("id", "uuid", "answer_data", "created_at", "updated_at"), (
+                (answer_id, str(uuid.uuid4()), json.dumps({"q0": rng.randint(1, 5)}), stamp, stamp)
+                for answer_id, _, _, _, stamp in rows
+            ), batch)
+            _insert(cursor, "relation_answer_events", ("answerid", "eventid"), ((r[0], r[1]) for r in rows), batch)
+            _insert(cursor, "relation_answer_group", ("answerid", "groupid"), ((r[0], r[2]) for r in rows), batch)
+            _insert(cursor, "relation_answer_user", ("answerid", "userid"), ((r[0], r[3]) for r in rows), batch)
+        step("answers", sizes.answers, started)
+
+        started = time.perf_counter()
+        survey_popularity = _Weighted(sizes.surveys, skew / 2, rng)
+
+        def survey_answers():
+            for _ in range(sizes.survey_answers):
+                index = survey_popularity.draw()
+                group_id, user_id = respondent(survey_events[index])
+                stamp = created_at()
+                yield survey_ids[index], group_id, user_id, json.dumps({"q0": rng.randint(1, 5)}), stamp, stamp
+
+        _insert(cursor, "survey_answer", ("survey_id", "group_id", "user_id", "answer_data", "created_at", "updated_at"),
+                survey_answers(), batch)
+        step("survey_answer", sizes.survey_answers, started)
+
+        started = time.perf_counter()
+        # Recaps keep the whole chat transcript, typically a few to tens of KB.
+        def chat() -> str:
+            return json.dumps([
+                {"role": ("user", "assistant")[turn % 2], "content": " ".join(rng.choices(_WORDS, k=rng.randint(10, 120)))}
+                for turn in range(rng.randint(4, 40))
+            ])
+
+        _insert(cursor, "recap", ("uuid", "name", "summarize", "history_chat", "created_at", "updated_at"), (
+            (str(uuid.uuid4()), f"{prefix}recap{i}", " ".join(rng.choices(_WORDS, k=60)), chat(), stamp, stamp)
+            for i in range(sizes.recaps)
+            for stamp in (created_at(),)
+        ), batch)
+        step("recap", sizes.recaps, started)
+
+        # Cached representations (ETags) of the tables written above are stale now.
+        data_version.bump(cursor, *data_version.TABLES)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
+        db.close()
+
+    largest = max(range(len(members)), key=lambda index: len(members[index])) if members else None
+    return {
+        "password": password,
+        "usernames": [name for name, role in accounts if role == "user"],
+        "admin_usernames": [name for name, role in accounts if role == "admin"],
+        "superadmin_username": accounts[-1][0],
+        "user_ids": user_ids,
+        "group_ids": group_ids,
+        "group_uuids": group_uuids,
+        "group_sizes": [len(users) for users in members],
+        "event_ids": event_ids,
+        "survey_ids": survey_ids,
+        # A member of the largest group sees the most events: the worst case for listings.
+        "heaviest_username": accounts[members[largest][0] - first_user][0] if largest is not None and members[largest] else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    for name, default in DEFAULTS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every size by this factor")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent of group and event popularity")
+    parser.add_argument("--days", type=int, default=365, help="spread created_at over this many past days")
+    parser.add_argument("--password", default="password", help="password of every generated account")
+    parser.add_argument("--batch", type=int, default=1000, help="rows per INSERT statement")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    sizes = Sizes(**{name: getattr(args, name) for name in DEFAULTS})
+    if args.scale != 1.0:
+        sizes = sizes.scaled(args.scale)
+    started = time.perf_counter()
+    dataset = generate(sizes, seed=args.seed, skew=args.skew, days=args.days, password=args.password, batch=args.batch)
+    sizes_by_group = sorted(dataset["group_sizes"], reverse=True)
+    print(f"done in {time.perf_counter() - started:.1f}s; largest groups: {sizes_by_group[:5]}, "
+          f"median group: {sizes_by_group[len(sizes_by_group) // 2] if sizes_by_group else 0} members")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
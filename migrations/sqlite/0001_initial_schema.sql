@@ -0,0 +1,173 @@
+-- SQLite counterpart of migrations/mysql/0001_initial_schema.sql. updated_at is
+-- maintained by triggers, since SQLite has no ON UPDATE CURRENT_TIMESTAMP.
+
+CREATE TABLE IF NOT EXISTS user (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uuid CHAR(36) NOT NULL,
+    username VARCHAR(100) NOT NULL,
+    email VARCHAR(255) NOT NULL,
+    password VARCHAR(255) NOT NULL,
+    role VARCHAR(20) NOT NULL DEFAULT 'user',
+    status INTEGER NOT NULL DEFAULT 1,
+    created_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
+    updated_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS `group` (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uuid CHAR(36) NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    description TEXT,
+    created_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
+    updated_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS event (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uuid CHAR(36) NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    time_start DATETIME NULL,
+    time_end DATETIME NULL,
+    description TEXT,
+    status VARCHAR(20) NOT NULL DEFAULT 'archived',
+    created_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
+    updated_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS survey (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uuid CHAR(36) NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    form TEXT,
+    status VARCHAR(20) NOT NULL DEFAULT 'ongoing',
+    created_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
+    updated_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS answers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uuid CHAR(36) NOT NULL,
+    answer_data TEXT,
+    created_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
+    updated_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS recap (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uuid CHAR(36) NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    summarize TEXT,
+    history_chat TEXT,
+    created_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
+    updated_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS images (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(255) NOT NULL,
+    file_hash VARCHAR(64) NOT NULL,
+    file_original VARCHAR(255) NOT NULL,
+    url VARCHAR(512) NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
+    updated_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS survey_answer (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    survey_id INTEGER NOT NULL,
+    group_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    answer_data TEXT,
+    created_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
+    updated_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_user_updated_at AFTER UPDATE ON user
+FOR EACH ROW WHEN NEW.updated_at = OLD.updated_at
+BEGIN
+    UPDATE user SET updated_at = datetime('now', 'localtime') WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_group_updated_at AFTER UPDATE ON `group`
+FOR EACH ROW WHEN NEW.updated_at = OLD.updated_at
+BEGIN
+    UPDATE `group` SET updated_at = datetime('now', 'localtime') WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_event_updated_at AFTER UPDATE ON event
+FOR EACH ROW WHEN NEW.updated_at = OLD.updated_at
+BEGIN
+    UPDATE event SET updated_at = datetime('now', 'localtime') WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_survey_updated_at AFTER UPDATE ON survey
+FOR EACH ROW WHEN NEW.updated_at = OLD.updated_at
+BEGIN
+    UPDATE survey SET updated_at = datetime('now', 'localtime') WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_answers_updated_at AFTER UPDATE ON answers
+FOR EACH ROW WHEN NEW.updated_at = OLD.updated_at
+BEGIN
+    UPDATE answers SET updated_at = datetime('now', 'localtime') WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_recap_updated_at AFTER UPDATE ON recap
+FOR EACH ROW WHEN NEW.updated_at = OLD.updated_at
+BEGIN
+    UPDATE recap SET updated_at = datetime('now', 'localtime') WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_images_updated_at AFTER UPDATE ON images
+FOR EACH ROW WHEN NEW.updated_at = OLD.updated_at
+BEGIN
+    UPDATE images SET updated_at = datetime('now', 'localtime') WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_survey_answer_updated_at AFTER UPDATE ON survey_answer
+FOR EACH ROW WHEN NEW.updated_at = OLD.updated_at
+BEGIN
+    UPDATE survey_answer SET updated_at = datetime('now', 'localtime') WHERE id = NEW.id;
+END;
+
+CREATE TABLE IF NOT EXISTS relation_group_user (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    groupid INTEGER NOT NULL REFERENCES `group` (id) ON DELETE CASCADE,
+    userid INTEGER NOT NULL REFERENCES user (id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS relation_group_event (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    groupid INTEGER NOT NULL REFERENCES `group` (id) ON DELETE CASCADE,
+    eventid INTEGER NOT NULL REFERENCES event (id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS relation_user_event (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    userid INTEGER NOT NULL REFERENCES user (id) ON DELETE CASCADE,
+    eventid INTEGER NOT NULL REFERENCES event (id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS relation_event_survey (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    eventid INTEGER NOT NULL REFERENCES event (id) ON DELETE CASCADE,
+    surveyid INTEGER NOT NULL REFERENCES survey (id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS relation_answer_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    answerid INTEGER NOT NULL REFERENCES answers (id) ON DELETE CASCADE,
+    eventid INTEGER NOT NULL REFERENCES event (id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS relation_answer_group (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    answerid INTEGER NOT NULL REFERENCES answers (id) ON DELETE CASCADE,
+    groupid INTEGER NOT NULL REFERENCES `group` (id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS relation_answer_user (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    answerid INTEGER NOT NULL REFERENCES answers (id) ON DELETE CASCADE,
+    userid INTEGER NOT NULL REFERENCES user (id) ON DELETE CASCADE
+);
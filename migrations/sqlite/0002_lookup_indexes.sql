@@ -0,0 +1,50 @@
+-- Every service looks rows up by uuid, and every relation table is joined
+-- from both ends, so each gets an index per direction.
+
+-- Unique keys on entities: duplicates there are real conflicts to resolve by hand,
+-- so the migration stops and lists them instead of creating the index.
+-- require-empty: SELECT 'user.uuid', uuid, COUNT(*) FROM user GROUP BY uuid HAVING COUNT(*) > 1
+-- require-empty: SELECT 'user.username', username, COUNT(*) FROM user GROUP BY username HAVING COUNT(*) > 1
+-- require-empty: SELECT 'user.email', email, COUNT(*) FROM user GROUP BY email HAVING COUNT(*) > 1
+-- require-empty: SELECT 'group.uuid', uuid, COUNT(*) FROM `group` GROUP BY uuid HAVING COUNT(*) > 1
+-- require-empty: SELECT 'event.uuid', uuid, COUNT(*) FROM event GROUP BY uuid HAVING COUNT(*) > 1
+-- require-empty: SELECT 'survey.uuid', uuid, COUNT(*) FROM survey GROUP BY uuid HAVING COUNT(*) > 1
+-- require-empty: SELECT 'answers.uuid', uuid, COUNT(*) FROM answers GROUP BY uuid HAVING COUNT(*) > 1
+-- require-empty: SELECT 'recap.uuid', uuid, COUNT(*) FROM recap GROUP BY uuid HAVING COUNT(*) > 1
+
+-- Link rows repeated by the old insert paths carry no data of their own; keep the first.
+DELETE FROM relation_group_user WHERE id NOT IN (SELECT MIN(id) FROM relation_group_user GROUP BY groupid, userid);
+DELETE FROM relation_group_event WHERE id NOT IN (SELECT MIN(id) FROM relation_group_event GROUP BY groupid, eventid);
+DELETE FROM relation_user_event WHERE id NOT IN (SELECT MIN(id) FROM relation_user_event GROUP BY userid, eventid);
+DELETE FROM relation_event_survey WHERE id NOT IN (SELECT MIN(id) FROM relation_event_survey GROUP BY eventid, surveyid);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_user_uuid ON user (uuid);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_user_username ON user (username);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_user_email ON user (email);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_group_uuid ON `group` (uuid);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_event_uuid ON event (uuid);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_survey_uuid ON survey (uuid);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_answers_uuid ON answers (uuid);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_recap_uuid ON recap (uuid);
+
+-- The status scheduler looks for the next time_start/time_end boundary per status.
+CREATE INDEX IF NOT EXISTS idx_event_status_start ON event (status, time_start);
+CREATE INDEX IF NOT EXISTS idx_event_status_end ON event (status, time_end);
+CREATE INDEX IF NOT EXISTS idx_event_end ON event (time_end);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_relation_group_user ON relation_group_user (groupid, userid);
+CREATE INDEX IF NOT EXISTS idx_relation_group_user_user ON relation_group_user (userid, groupid);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_relation_group_event ON relation_group_event (groupid, eventid);
+CREATE INDEX IF NOT EXISTS idx_relation_group_event_event ON relation_group_event (eventid, groupid);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_relation_user_event ON relation_user_event (userid, eventid);
+CREATE INDEX IF NOT EXISTS idx_relation_user_event_event ON relation_user_event (eventid, userid);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_relation_event_survey ON relation_event_survey (eventid, surveyid);
+CREATE INDEX IF NOT EXISTS idx_relation_event_survey_survey ON relation_event_survey (surveyid, eventid);
+CREATE INDEX IF NOT EXISTS idx_relation_answer_events ON relation_answer_events (answerid, eventid);
+CREATE INDEX IF NOT EXISTS idx_relation_answer_events_event ON relation_answer_events (eventid, answerid);
+CREATE INDEX IF NOT EXISTS idx_relation_answer_group ON relation_answer_group (answerid, groupid);
+CREATE INDEX IF NOT EXISTS idx_relation_answer_group_group ON relation_answer_group (groupid, answerid);
+CREATE INDEX IF NOT EXISTS idx_relation_answer_user ON relation_answer_user (answerid, userid);
+CREATE INDEX IF NOT EXISTS idx_relation_answer_user_user ON relation_answer_user (userid, answerid);
+
+CREATE INDEX IF NOT EXISTS idx_survey_answer_survey_group ON survey_answer (survey_id, group_id);
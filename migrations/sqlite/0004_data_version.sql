@@ -0,0 +1,13 @@
+-- Per-table change counters (utils/data_version.py). Writers bump the rows of
+-- the tables they modify in the same transaction; the read endpoints derive
+-- their ETags from them.
+
+CREATE TABLE IF NOT EXISTS data_version (
+    name VARCHAR(64) NOT NULL PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO data_version (name) VALUES
+    ('user'), ('group'), ('event'), ('survey'), ('recap'),
+    ('relation_group_user'), ('relation_group_event'),
+    ('relation_user_event'), ('relation_event_survey');
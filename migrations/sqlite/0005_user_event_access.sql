@@ -0,0 +1,17 @@
+-- Events each user can see through their groups, i.e. the pairs of
+-- relation_group_user joined to relation_group_event. Kept in step by
+-- services/access_service.py whenever either relation changes, so a member's
+-- event listing is one primary-key range instead of a join per request.
+
+CREATE TABLE IF NOT EXISTS user_event_access (
+    userid INTEGER NOT NULL REFERENCES user (id) ON DELETE CASCADE,
+    eventid INTEGER NOT NULL REFERENCES event (id) ON DELETE CASCADE,
+    PRIMARY KEY (userid, eventid)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_user_event_access_event ON user_event_access (eventid, userid);
+
+INSERT OR IGNORE INTO user_event_access (userid, eventid)
+SELECT DISTINCT rgu.userid, rge.eventid
+FROM relation_group_user rgu
+JOIN relation_group_event rge ON rge.groupid = rgu.groupid;
@@ -0,0 +1,7 @@
+-- Surveys only ever move between 'ongoing' (with their event) and 'done' (after
+-- it); the 'active' default matched nothing the services look for. SQLite cannot
+-- change a column default in place, so 0001 now declares 'ongoing' for new
+-- databases and this only fixes existing rows.
+
+UPDATE survey SET status = 'ongoing' WHERE status = 'active';
+UPDATE data_version SET version = version + 1 WHERE name = 'survey';
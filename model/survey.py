@@ -5,7 +5,7 @@ from datetime import datetime
 class Survey(BaseModel):
     name: str
     form: Optional[str]
-    status: Optional[str] = "active"
+    status: Optional[str] = "ongoing"
 
 class SurveyInDB(Survey):
     id: int
@@ -0,0 +1,68 @@
+"""Keeps ``user_event_access`` equal to relation_group_user ⨝ relation_group_event.
+
+Each helper runs on the caller's cursor, after the caller changed the relation
+and before it commits, and touches only the pairs that change could affect.
+Access lost through one group is kept while another group still grants it.
+"""
+
+
+def grant_group_event(cursor, group_id: int, event_id: int):
+    """The group was linked to the event: its members can now see it."""
+    cursor.execute("""
+        INSERT INTO user_event_access (userid, eventid)
+        SELECT DISTINCT rgu.userid, %s FROM relation_group_user rgu
+        WHERE rgu.groupid = %s AND NOT EXISTS (
+            SELECT 1 FROM user_event_access uea WHERE uea.userid = rgu.userid AND uea.eventid = %s
+        )
+    """, (event_id, group_id, event_id))
+
+
+def revoke_group_event(cursor, group_id: int, event_id: int):
+    """The group was unlinked from the event."""
+    cursor.execute("""
+        DELETE FROM user_event_access
+        WHERE eventid = %s
+          AND userid IN (SELECT rgu.userid FROM relation_group_user rgu WHERE rgu.groupid = %s)
+          AND NOT EXISTS (
+              SELECT 1 FROM relation_group_event rge
+              JOIN relation_group_user rgu ON rge.groupid = rgu.groupid
+              WHERE rge.eventid = user_event_access.eventid AND rgu.userid = user_event_access.userid
+          )
+    """, (event_id, group_id))
+
+
+def grant_user_group(cursor, user_id: int, group_id: int):
+    """The user joined the group: they can now see its events."""
+    cursor.execute("""
+        INSERT INTO user_event_access (userid, eventid)
+        SELECT DISTINCT %s, rge.eventid FROM relation_group_event rge
+        WHERE rge.groupid = %s AND NOT EXISTS (
+            SELECT 1 FROM user_event_access uea WHERE uea.userid = %s AND uea.eventid = rge.eventid
+        )
+    """, (user_id, group_id, user_id))
+
+
+def revoke_user_group(cursor, user_id: int, group_id: int):
+    """The user left the group."""
+    cursor.execute("""
+        DELETE FROM user_event_access
+        WHERE userid = %s
+          AND eventid IN (SELECT rge.eventid FROM relation_group_event rge WHERE rge.groupid = %s)
+          AND NOT EXISTS (
+              SELECT 1 FROM relation_group_event rge
+              JOIN relation_group_user rgu ON rge.groupid = rgu.groupid
+              WHERE rge.eventid = user_event_access.eventid AND rgu.userid = user_event_access.userid
+          )
+    """, (user_id, group_id))
+
+
+def grant_new_members(cursor, group_id: int, user_ids: list):
+    """Freshly created users were put in the group; they hold no access yet."""
+    if not user_ids:
+        return
+    cursor.execute(f"""
+        INSERT INTO user_event_access (userid, eventid)
+        SELECT u.id, rge.eventid FROM user u
+        JOIN relation_group_event rge ON rge.groupid = %s
+        WHERE u.id IN ({', '.join(['%s'] * len(user_ids))})
+    """, (group_id, *user_ids))
@@ -2,10 +2,11 @@ from fastapi import HTTPException
 from config.connect_db import mydb
 from model.answer import Answer, AnswerUpdate
 import uuid
+from utils.pagination import ListParams, where
 
 
-def create_answer(answer: Answer):
-    db = mydb()
+def create_answer(answer: Answer, db=None):
+    db = db or mydb()
     cursor = db.cursor()
 
     new_uuid = str(uuid.uuid4())
@@ -47,24 +48,33 @@ def create_answer(answer: Answer):
     }
 
 
-def get_all_answers():
-    db = mydb()
+def get_all_answers(db=None, params: ListParams = None):
+    params = params or ListParams()
+    db = db or mydb()
     cursor = db.cursor(dictionary=True)
 
-    cursor.execute("""
+    conditions, values = params.conditions()
+    order_sql, order_values = params.order_by()
+    outer_order_sql, _ = params.order_by("a", limit=False)
+    cursor.execute(f"""
         SELECT 
-            a.uuid, a.answer_data, 
+            a.id, a.uuid, a.answer_data, 
             rae.eventid AS event_id,
             rag.groupid AS group_id,
             rau.userid AS user_id,
             a.created_at, a.updated_at
-        FROM answers a
+        FROM (
+            SELECT id, uuid, answer_data, created_at, updated_at FROM answers
+            {where(conditions)} {order_sql}
+        ) a
         LEFT JOIN relation_answer_events rae ON a.id = rae.answerid
         LEFT JOIN relation_answer_group rag ON a.id = rag.answerid
         LEFT JOIN relation_answer_user rau ON a.id = rau.answerid
-        ORDER BY a.created_at DESC
-    """)
-    results = cursor.fetchall()
+        {outer_order_sql}
+    """, (*values, *order_values))
+    results, next_cursor = params.page(cursor.fetchall())
+    for row in results:
+        row.pop("id")
 
     cursor.close()
     db.close()
@@ -72,12 +82,13 @@ def get_all_answers():
     return {
         "status": True,
         "message": "Answers retrieved successfully",
-        "data": results
+        "data": results,
+        "next_cursor": next_cursor
     }
 
 
-def get_answer_by_uuid(answer_uuid: str):
-    db = mydb()
+def get_answer_by_uuid(answer_uuid: str, db=None):
+    db = db or mydb()
     cursor = db.cursor(dictionary=True)
 
     cursor.execute("""
@@ -109,8 +120,8 @@ def get_answer_by_uuid(answer_uuid: str):
     }
 
 
-def get_answers_by_event(survey_id: int, current_user):
-    db = mydb()
+def get_answers_by_event(survey_id: int, current_user, db=None):
+    db = db or mydb()
     cursor = db.cursor(dictionary=True)
 
     cursor.execute("""
@@ -132,8 +143,8 @@ def get_answers_by_event(survey_id: int, current_user):
     }
 
 
-def get_answers_by_event_and_group(survey_id: int, group_id: int, current_user):
-    db = mydb()
+def get_answers_by_event_and_group(survey_id: int, group_id: int, current_user, db=None):
+    db = db or mydb()
     cursor = db.cursor(dictionary=True)
 
     cursor.execute("""
@@ -154,8 +165,8 @@ def get_answers_by_event_and_group(survey_id: int, group_id: int, current_user):
     }
 
 
-def update_answer(answer_uuid: str, update_data: AnswerUpdate):
-    db = mydb()
+def update_answer(answer_uuid: str, update_data: AnswerUpdate, db=None):
+    db = db or mydb()
     cursor = db.cursor()
 
     cursor.execute("SELECT id FROM answers WHERE uuid = %s", (answer_uuid,))
@@ -180,8 +191,8 @@ def update_answer(answer_uuid: str, update_data: AnswerUpdate):
     }
 
 
-def delete_answer(answer_uuid: str):
-    db = mydb()
+def delete_answer(answer_uuid: str, db=None):
+    db = db or mydb()
     cursor = db.cursor()
 
     cursor.execute("SELECT id FROM answers WHERE uuid = %s", (answer_uuid,))
@@ -1,22 +1,68 @@
-from config.connect_db import mydb
+from config.connect_db import after_commit, mydb, release, DbSession
 from model.user import UserCreate, UserInDB, TokenData
-from utils.security import pwd_context, verify_password
+from utils.security import verify_password
+from services import hash_service
 from jose import JWTError, jwt, ExpiredSignatureError
 from datetime import datetime, timedelta
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from fastapi.concurrency import run_in_threadpool
 from typing import Optional
-from config.env import SECRET_KEY, ALGORITHM
+import hashlib
+import hmac
+import uuid as uuid_lib
+from config.env import SECRET_KEY, ALGORITHM, USER_CACHE_SIZE, USER_CACHE_TTL, AUTH_CLAIMS_ONLY, TOKEN_VERSION_CACHE_SIZE
 from model.user import User
+from utils.cache import TTLCache
+from utils.pagination import ListParams, where
+from utils import data_version
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/login")
 
+# Principals resolved by get_current_user, keyed by username. Every write to a user
+# row must go through one of the invalidate_* helpers below.
+user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
+# user_id -> (uuid, token version). Small enough to hold every active user, so the
+# claims-only mode can authenticate without touching the database.
+token_versions = TTLCache(maxsize=TOKEN_VERSION_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
 def get_db_connection():
     return mydb()
 
-def get_user(username: str) -> Optional[UserInDB]:
-    conn = get_db_connection()
+# Entries are dropped right away and again once ``db`` commits: a request reading
+# the row before the commit must not leave the old principal cached.
+def invalidate_cached_user(username: str, db=None):
+    user_cache.invalidate(username)
+    after_commit(db, lambda: user_cache.invalidate(username))
+
+def _forget_user(uuid: str):
+    user_cache.invalidate_where(lambda username, user: user.uuid == uuid)
+    token_versions.invalidate_where(lambda user_id, entry: entry[0] == uuid)
+
+def invalidate_cached_user_by_uuid(uuid: str, db=None):
+    _forget_user(uuid)
+    after_commit(db, lambda: _forget_user(uuid))
+
+def token_version(user: UserInDB) -> str:
+    """Fingerprint of the fields that must revoke existing tokens when they change.
+
+    Changing the password, the role or the status yields a new version, in every
+    worker process, without a dedicated column.
+    """
+    material = f"{user.id}|{user.hashed_password}|{user.role}|{user.status}".encode()
+    return hmac.new(SECRET_KEY.encode(), material, hashlib.sha256).hexdigest()[:16]
+
+def remember_token_version(user: UserInDB, generation: int = None) -> str:
+    """Issue-time version of ``user``; ``generation`` is ``token_versions.generation``
+    read before the row was loaded."""
+    version = token_version(user)
+    token_versions.set(user.id, (user.uuid, version), generation=generation)
+    return version
+
+def get_user(username: str, db=None) -> Optional[UserInDB]:
+    conn = db or get_db_connection()
     cursor = conn.cursor(dictionary=True)
     try:
         cursor.execute(
@@ -40,8 +86,8 @@ def get_user(username: str) -> Optional[UserInDB]:
         cursor.close()
         conn.close()
 
-def get_user_by_uuid(uuid: str) -> Optional[UserInDB]:
-    conn = get_db_connection()
+def get_user_by_uuid(uuid: str, db=None) -> Optional[UserInDB]:
+    conn = db or get_db_connection()
     cursor = conn.cursor(dictionary=True)
     try:
         cursor.execute(
@@ -65,8 +111,8 @@ def get_user_by_uuid(uuid: str) -> Optional[UserInDB]:
         cursor.close()
         conn.close()
 
-def get_user_by_email(email: str) -> Optional[UserInDB]:
-    conn = get_db_connection()
+def get_user_by_email(email: str, db=None) -> Optional[UserInDB]:
+    conn = db or get_db_connection()
     cursor = conn.cursor(dictionary=True)
     try:
         cursor.execute(
@@ -82,44 +128,68 @@ def get_user_by_email(email: str) -> Optional[UserInDB]:
         conn.close()
 
 
-def create_user(user: UserCreate):
-    conn = get_db_connection()
+def create_user(user: UserCreate, db=None, hashed_password: Optional[str] = None):
+    conn = db or get_db_connection()
     cursor = conn.cursor()
     try:
-        hashed_password = pwd_context.hash(user.password)
+        if hashed_password is None:
+            hashed_password = hash_service.hash_password_sync(user.password)
         cursor.execute(
             "INSERT INTO user (uuid, username, email, password, role, status) VALUES (UUID(), %s, %s, %s, %s, 1)",
             (user.username, user.email, hashed_password, user.role)
         )
+        data_version.bump(cursor, "user")
         conn.commit()
+        invalidate_cached_user(user.username, conn)
         return {"username": user.username, "email": user.email, "role": user.role, "status": 1}
     finally:
         cursor.close()
         conn.close()
 
 
-def authenticate_user(username: str, password: str):
-    user = get_user(username)
+def authenticate_user(username: str, password: str, db=None):
+    user = get_user(username, db)
     if not user or not verify_password(password, user.hashed_password):
         return False
     return user
 
+async def get_user_async(username: str, db=None) -> Optional[UserInDB]:
+    return await run_in_threadpool(get_user, username, db)
+
+async def get_user_by_uuid_async(uuid: str, db=None):
+    return await run_in_threadpool(get_user_by_uuid, uuid, db)
+
+async def get_user_by_email_async(email: str, db=None) -> Optional[UserInDB]:
+    return await run_in_threadpool(get_user_by_email, email, db)
+
+async def create_user_async(user: UserCreate, db=None):
+    # Don't hold a pooled connection for the length of a bcrypt round.
+    await run_in_threadpool(release, db)
+    hashed_password = await hash_service.hash_password(user.password)
+    return await run_in_threadpool(create_user, user, db, hashed_password)
+
+async def authenticate_user_async(username: str, password: str, db=None):
+    user = await get_user_async(username, db)
+    await run_in_threadpool(release, db)
+    if not user or not await hash_service.verify_password(password, user.hashed_password):
+        return False
+    return user
+
+async def update_user_in_db_async(uuid: str, updates: dict, db=None):
+    await run_in_threadpool(update_user_in_db, uuid, updates, db)
+
+async def set_user_status_by_uuid_async(uuid: str, status: int, db=None):
+    await run_in_threadpool(set_user_status_by_uuid, uuid, status, db)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid_lib.uuid4().hex})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db=DbSession):
     from services.token_blacklist import is_token_blacklisted
 
-    if is_token_blacklisted(token):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail={"message": "Token has been revoked. Please log in again."},
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail={"message": "Could not validate credentials"},
@@ -141,14 +211,59 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     except JWTError:
         raise credentials_exception
 
-    user = get_user(username=token_data.username)
+    if is_token_blacklisted(token, payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={"message": "Token has been revoked. Please log in again."},
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    if AUTH_CLAIMS_ONLY and payload.get("ver") and payload.get("user_id") is not None:
+        return await _principal_from_claims(payload, db, credentials_exception)
+
+    generation = user_cache.generation
+    user = user_cache.get(token_data.username)
     if user is None:
-        raise credentials_exception
+        user = await get_user_async(token_data.username, db)
+        if user is None:
+            raise credentials_exception
+        user_cache.set(token_data.username, user, generation=generation)
 
     return user
 
-def update_user_in_db(uuid: str, updates: dict):
-    conn = get_db_connection()
+async def _principal_from_claims(payload: dict, db, credentials_exception) -> UserInDB:
+    user_id = payload["user_id"]
+    entry = token_versions.get(user_id)
+    if entry is None:
+        generation, version_generation = user_cache.generation, token_versions.generation
+        user = await get_user_async(payload["sub"], db)
+        if user is None or user.id != user_id:
+            raise credentials_exception
+        user_cache.set(user.username, user, generation=generation)
+        current_version = remember_token_version(user, version_generation)
+    else:
+        current_version = entry[1]
+
+    if not hmac.compare_digest(payload["ver"], current_version):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={"message": "Token has been revoked. Please log in again."},
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # A matching version implies the account was active with this role at login.
+    return UserInDB(
+        id=user_id,
+        username=payload["sub"],
+        email=payload["email"],
+        role=payload["role"],
+        status=1,
+        uuid=payload["uuid"],
+        hashed_password="",
+    )
+
+def update_user_in_db(uuid: str, updates: dict, db=None):
+    conn = db or get_db_connection()
     cursor = conn.cursor()
 
     set_clauses = []
@@ -164,17 +279,21 @@ def update_user_in_db(uuid: str, updates: dict):
     sql = f"UPDATE user SET {set_clause} WHERE uuid = %s"
 
     cursor.execute(sql, tuple(values))
+    data_version.bump(cursor, "user")
     conn.commit()
+    invalidate_cached_user_by_uuid(uuid, conn)
     cursor.close()
     conn.close()
 
-def set_user_status_by_uuid(uuid: str, status: int):
-    conn = get_db_connection()
+def set_user_status_by_uuid(uuid: str, status: int, db=None):
+    conn = db or get_db_connection()
     cursor = conn.cursor()
 
     sql = "UPDATE user SET status = %s WHERE uuid = %s"
     cursor.execute(sql, (status, uuid))
+    data_version.bump(cursor, "user")
     conn.commit()
+    invalidate_cached_user_by_uuid(uuid, conn)
 
     cursor.close()
     conn.close()
@@ -182,12 +301,21 @@ def set_user_status_by_uuid(uuid: str, status: int):
 async def get_current_active_user(current_user: UserInDB = Depends(get_current_user)):
     return current_user
 
-def get_all_users() -> list[User]:
-    conn = get_db_connection()
+def get_all_users(db=None, params: ListParams = None, status: Optional[int] = None) -> tuple[list[User], Optional[str]]:
+    params = params or ListParams()
+    conn = db or get_db_connection()
     cursor = conn.cursor(dictionary=True)
 
-    cursor.execute("SELECT username, email, role, status, created_at, updated_at FROM user")
-    rows = cursor.fetchall()
+    conditions, values = params.conditions()
+    if status is not None:
+        conditions.append("status = %s")
+        values.append(status)
+    order_sql, order_values = params.order_by()
+    cursor.execute(
+        f"SELECT id, username, email, role, status, created_at, updated_at FROM user {where(conditions)} {order_sql}",
+        (*values, *order_values)
+    )
+    rows, next_cursor = params.page(cursor.fetchall())
 
     cursor.close()
     conn.close()
@@ -201,4 +329,4 @@ def get_all_users() -> list[User]:
         )
         for row in rows
     ]
-    return users
+    return users, next_cursor
@@ -0,0 +1,199 @@
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from config.connect_db import after_commit, mydb
+from config.env import EVENT_BUNDLE_CACHE_SIZE, EVENT_BUNDLE_TTL
+from model.user import UserInDB
+from utils import compression, single_flight
+from utils.cache import TTLCache
+from utils.response import FastJSONResponse
+
+logger = logging.getLogger(__name__)
+
+# Built participant bundles by event uuid. Each worker keeps its own; the TTL
+# bounds how long a bundle rebuilt by another worker's write stays stale here.
+bundles = TTLCache(maxsize=EVENT_BUNDLE_CACHE_SIZE, ttl=EVENT_BUNDLE_TTL)
+
+_ENCODINGS = ("br", "gzip") if compression.brotli is not None else ("gzip",)
+
+# Rebuilds after a write run here, off the writing request and its connection.
+_executor = None
+_lock = threading.Lock()
+
+
+class Bundle:
+    """One event's participant payload, rendered and compressed once."""
+
+    __slots__ = ("body", "encoded", "etag", "survey_uuid", "group_uuids")
+
+    def __init__(self, payload: dict):
+        data = payload["data"]
+        self.body = FastJSONResponse(payload).body
+        self.encoded = {encoding: compression.compress(encoding, self.body) for encoding in _ENCODINGS}
+        # Weak: the same tag is sent with the identity, gzip and br bodies.
+        self.etag = 'W/"' + hashlib.blake2b(self.body, digest_size=16).hexdigest() + '"'
+        self.survey_uuid = data["survey"]["uuid"] if data["survey"] else None
+        self.group_uuids = frozenset(group["uuid"] for group in data["groups"])
+
+
+def _build(event_uuid: str, db=None) -> Bundle:
+    db = db or mydb()
+    cursor = db.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT e.id, e.uuid, e.name, e.description, e.time_start, e.time_end,
+                   s.uuid AS survey_uuid, s.name AS survey_name, s.form AS survey_form
+            FROM event e
+            LEFT JOIN relation_event_survey res ON e.id = res.eventid
+            LEFT JOIN survey s ON res.surveyid = s.id
+            WHERE e.uuid = %s
+        """, (event_uuid,))
+        row = cursor.fetchone()
+        if not row:
+            raise HTTPException(status_code=404, detail="Event not found")
+        cursor.execute("""
+            SELECT g.uuid, g.name FROM relation_group_event rge
+            JOIN `group` g ON rge.groupid = g.id
+            WHERE rge.eventid = %s
+            ORDER BY g.name
+        """, (row["id"],))
+        groups = cursor.fetchall()
+    finally:
+        cursor.close()
+        db.close()
+
+    survey = None
+    if row["survey_uuid"] is not None:
+        survey = {"uuid": row["survey_uuid"], "name": row["survey_name"], "form": row["survey_form"]}
+    return Bundle({
+        "success": True,
+        "message": "Event bundle retrieved successfully",
+        "data": {
+            "event": {
+                "uuid": row["uuid"],
+                "name": row["name"],
+                "description": row["description"],
+                "time_start": row["time_start"],
+                "time_end": row["time_end"],
+            },
+            "survey": survey,
+            "groups": groups,
+        },
+    })
+
+
+def _check_access(event_uuid: str, current_user: UserInDB, db):
+    """Members get the bundle once the event and its survey are ongoing, as with get_survey_by_uuid."""
+    if current_user.role in ("admin", "superadmin"):
+        return
+    cursor = db.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT e.status AS event_status, s.status AS survey_status
+            FROM event e
+            LEFT JOIN relation_event_survey res ON e.id = res.eventid
+            LEFT JOIN survey s ON res.surveyid = s.id
+            WHERE e.uuid = %s AND EXISTS (
+                SELECT 1 FROM user_event_access uea WHERE uea.eventid = e.id AND uea.userid = %s
+            )
+        """, (event_uuid, current_user.id))
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+    if not row or row["event_status"] != "ongoing" or row["survey_status"] not in (None, "ongoing"):
+        raise HTTPException(status_code=404, detail="Event bundle not available")
+
+
+def get_bundle(event_uuid: str, current_user: UserInDB, db=None) -> Bundle:
+    db = db or mydb()
+    _check_access(event_uuid, current_user, db)
+    bundle = bundles.get(event_uuid)
+    if bundle is None:
+        # Every participant asks at time_start; build a missing bundle once.
+        bundle = single_flight.flights.do("event_bundle", event_uuid, lambda: _build_and_store(event_uuid, db))
+    db.close()
+    return bundle
+
+
+def _build_and_store(event_uuid: str, db=None) -> Bundle:
+    # The generation is read before the rows: a write invalidating the event
+    # meanwhile makes set() refuse a bundle that may hold pre-write data.
+    generation = bundles.generation
+    bundle = _build(event_uuid, db)
+    bundles.set(event_uuid, bundle, generation=generation)
+    return bundle
+
+
+def _rebuild(event_uuids):
+    for event_uuid in event_uuids:
+        try:
+            _build_and_store(event_uuid)
+        except Exception:
+            # Built on the next request instead.
+            bundles.invalidate(event_uuid)
+            logger.exception("failed to rebuild the bundle of event %s", event_uuid)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bundle")
+    return _executor
+
+
+def _rebuild_after_commit(db, event_uuids):
+    """Once ``db`` commits, drop the bundles of ``event_uuids()`` and rebuild them in the background.
+
+    Dropping them again moves the generation on, so a bundle a request built
+    from the rows read before the commit cannot be stored over the rebuilt one.
+    """
+    def committed():
+        stale = set(event_uuids())
+        for event_uuid in stale:
+            bundles.invalidate(event_uuid)
+        _get_executor().submit(_rebuild, stale)
+
+    after_commit(db, committed)
+
+
+def refresh(db, event_uuid: str):
+    """Rebuild an event's bundle from committed data once the write through ``db`` commits."""
+    bundles.invalidate(event_uuid)
+    _rebuild_after_commit(db, lambda: [event_uuid])
+
+
+def _refresh_where(db, predicate):
+    event_uuids = bundles.keys_where(predicate)
+    for event_uuid in event_uuids:
+        bundles.invalidate(event_uuid)
+    # A request may have rebuilt one from the old rows before the commit.
+    _rebuild_after_commit(db, lambda: set(event_uuids) | set(bundles.keys_where(predicate)))
+
+
+def refresh_survey(db, survey_uuid: str):
+    """Rebuild the held bundles that embed the survey."""
+    _refresh_where(db, lambda event_uuid, bundle: bundle.survey_uuid == survey_uuid)
+
+
+def refresh_group(db, group_uuid: str):
+    """Rebuild the held bundles that list the group."""
+    _refresh_where(db, lambda event_uuid, bundle: group_uuid in bundle.group_uuids)
+
+
+def discard(db, event_uuid: str):
+    bundles.invalidate(event_uuid)
+    after_commit(db, lambda: bundles.invalidate(event_uuid))
+
+
+def shutdown():
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -2,35 +2,63 @@ from config.connect_db import mydb
 from model.event import Event, EventUpdate, UserInDB
 from fastapi import Depends, HTTPException
 from services.auth_service import get_current_active_user
+from services import access_service, bundle_service, status_scheduler, status_stream
+from utils import data_version, service_cache, single_flight
+from utils.pagination import ListParams, where
 import uuid
-from datetime import datetime
 
 def admin_required(current_user: UserInDB = Depends(get_current_active_user)):
     if current_user.role not in ("admin", "superadmin"):
         raise HTTPException(status_code=403, detail="Unauthorized")
     return current_user
 
-def get_all_events(current_user: UserInDB):
-    db = mydb()
+def _events_scope(current_user: UserInDB, db=None, params: ListParams = None, status: str = None):
+    # Every superadmin sees all events; anyone else sees a selection of their own.
+    page = (params or ListParams()).key()
+    if current_user.role == "superadmin":
+        return ("superadmin", page, status)
+    return (current_user.role, current_user.id, page, status)
+
+def _events_key(current_user: UserInDB, *args, **kwargs):
+    # A member's listing follows their group memberships; only the admin views are cached.
+    if current_user.role in ("admin", "superadmin"):
+        return _events_scope(current_user, *args, **kwargs)
+    return None
+
+@service_cache.cached(
+    key=_events_key,
+    tags=lambda result, *args, **kwargs: ("event:*", "survey:*"),
+    tables=("event", "survey", "relation_event_survey", "relation_user_event", "relation_group_event", "relation_group_user"),
+)
+@single_flight.coalesce(key=_events_scope)
+def get_all_events(current_user: UserInDB, db=None, params: ListParams = None, status: str = None):
+    params = params or ListParams()
+    db = db or mydb()
     cursor = db.cursor(dictionary=True)
-    now = datetime.now()
+
+    conditions, values = params.conditions("e")
+    if status is not None:
+        conditions.append("e.status = %s")
+        values.append(status)
 
     if current_user.role == "superadmin":
-        cursor.execute("""
-            SELECT e.*, 
-                   s.id AS survey_id,
-                   s.uuid AS survey_uuid,
-                   s.name AS survey_title,
-                   s.status AS survey_status,
-                   s.created_at AS survey_created_at,
-                   s.updated_at AS survey_updated_at
-            FROM event e
-            LEFT JOIN relation_event_survey es ON e.id = es.eventid
-            LEFT JOIN survey s ON es.surveyid = s.id
-            ORDER BY e.created_at DESC
-        """)
+        page_sql = "SELECT e.* FROM event e"
     elif current_user.role == "admin":
-        cursor.execute("""
+        page_sql = "SELECT e.* FROM event e JOIN relation_user_event rue ON e.id = rue.eventid"
+        conditions.insert(0, "rue.userid = %s")
+        values.insert(0, current_user.id)
+    else:  # user
+        page_sql = "SELECT e.* FROM event e JOIN user_event_access uea ON e.id = uea.eventid"
+        conditions.insert(0, "uea.userid = %s")
+        values.insert(0, current_user.id)
+
+    order_sql, order_values = params.order_by("e")
+    page_sql = f"{page_sql} {where(conditions)} {order_sql}"
+    values.extend(order_values)
+
+    if current_user.role in ("superadmin", "admin"):
+        outer_order_sql, _ = params.order_by("e", limit=False)
+        cursor.execute(f"""
             SELECT e.*, 
                    s.id AS survey_id,
                    s.uuid AS survey_uuid,
@@ -38,49 +66,18 @@ def get_all_events(current_user: UserInDB):
                    s.status AS survey_status,
                    s.created_at AS survey_created_at,
                    s.updated_at AS survey_updated_at
-            FROM event e
-            JOIN relation_user_event rue ON e.id = rue.eventid
+            FROM ({page_sql}) e
             LEFT JOIN relation_event_survey es ON e.id = es.eventid
             LEFT JOIN survey s ON es.surveyid = s.id
-            WHERE rue.userid = %s
-        """, (current_user.id,))
-    else:  # user
-        cursor.execute("""
-            SELECT DISTINCT e.* FROM event e
-            JOIN relation_group_event rge ON e.id = rge.eventid
-            JOIN relation_group_user rgu ON rge.groupid = rgu.groupid
-            WHERE rgu.userid = %s
-        """, (current_user.id,))
-
-    events = cursor.fetchall()
-    update_event_list = []
-    update_survey_list = []
+            {outer_order_sql}
+        """, tuple(values))
+    else:
+        cursor.execute(page_sql, tuple(values))
+
+    events, next_cursor = params.page(cursor.fetchall())
     formatted_events = []
 
     for event in events:
-        current_status = event["status"]
-        start = event.get("time_start")
-        end = event.get("time_end")
-        uuid_ = event["uuid"]
-
-        if current_status != "archived":
-            if end and isinstance(end, datetime) and now > end and current_status != "done":
-                event["status"] = "done"
-                update_event_list.append(("done", uuid_))
-            elif start and isinstance(start, datetime) and now > start and current_status not in ["ongoing", "done"]:
-                event["status"] = "ongoing"
-                update_event_list.append(("ongoing", uuid_))
-
-        surveys = []
-        if end and isinstance(end, datetime) and now > end:
-            cursor.execute("""
-                SELECT s.uuid FROM survey s
-                JOIN relation_event_survey res ON s.id = res.surveyid
-                JOIN event e ON res.eventid = e.id
-                WHERE e.uuid = %s AND s.status = 'ongoing'
-            """, (uuid_,))
-            surveys = cursor.fetchall()
-
         survey_obj = None
         if event.get("survey_id"):
             survey_obj = {
@@ -101,18 +98,6 @@ def get_all_events(current_user: UserInDB):
             "survey": survey_obj
         })
 
-        for survey in surveys:
-            update_survey_list.append(("done", survey["uuid"]))
-
-    for status_val, uuid_ in update_event_list:
-        cursor.execute("UPDATE event SET status = %s WHERE uuid = %s", (status_val, uuid_))
-
-    for status_val, uuid_ in update_survey_list:
-        cursor.execute("UPDATE survey SET status = %s WHERE uuid = %s", (status_val, uuid_))
-
-    if update_event_list or update_survey_list:
-        db.commit()
-
     cursor.close()
     db.close()
 
@@ -120,11 +105,21 @@ def get_all_events(current_user: UserInDB):
         "success": True,
         "message": "Events retrieved successfully",
         "count": len(formatted_events),
-        "data": formatted_events
+        "data": formatted_events,
+        "next_cursor": next_cursor
     }
 
-def get_event_by_uuid(event_uuid: str):
-    db = mydb()
+def _event_tags(result, event_uuid: str, db=None):
+    survey = result["data"].get("survey")
+    return (f"event:{event_uuid}", f"survey:{survey['uuid']}") if survey else (f"event:{event_uuid}",)
+
+@service_cache.cached(
+    key=lambda event_uuid, db=None: event_uuid,
+    tags=_event_tags,
+    tables=("event", "survey", "relation_event_survey"),
+)
+def get_event_by_uuid(event_uuid: str, db=None):
+    db = db or mydb()
     cursor = db.cursor(dictionary=True)
     cursor.execute("""
         SELECT 
@@ -186,7 +181,7 @@ def get_event_by_uuid(event_uuid: str):
         "data": result
     }
 
-def create_event(event: Event, current_user: UserInDB):
+def create_event(event: Event, current_user: UserInDB, db=None):
     if not event.name or not event.name.strip():
         raise HTTPException(status_code=400, detail="Event name cannot be empty")
     if not event.description or not event.description.strip():
@@ -194,7 +189,7 @@ def create_event(event: Event, current_user: UserInDB):
     if not event.time_start or not event.time_end:
         raise HTTPException(status_code=400, detail="Event start and end time are required")
 
-    db = mydb()
+    db = db or mydb()
     cursor = db.cursor()
     new_uuid = str(uuid.uuid4())
     status = "archived"
@@ -227,9 +222,12 @@ def create_event(event: Event, current_user: UserInDB):
             (event_id, event.survey_id)
         )
 
+    data_version.bump(cursor, "event", "relation_user_event", "relation_event_survey")
     db.commit()
+    service_cache.invalidate(db, "event:*")
     cursor.close()
     db.close()
+    status_scheduler.schedule(event.time_start, event.time_end)
 
     return {
         "success": True,
@@ -245,8 +243,8 @@ def create_event(event: Event, current_user: UserInDB):
     }
 
 
-def update_event(event_uuid: str, event: EventUpdate):
-    db = mydb()
+def update_event(event_uuid: str, event: EventUpdate, db=None):
+    db = db or mydb()
     cursor = db.cursor()
 
     cursor.execute("SELECT status FROM event WHERE uuid = %s", (event_uuid,))
@@ -291,10 +289,14 @@ def update_event(event_uuid: str, event: EventUpdate):
     values.append(event_uuid)
     sql = f"UPDATE event SET {', '.join(update_fields)} WHERE uuid = %s"
     cursor.execute(sql, tuple(values))
+    data_version.bump(cursor, "event")
     db.commit()
+    service_cache.invalidate(db, f"event:{event_uuid}", "event:*")
+    bundle_service.refresh(db, event_uuid)
 
     cursor.close()
     db.close()
+    status_scheduler.schedule(event.time_start, event.time_end)
     return {
         "success": True,
         "message": "Event updated successfully",
@@ -306,14 +308,14 @@ def update_event(event_uuid: str, event: EventUpdate):
         }
     }
 
-def publish_event(event_uuid: str, current_user: UserInDB):
+def publish_event(event_uuid: str, current_user: UserInDB, db=None):
     if current_user.role != "superadmin":
         raise HTTPException(status_code=403, detail="Only superadmin can publish events")
 
-    db = mydb()
+    db = db or mydb()
     cursor = db.cursor(dictionary=True)
 
-    cursor.execute("SELECT status FROM event WHERE uuid = %s", (event_uuid,))
+    cursor.execute("SELECT id, status, time_start, time_end FROM event WHERE uuid = %s", (event_uuid,))
     event = cursor.fetchone()
 
     if not event:
@@ -327,17 +329,22 @@ def publish_event(event_uuid: str, current_user: UserInDB):
         raise HTTPException(status_code=400, detail="Only archived events can be published")
 
     cursor.execute("UPDATE event SET status = %s WHERE uuid = %s", ("published", event_uuid))
+    status_stream.notify_events(db, [event["id"]], "published")
+    data_version.bump(cursor, "event")
     db.commit()
+    service_cache.invalidate(db, f"event:{event_uuid}", "event:*")
+    bundle_service.refresh(db, event_uuid)
     cursor.close()
     db.close()
+    status_scheduler.schedule(event["time_start"], event["time_end"])
 
     return {
         "success": True,
         "message": "Event published successfully"}
 
 
-def delete_event(event_uuid: str):
-    db = mydb()
+def delete_event(event_uuid: str, db=None):
+    db = db or mydb()
     cursor = db.cursor()
 
     cursor.execute("SELECT id FROM event WHERE uuid = %s", (event_uuid,))
@@ -348,15 +355,18 @@ def delete_event(event_uuid: str):
         raise HTTPException(status_code=404, detail="Event not found")
 
     cursor.execute("DELETE FROM event WHERE uuid = %s", (event_uuid,))
+    data_version.bump(cursor, "event", "relation_group_event", "relation_user_event", "relation_event_survey")
     db.commit()
+    service_cache.invalidate(db, f"event:{event_uuid}", "event:*")
+    bundle_service.discard(db, event_uuid)
     cursor.close()
     db.close()
     return {
         "success": True,
         "message": "Event deleted successfully"}
 
-def assign_group_to_event(event_uuid: str, group_uuid: str):
-    db = mydb()
+def assign_group_to_event(event_uuid: str, group_uuid: str, db=None):
+    db = db or mydb()
     cursor = db.cursor()
 
     cursor.execute("SELECT id, status FROM event WHERE uuid = %s", (event_uuid,))
@@ -395,8 +405,12 @@ def assign_group_to_event(event_uuid: str, group_uuid: str):
         "INSERT INTO relation_group_event (groupid, eventid) VALUES (%s, %s)",
         (group_id, event_id)
     )
+    access_service.grant_group_event(cursor, group_id, event_id)
 
+    data_version.bump(cursor, "relation_group_event")
     db.commit()
+    service_cache.invalidate(db, f"event:{event_uuid}")
+    bundle_service.refresh(db, event_uuid)
     cursor.close()
     db.close()
 
@@ -2,28 +2,43 @@ from config.connect_db import mydb
 from model.group import Group, GroupUpdate, UserInDB
 import uuid
 import csv
-import bcrypt
+import codecs
+import os
+import shutil
+import tempfile
 from fastapi import UploadFile, Depends, HTTPException
 from services.auth_service import get_current_active_user
-from utils.response import success_response, error_response
+from utils.response import success_response, error_response, paginated_response
+from utils.pagination import ListParams, where
+from utils import data_version, service_cache
+from services import access_service, bundle_service, hash_service, job_service
+from config.env import CSV_IMPORT_CHUNK, JOBS_UPLOAD_DIR
 
 def admin_required(current_user: UserInDB = Depends(get_current_active_user)):
     if current_user.role not in ("admin", "superadmin"):
         raise HTTPException(status_code=403, detail=error_response("Unauthorized"))
     return current_user
 
-def get_all_groups():
-    db = mydb()
+def get_all_groups(db=None, params: ListParams = None):
+    params = params or ListParams()
+    db = db or mydb()
     cursor = db.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM `group`")
-    result = cursor.fetchall()
+    conditions, values = params.conditions()
+    order_sql, order_values = params.order_by()
+    cursor.execute(f"SELECT * FROM `group` {where(conditions)} {order_sql}", (*values, *order_values))
+    result, next_cursor = params.page(cursor.fetchall())
     cursor.close()
     db.close()
-    return success_response("Groups fetched successfully", result)
+    return paginated_response("Groups fetched successfully", result, next_cursor)
 
 
-def get_group_by_uuid(group_uuid: str):
-    db = mydb()
+@service_cache.cached(
+    key=lambda group_uuid, db=None: group_uuid,
+    tags=lambda result, group_uuid, db=None: (f"group:{group_uuid}",),
+    tables=("group",),
+)
+def get_group_by_uuid(group_uuid: str, db=None):
+    db = db or mydb()
     cursor = db.cursor(dictionary=True)
     cursor.execute("SELECT * FROM `group` WHERE uuid = %s", (group_uuid,))
     result = cursor.fetchone()
@@ -34,19 +49,21 @@ def get_group_by_uuid(group_uuid: str):
         return error_response("Group not found")
     return success_response("Group fetched successfully", result)
 
-def create_group(group: Group):
+def create_group(group: Group, db=None):
     try:
         if not group.name or group.name.strip() == "":
             return error_response("Group name cannot be empty")
 
-        db = mydb()
+        db = db or mydb()
         cursor = db.cursor()
         new_uuid = str(uuid.uuid4())
         cursor.execute(
             "INSERT INTO `group` (uuid, name, description) VALUES (%s, %s, %s)",
             (new_uuid, group.name, group.description),
         )
+        data_version.bump(cursor, "group")
         db.commit()
+        service_cache.invalidate(db, "group:*")
         cursor.close()
         db.close()
         return success_response(
@@ -57,20 +74,23 @@ def create_group(group: Group):
         return error_response(f"Failed to create group: {str(e)}")
 
 
-def update_group(group_uuid: str, group: GroupUpdate):
-    db = mydb()
+def update_group(group_uuid: str, group: GroupUpdate, db=None):
+    db = db or mydb()
     cursor = db.cursor()
     cursor.execute(
         "UPDATE `group` SET name = %s, description = %s WHERE uuid = %s",
         (group.name, group.description, group_uuid)
     )
+    data_version.bump(cursor, "group")
     db.commit()
+    service_cache.invalidate(db, f"group:{group_uuid}", "group:*")
+    bundle_service.refresh_group(db, group_uuid)
     cursor.close()
     db.close()
     return success_response("Group updated successfully")
 
-def delete_group(group_uuid: str):
-    db = mydb()
+def delete_group(group_uuid: str, db=None):
+    db = db or mydb()
     cursor = db.cursor()
 
     cursor.execute("SELECT id FROM `group` WHERE uuid = %s", (group_uuid,))
@@ -94,71 +114,185 @@ def delete_group(group_uuid: str):
         )
 
     cursor.execute("DELETE FROM `group` WHERE id = %s", (group_id,))
+    data_version.bump(cursor, "group", "relation_group_user", "relation_group_event")
     db.commit()
+    service_cache.invalidate(db, f"group:{group_uuid}", "group:*")
+    bundle_service.refresh_group(db, group_uuid)
 
     cursor.close()
     db.close()
     return success_response("Group deleted successfully")
 
 
-def insert_users_from_csv(file: UploadFile, group_uuid: str):
-    try:
-        content = file.file.read().decode("utf-8").splitlines()
-        reader = csv.DictReader(content)
-        conn = mydb()
-        cursor = conn.cursor()
+def insert_users_from_csv(file, group_uuid: str, db=None, progress=None):
+    """Import users from an UploadFile or binary file object.
 
+    ``progress(report)`` is called after every chunk; returning False stops the import.
+    """
+    conn = db or mydb()
+    cursor = conn.cursor()
+    try:
         cursor.execute("SELECT id FROM `group` WHERE uuid = %s", (group_uuid,))
         group_row = cursor.fetchone()
         if not group_row:
-            cursor.close()
-            conn.close()
             raise HTTPException(status_code=404, detail=error_response("Group not found"))
-
         group_id = group_row[0]
 
-        for row in reader:
-            email = row["email"]
-            username = row["username"]
-            raw_password = row["password"]
-
-            cursor.execute("SELECT id FROM user WHERE email = %s", (email,))
-            if cursor.fetchone():
+        report = {"inserted": 0, "skipped": 0, "failed": 0, "issues": []}
+        reader = csv.DictReader(codecs.iterdecode(getattr(file, "file", file), "utf-8-sig"))
+        missing = {"email", "username", "password"} - set(reader.fieldnames or [])
+        if missing:
+            return error_response(f"CSV is missing column(s): {', '.join(sorted(missing))}")
+
+        seen_emails = set()
+        chunk = []
+        for line_no, row in enumerate(reader, start=2):
+            email = (row.get("email") or "").strip()
+            username = (row.get("username") or "").strip()
+            password = row.get("password") or ""
+            if not email or not username or not password:
+                _report_issue(report, line_no, email, "failed", "email, username and password are required")
                 continue
+            if email in seen_emails:
+                _report_issue(report, line_no, email, "skipped", "duplicate email in file")
+                continue
+            seen_emails.add(email)
+            chunk.append((line_no, email, username, password))
+
+            if len(chunk) >= CSV_IMPORT_CHUNK:
+                _import_user_chunk(conn, cursor, group_id, chunk, report)
+                chunk = []
+                if progress is not None and progress(report) is False:
+                    report["cancelled"] = True
+                    break
+
+        if chunk and not report.get("cancelled"):
+            _import_user_chunk(conn, cursor, group_id, chunk, report)
+
+        return success_response("Users imported into group", report)
+    except HTTPException:
+        raise
+    except Exception as e:
+        return error_response(f"Error inserting users: {str(e)}")
+    finally:
+        cursor.close()
+        conn.close()
 
-            user_uuid = str(uuid.uuid4())
-            hashed_password = bcrypt.hashpw(raw_password.encode("utf-8"), bcrypt.gensalt())
 
-            cursor.execute(
-                """
-                INSERT INTO user (uuid, email, username, password, role, status)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                """,
-                (user_uuid, email, username, hashed_password, "user", 1),
-            )
+def queue_csv_import(file: UploadFile, group_uuid: str, current_user) -> dict:
+    """Spool the upload to disk and import it in the background job runner."""
+    os.makedirs(JOBS_UPLOAD_DIR, exist_ok=True)
+    with tempfile.NamedTemporaryFile("wb", dir=JOBS_UPLOAD_DIR, suffix=".csv", delete=False) as spool:
+        shutil.copyfileobj(file.file, spool)
+    return job_service.submit(
+        "group_csv_import",
+        {"group_uuid": group_uuid, "path": spool.name},
+        created_by=getattr(current_user, "id", None),
+    )
+
 
-            user_id = cursor.lastrowid
-            cursor.execute(
-                "INSERT INTO relation_group_user (groupId, userId) VALUES (%s, %s)",
-                (group_id, user_id),
+def _discard_csv_upload(payload: dict):
+    try:
+        os.remove(payload["path"])
+    except FileNotFoundError:
+        pass
+
+
+@job_service.register("group_csv_import", cleanup=_discard_csv_upload)
+def _run_csv_import_job(ctx: job_service.JobContext):
+    path = ctx.payload["path"]
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        def progress(report):
+            return ctx.update(
+                progress=f.tell() / size if size else 1.0,
+                message=f"{report['inserted']} inserted, {report['skipped']} skipped, {report['failed']} failed",
             )
 
-        conn.commit()
-        cursor.close()
-        conn.close()
-        return success_response("Users inserted and assigned to group successfully")
+        result = insert_users_from_csv(f, ctx.payload["group_uuid"], progress=progress)
+
+    if not result["success"]:
+        raise RuntimeError(result["message"])
+    return result["data"]
 
+
+def _report_issue(report: dict, line_no: int, email: str, status: str, reason: str):
+    report[status] += 1
+    report["issues"].append({"row": line_no, "email": email, "status": status, "reason": reason})
+
+
+def _import_user_chunk(conn, cursor, group_id: int, chunk: list, report: dict):
+    """Insert one chunk of CSV rows with a fixed number of queries, committing at the end."""
+    placeholders = ", ".join(["%s"] * len(chunk))
+    cursor.execute(
+        f"SELECT email FROM user WHERE email IN ({placeholders})",
+        [email for _, email, _, _ in chunk],
+    )
+    taken_emails = {row[0] for row in cursor.fetchall()}
+    cursor.execute(
+        f"SELECT username FROM user WHERE username IN ({placeholders})",
+        [username for _, _, username, _ in chunk],
+    )
+    taken_usernames = {row[0] for row in cursor.fetchall()}
+
+    rows = []
+    seen_usernames = set()
+    for line_no, email, username, password in chunk:
+        if email in taken_emails:
+            _report_issue(report, line_no, email, "skipped", "email already registered")
+        elif username in taken_usernames or username in seen_usernames:
+            _report_issue(report, line_no, email, "failed", "username already taken")
+        else:
+            seen_usernames.add(username)
+            rows.append((line_no, email, username, password))
+    if not rows:
+        return
+
+    hashed_passwords = hash_service.hash_passwords([password for _, _, _, password in rows])
+    user_rows = [
+        (str(uuid.uuid4()), email, username, hashed, "user", 1)
+        for (_, email, username, _), hashed in zip(rows, hashed_passwords)
+    ]
+
+    cursor.execute("SAVEPOINT csv_chunk")
+    try:
+        cursor.executemany(
+            """
+            INSERT INTO user (uuid, email, username, password, role, status)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            """,
+            user_rows,
+        )
+        uuids = [user_row[0] for user_row in user_rows]
+        cursor.execute(
+            f"SELECT id FROM user WHERE uuid IN ({', '.join(['%s'] * len(uuids))})",
+            uuids,
+        )
+        user_ids = [row[0] for row in cursor.fetchall()]
+        cursor.executemany(
+            "INSERT INTO relation_group_user (groupId, userId) VALUES (%s, %s)",
+            [(group_id, user_id) for user_id in user_ids],
+        )
+        access_service.grant_new_members(cursor, group_id, user_ids)
     except Exception as e:
-        return error_response(f"Error inserting users: {str(e)}")
+        cursor.execute("ROLLBACK TO SAVEPOINT csv_chunk")
+        for line_no, email, _, _ in rows:
+            _report_issue(report, line_no, email, "failed", f"database error: {e}")
+        return
+
+    data_version.bump(cursor, "user", "relation_group_user")
+    conn.commit()
+    report["inserted"] += len(rows)
+
 
-def assign_user_to_group(group_uuid: str, user_uuid: str):
-    if is_group_in_active_event(group_uuid):
+def assign_user_to_group(group_uuid: str, user_uuid: str, db=None):
+    if is_group_in_active_event(group_uuid, db):
         raise HTTPException(
             status_code=403,
             detail=error_response("Cannot assign user to a group that is in an ongoing or completed event")
         )
 
-    conn = mydb()
+    conn = db or mydb()
     cursor = conn.cursor()
 
     cursor.execute("SELECT id FROM user WHERE uuid = %s", (user_uuid,))
@@ -184,7 +318,10 @@ def assign_user_to_group(group_uuid: str, user_uuid: str):
         "INSERT INTO relation_group_user (groupid, userid) VALUES (%s, %s)",
         (group_id, user_id)
     )
+    access_service.grant_user_group(cursor, user_id, group_id)
+    data_version.bump(cursor, "relation_group_user")
     conn.commit()
+    service_cache.invalidate(conn, f"group:{group_uuid}")
 
     cursor.close()
     conn.close()
@@ -192,14 +329,14 @@ def assign_user_to_group(group_uuid: str, user_uuid: str):
     return success_response("User assigned to group successfully")
 
 
-def remove_user_from_group(group_uuid: str, user_uuid: str):
-    if is_group_in_active_event(group_uuid):
+def remove_user_from_group(group_uuid: str, user_uuid: str, db=None):
+    if is_group_in_active_event(group_uuid, db):
         raise HTTPException(
             status_code=403,
             detail=error_response("Cannot remove user from group that is in an ongoing or completed event")
         )
 
-    conn = mydb()
+    conn = db or mydb()
     cursor = conn.cursor()
 
     cursor.execute("SELECT id FROM `group` WHERE uuid = %s", (group_uuid,))
@@ -225,7 +362,10 @@ def remove_user_from_group(group_uuid: str, user_uuid: str):
         "DELETE FROM relation_group_user WHERE groupid = %s AND userid = %s",
         (group_id, user_id)
     )
+    access_service.revoke_user_group(cursor, user_id, group_id)
+    data_version.bump(cursor, "relation_group_user")
     conn.commit()
+    service_cache.invalidate(conn, f"group:{group_uuid}")
 
     cursor.close()
     conn.close()
@@ -233,8 +373,8 @@ def remove_user_from_group(group_uuid: str, user_uuid: str):
     return success_response("User removed from group successfully")
 
 
-def unlink_group_from_event(group_uuid: str, event_uuid: str):
-    db = mydb()
+def unlink_group_from_event(group_uuid: str, event_uuid: str, db=None):
+    db = db or mydb()
     cursor = db.cursor()
 
     cursor.execute("SELECT id FROM `group` WHERE uuid = %s", (group_uuid,))
@@ -260,7 +400,11 @@ def unlink_group_from_event(group_uuid: str, event_uuid: str):
         "DELETE FROM relation_group_event WHERE groupid = %s AND eventid = %s",
         (group_id, event_id)
     )
+    access_service.revoke_group_event(cursor, group_id, event_id)
+    data_version.bump(cursor, "relation_group_event")
     db.commit()
+    service_cache.invalidate(db, f"group:{group_uuid}", f"event:{event_uuid}")
+    bundle_service.refresh(db, event_uuid)
 
     cursor.close()
     db.close()
@@ -268,8 +412,8 @@ def unlink_group_from_event(group_uuid: str, event_uuid: str):
     return success_response("Group unlinked from event successfully")
 
 
-def is_group_in_active_event(group_uuid: str) -> bool:
-    db = mydb()
+def is_group_in_active_event(group_uuid: str, db=None) -> bool:
+    db = db or mydb()
     cursor = db.cursor(dictionary=True)
     cursor.execute("""
         SELECT e.id FROM event e
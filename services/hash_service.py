@@ -0,0 +1,170 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from config.env import HASH_WORKERS, HASH_QUEUE_SIZE, HASH_BULK_CHUNK
+from utils.security import pwd_context
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class HashServiceBusy(Exception):
+    pass
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(password, hashed_password)
+
+
+def _hash_many(passwords: list) -> list:
+    return [pwd_context.hash(password) for password in passwords]
+
+
+# Pool slots bulk work may occupy; the rest stay free for interactive hashes.
+_BULK_SLOTS = max(1, HASH_WORKERS - 1)
+
+_executor = None
+_lock = threading.Lock()
+_pending = 0
+_bulk_pending = 0
+_stats = {
+    "submitted": 0,
+    "completed": 0,
+    "rejected": 0,
+    "failed": 0,
+    "hashes": 0,
+    "latency_sum": 0.0,
+    "latency_max": 0.0,
+    "latency_buckets": [0] * len(LATENCY_BUCKETS),
+}
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(
+                    max_workers=HASH_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _executor
+
+
+def _release(bounded: bool):
+    global _pending, _bulk_pending
+    if bounded:
+        _pending -= 1
+    else:
+        _bulk_pending -= 1
+
+
+def _submit(fn, *args, hashes: int = 1, bounded: bool = True):
+    """Queue one task; interactive callers are rejected when the queue is full.
+
+    Bulk (``bounded=False``) tasks are paced by ``hash_passwords`` and kept out
+    of the count logins are admitted against.
+    """
+    global _pending, _bulk_pending
+    with _lock:
+        if bounded and _pending >= HASH_QUEUE_SIZE:
+            _stats["rejected"] += 1
+            raise HashServiceBusy("Password hashing is saturated, please retry shortly")
+        if bounded:
+            _pending += 1
+        else:
+            _bulk_pending += 1
+        _stats["submitted"] += 1
+
+    started = time.perf_counter()
+
+    def _done(future):
+        elapsed = (time.perf_counter() - started) / hashes
+        with _lock:
+            _release(bounded)
+            if future.cancelled() or future.exception() is not None:
+                _stats["failed"] += 1
+                return
+            _stats["completed"] += 1
+            _stats["hashes"] += hashes
+            _stats["latency_sum"] += elapsed * hashes
+            _stats["latency_max"] = max(_stats["latency_max"], elapsed)
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if elapsed <= bound:
+                    _stats["latency_buckets"][i] += hashes
+                    break
+
+    try:
+        future = _get_executor().submit(fn, *args)
+    except Exception:
+        with _lock:
+            _release(bounded)
+        raise
+    future.add_done_callback(_done)
+    return future
+
+
+async def hash_password(password: str) -> str:
+    return await asyncio.wrap_future(_submit(_hash, password))
+
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    return await asyncio.wrap_future(_submit(_verify, password, hashed_password))
+
+
+def hash_password_sync(password: str) -> str:
+    return _submit(_hash, password).result()
+
+
+def hash_passwords(passwords: list) -> list:
+    """Hash a batch for bulk imports.
+
+    Work is split into small slices and at most ``HASH_WORKERS - 1`` of them are
+    in the pool at a time. One worker is always left for logins, and a login
+    never waits behind more than one slice per worker.
+    """
+    chunks = [passwords[i:i + HASH_BULK_CHUNK] for i in range(0, len(passwords), HASH_BULK_CHUNK)]
+    results = [None] * len(chunks)
+    in_flight = []
+    for index, chunk in enumerate(chunks):
+        if len(in_flight) >= _BULK_SLOTS:
+            done_index, future = in_flight.pop(0)
+            results[done_index] = future.result()
+        in_flight.append((index, _submit(_hash_many, chunk, hashes=len(chunk), bounded=False)))
+    for done_index, future in in_flight:
+        results[done_index] = future.result()
+    return [hashed for chunk in results for hashed in chunk]
+
+
+def stats() -> dict:
+    with _lock:
+        hashes = _stats["hashes"]
+        return {
+            "workers": HASH_WORKERS,
+            "queue_size": HASH_QUEUE_SIZE,
+            "queue_depth": _pending,
+            "bulk_in_flight": _bulk_pending,
+            "submitted": _stats["submitted"],
+            "completed": _stats["completed"],
+            "rejected": _stats["rejected"],
+            "failed": _stats["failed"],
+            "hashes": hashes,
+            "latency_avg": _stats["latency_sum"] / hashes if hashes else 0.0,
+            "latency_max": _stats["latency_max"],
+            "latency_sum": _stats["latency_sum"],
+            "latency_buckets": dict(zip(LATENCY_BUCKETS, _stats["latency_buckets"])),
+        }
+
+
+def shutdown():
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
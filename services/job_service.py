@@ -0,0 +1,234 @@
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Optional
+
+from config.env import JOBS_DB_PATH, JOB_WORKERS
+from utils.local_store import LocalStore
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS job (
+        id TEXT PRIMARY KEY,
+        type TEXT NOT NULL,
+        status TEXT NOT NULL,
+        payload TEXT,
+        progress REAL NOT NULL DEFAULT 0,
+        message TEXT,
+        result TEXT,
+        error TEXT,
+        cancel_requested INTEGER NOT NULL DEFAULT 0,
+        created_by INTEGER,
+        owner_pid INTEGER,
+        created_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_job_status ON job (status)",
+)
+
+_handlers = {}
+_cleanups = {}
+_store = None
+_executor = None
+_lock = threading.Lock()
+
+
+class JobContext:
+    def __init__(self, job_id: str, payload: dict):
+        self.job_id = job_id
+        self.payload = payload
+
+    def update(self, progress: Optional[float] = None, message: Optional[str] = None) -> bool:
+        """Record progress; returns False once cancellation has been requested."""
+        fields, values = [], []
+        if progress is not None:
+            fields.append("progress = ?")
+            values.append(min(max(progress, 0.0), 1.0))
+        if message is not None:
+            fields.append("message = ?")
+            values.append(message)
+        if fields:
+            _get_store().execute(f"UPDATE job SET {', '.join(fields)} WHERE id = ?", (*values, self.job_id))
+        return not self.cancel_requested
+
+    @property
+    def cancel_requested(self) -> bool:
+        row = _get_store().execute("SELECT cancel_requested FROM job WHERE id = ?", (self.job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+
+def register(job_type: str, cleanup: Optional[Callable[[dict], None]] = None):
+    """Decorator registering ``fn(ctx) -> result`` as the handler for ``job_type``.
+
+    ``cleanup(payload)`` runs once the job is finished, however it ends: after
+    the handler, when it is cancelled while queued, or when it is failed as
+    orphaned by ``start()``. Use it to release what ``payload`` refers to.
+    """
+    def decorator(fn: Callable[[JobContext], object]):
+        _handlers[job_type] = fn
+        if cleanup is not None:
+            _cleanups[job_type] = cleanup
+        return fn
+    return decorator
+
+
+def _cleanup(job_type: str, payload: Optional[str]):
+    cleanup = _cleanups.get(job_type)
+    if cleanup is None:
+        return
+    try:
+        cleanup(json.loads(payload or "{}"))
+    except Exception:
+        traceback.print_exc()
+
+
+def _get_store() -> LocalStore:
+    global _store
+    if _store is None:
+        with _lock:
+            if _store is None:
+                _store = LocalStore(JOBS_DB_PATH, _SCHEMA)
+    return _store
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+    return _executor
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def start():
+    """Fail jobs whose owning process died, e.g. across a restart."""
+    store = _get_store()
+    rows = store.execute(
+        "SELECT id, type, payload, owner_pid FROM job WHERE status IN (?, ?)", (QUEUED, RUNNING)
+    ).fetchall()
+    for row in rows:
+        if row["owner_pid"] != os.getpid() and not _pid_alive(row["owner_pid"]):
+            failed = store.execute(
+                "UPDATE job SET status = ?, error = ?, finished_at = ? WHERE id = ? AND status IN (?, ?)",
+                (FAILED, "Interrupted by a server restart", time.time(), row["id"], QUEUED, RUNNING),
+            ).rowcount
+            if failed:
+                _cleanup(row["type"], row["payload"])
+    _get_executor()
+
+
+def shutdown():
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def submit(job_type: str, payload: dict, created_by: Optional[int] = None) -> dict:
+    if job_type not in _handlers:
+        raise ValueError(f"Unknown job type: {job_type}")
+    job_id = uuid.uuid4().hex
+    _get_store().execute(
+        """
+        INSERT INTO job (id, type, status, payload, created_by, owner_pid, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        (job_id, job_type, QUEUED, json.dumps(payload), created_by, os.getpid(), time.time()),
+    )
+    _get_executor().submit(_run, job_id)
+    return get_job(job_id)
+
+
+def _run(job_id: str):
+    store = _get_store()
+    claimed = store.execute(
+        "UPDATE job SET status = ?, started_at = ? WHERE id = ? AND status = ?",
+        (RUNNING, time.time(), job_id, QUEUED),
+    ).rowcount
+    if not claimed:
+        return
+
+    row = store.execute("SELECT type, payload FROM job WHERE id = ?", (job_id,)).fetchone()
+    ctx = JobContext(job_id, json.loads(row["payload"] or "{}"))
+    try:
+        result = _handlers[row["type"]](ctx)
+    except Exception as e:
+        traceback.print_exc()
+        store.execute(
+            "UPDATE job SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+            (FAILED, str(e), time.time(), job_id),
+        )
+        return
+    finally:
+        _cleanup(row["type"], row["payload"])
+
+    status = CANCELLED if ctx.cancel_requested else SUCCEEDED
+    store.execute(
+        "UPDATE job SET status = ?, progress = CASE WHEN ? THEN 1 ELSE progress END, result = ?, finished_at = ? WHERE id = ?",
+        (status, status == SUCCEEDED, json.dumps(result, default=str), time.time(), job_id),
+    )
+
+
+def cancel(job_id: str) -> Optional[dict]:
+    store = _get_store()
+    cancelled = store.execute(
+        "UPDATE job SET status = ?, cancel_requested = 1, finished_at = ? WHERE id = ? AND status = ?",
+        (CANCELLED, time.time(), job_id, QUEUED),
+    ).rowcount
+    if cancelled:
+        # Never claimed by _run(), so nothing else will release its payload.
+        row = store.execute("SELECT type, payload FROM job WHERE id = ?", (job_id,)).fetchone()
+        _cleanup(row["type"], row["payload"])
+    store.execute("UPDATE job SET cancel_requested = 1 WHERE id = ? AND status = ?", (job_id, RUNNING))
+    return get_job(job_id)
+
+
+def _timestamp(value: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(value) if value is not None else None
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    row = _get_store().execute("SELECT * FROM job WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+    return {
+        "id": row["id"],
+        "type": row["type"],
+        "status": row["status"],
+        "progress": row["progress"],
+        "message": row["message"],
+        "result": json.loads(row["result"]) if row["result"] else None,
+        "error": row["error"],
+        "cancel_requested": bool(row["cancel_requested"]),
+        "created_by": row["created_by"],
+        "created_at": _timestamp(row["created_at"]),
+        "started_at": _timestamp(row["started_at"]),
+        "finished_at": _timestamp(row["finished_at"]),
+    }
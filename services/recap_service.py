@@ -4,9 +4,11 @@ import uuid
 from model.recap import Recap, RecapUpdate
 from datetime import datetime
 from utils.response import success_response
+from utils.pagination import ListParams, where
+from utils import data_version, service_cache
 
-def create_recap(recap: Recap):
-    db = mydb()
+def create_recap(recap: Recap, db=None):
+    db = db or mydb()
     cursor = db.cursor()
     recap_uuid = str(uuid.uuid4())
 
@@ -15,7 +17,9 @@ def create_recap(recap: Recap):
         VALUES (%s, %s, %s, %s, NOW(), NOW())
     """, (recap_uuid, recap.name, recap.summarize, recap.history_chat))
 
+    data_version.bump(cursor, "recap")
     db.commit()
+    service_cache.invalidate(db, "recap:*")
     cursor.close()
     db.close()
 
@@ -25,15 +29,20 @@ def create_recap(recap: Recap):
         )
 
 
-def read_all_recaps():
-    db = mydb()
+def read_all_recaps(db=None, params: ListParams = None):
+    params = params or ListParams()
+    db = db or mydb()
     cursor = db.cursor(dictionary=True)
 
-    cursor.execute("""
-        SELECT uuid, name, summarize, history_chat, created_at, updated_at
-        FROM recap ORDER BY created_at DESC
-    """)
-    recaps = cursor.fetchall()
+    conditions, values = params.conditions()
+    order_sql, order_values = params.order_by()
+    cursor.execute(f"""
+        SELECT id, uuid, name, summarize, history_chat, created_at, updated_at
+        FROM recap {where(conditions)} {order_sql}
+    """, (*values, *order_values))
+    recaps, next_cursor = params.page(cursor.fetchall())
+    for recap in recaps:
+        recap.pop("id")
 
     cursor.close()
     db.close()
@@ -41,12 +50,18 @@ def read_all_recaps():
     return {
         "success": True,
         "message": "Recap read succesfully",
-        "recaps": recaps
+        "recaps": recaps,
+        "next_cursor": next_cursor
     }
 
 
-def get_recap_by_uuid(recap_uuid: str):
-    db = mydb()
+@service_cache.cached(
+    key=lambda recap_uuid, db=None: recap_uuid,
+    tags=lambda result, recap_uuid, db=None: (f"recap:{recap_uuid}",),
+    tables=("recap",),
+)
+def get_recap_by_uuid(recap_uuid: str, db=None):
+    db = db or mydb()
     cursor = db.cursor(dictionary=True)
 
     cursor.execute("""
@@ -70,8 +85,8 @@ def get_recap_by_uuid(recap_uuid: str):
     }
 
 
-def update_recap(recap_uuid: str, update_data: RecapUpdate):
-    db = mydb()
+def update_recap(recap_uuid: str, update_data: RecapUpdate, db=None):
+    db = db or mydb()
     cursor = db.cursor()
 
     fields = []
@@ -91,7 +106,9 @@ def update_recap(recap_uuid: str, update_data: RecapUpdate):
         WHERE uuid = %s
     """, tuple(values))
 
+    data_version.bump(cursor, "recap")
     db.commit()
+    service_cache.invalidate(db, f"recap:{recap_uuid}", "recap:*")
     cursor.close()
     db.close()
 
@@ -102,12 +119,14 @@ def update_recap(recap_uuid: str, update_data: RecapUpdate):
     }
 
 
-def delete_recap(recap_uuid: str):
-    db = mydb()
+def delete_recap(recap_uuid: str, db=None):
+    db = db or mydb()
     cursor = db.cursor()
 
     cursor.execute("DELETE FROM recap WHERE uuid = %s", (recap_uuid,))
+    data_version.bump(cursor, "recap")
     db.commit()
+    service_cache.invalidate(db, f"recap:{recap_uuid}", "recap:*")
 
     cursor.close()
     db.close()
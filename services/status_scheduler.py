@@ -0,0 +1,233 @@
+import heapq
+import math
+import threading
+import time
+import traceback
+from datetime import datetime
+from typing import Optional
+
+from config.connect_db import mydb
+from config.env import STATUS_SCHEDULER_ENABLED, STATUS_SCHEDULER_MAX_SLEEP, STATUS_SCHEDULER_SETTLE
+from utils import data_version, service_cache
+from services import status_stream
+
+# Event lifecycle driven by the clock: published -> ongoing at time_start,
+# published/ongoing -> done at time_end. Archived events never move on their own.
+_DUE_DONE = """
+    SELECT id FROM event
+    WHERE status IN ('published', 'ongoing') AND time_end < %s
+"""
+_DUE_ONGOING = """
+    SELECT id FROM event
+    WHERE status = 'published' AND time_start < %s AND (time_end IS NULL OR time_end >= %s)
+"""
+_DUE_SURVEYS = """
+    SELECT DISTINCT s.id FROM survey s
+    JOIN relation_event_survey res ON s.id = res.surveyid
+    JOIN event e ON res.eventid = e.id
+    WHERE s.status = 'ongoing' AND e.time_end < %s
+"""
+_NEXT_BOUNDARIES = """
+    SELECT
+        (SELECT MIN(time_start) FROM event WHERE status = 'published' AND time_start >= %s) AS next_start,
+        (SELECT MIN(time_end) FROM event WHERE status IN ('published', 'ongoing') AND time_end >= %s) AS next_end
+"""
+
+
+def _timestamp(value) -> Optional[float]:
+    # Aggregates such as MIN(time_end) come back as text on SQLite.
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.timestamp() if isinstance(value, datetime) else None
+
+
+class StatusScheduler:
+    """Background thread applying event/survey status transitions when they fall due.
+
+    Upcoming ``time_start``/``time_end`` boundaries sit in a min-heap; the thread sleeps
+    until the earliest one and then moves every due row in a few bulk UPDATEs. Each
+    sweep also reloads the next boundaries from the database, and the thread never
+    sleeps longer than ``max_sleep``, so events changed by other worker processes are
+    picked up as well.
+
+    A boundary is queued at most once (``_queued`` mirrors the heap's contents), so
+    sweeps re-reading the same upcoming boundary and bursts of edits on already-due
+    events do not grow the heap.
+    """
+
+    def __init__(self, max_sleep: float = STATUS_SCHEDULER_MAX_SLEEP, settle: float = STATUS_SCHEDULER_SETTLE):
+        self.max_sleep = max_sleep
+        self.settle = settle
+        self._heap = []
+        self._queued = set()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._last_sweep = 0.0
+        self.sweeps = 0
+        self.failures = 0
+        self.events_updated = 0
+        self.surveys_updated = 0
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="status-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        with self._cond:
+            thread, self._thread = self._thread, None
+            self._stopping = True
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join(timeout)
+
+    def schedule(self, *boundaries):
+        """Wake the scheduler at each given datetime (``None`` values are ignored).
+
+        Boundaries that are already due are delayed by ``settle`` seconds so the
+        calling request can commit before the sweep looks at the row. That delay is
+        rounded up to a multiple of ``settle`` so a burst of such calls shares one
+        wakeup instead of queueing one per call.
+        """
+        earliest = time.time() + self.settle
+        if self.settle > 0:
+            earliest = math.ceil(earliest / self.settle) * self.settle
+        with self._cond:
+            for boundary in boundaries:
+                at = _timestamp(boundary)
+                if at is not None:
+                    self._push(max(at, earliest))
+            self._cond.notify_all()
+
+    def _push(self, at: float):
+        # Every sweep re-reads the same upcoming boundaries; queue each one once.
+        # Entries leave _queued when they are popped in _run.
+        if at not in self._queued:
+            self._queued.add(at)
+            heapq.heappush(self._heap, at)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopping:
+                    now = time.time()
+                    deadline = self._last_sweep + self.max_sleep
+                    if self._heap:
+                        deadline = min(deadline, self._heap[0])
+                    if deadline <= now:
+                        break
+                    self._cond.wait(deadline - now)
+                if self._stopping:
+                    return
+                while self._heap and self._heap[0] <= now:
+                    self._queued.discard(heapq.heappop(self._heap))
+
+            try:
+                self.sweep()
+            except Exception:
+                self.failures += 1
+                traceback.print_exc()
+            self._last_sweep = time.time()
+
+    def sweep(self, now: Optional[datetime] = None) -> dict:
+        """Apply every transition due at ``now`` and schedule the next boundaries."""
+        now = now or datetime.now()
+        db = mydb()
+        cursor = db.cursor(dictionary=True)
+        try:
+            cursor.execute(_DUE_DONE, (now,))
+            done_ids = [row["id"] for row in cursor.fetchall()]
+            cursor.execute(_DUE_ONGOING, (now, now))
+            ongoing_ids = [row["id"] for row in cursor.fetchall()]
+            cursor.execute(_DUE_SURVEYS, (now,))
+            survey_ids = [row["id"] for row in cursor.fetchall()]
+
+            # The status guards keep a concurrent archive/publish from being overwritten;
+            # only the rows actually moved are counted and announced.
+            done_ids = _bulk_update(cursor, "event", "done", done_ids, ("published", "ongoing"))
+            ongoing_ids = _bulk_update(cursor, "event", "ongoing", ongoing_ids, ("published",))
+            survey_ids = _bulk_update(cursor, "survey", "done", survey_ids, ("ongoing",))
+            changed = [table for table, ids in (("event", done_ids + ongoing_ids), ("survey", survey_ids)) if ids]
+            if changed:
+                data_version.bump(cursor, *changed)
+            db.commit()
+            if changed:
+                # Statuses show up in listings and embedded in other rows' details.
+                service_cache.cache.clear()
+            status_stream.notify_events(db, done_ids, "done")
+            status_stream.notify_events(db, ongoing_ids, "ongoing")
+            status_stream.notify_surveys(db, survey_ids, "done")
+
+            cursor.execute(_NEXT_BOUNDARIES, (now, now))
+            upcoming = cursor.fetchone() or {}
+        finally:
+            cursor.close()
+            db.close()
+
+        self.sweeps += 1
+        self.events_updated += len(done_ids) + len(ongoing_ids)
+        self.surveys_updated += len(survey_ids)
+        with self._cond:
+            for boundary in (upcoming.get("next_start"), upcoming.get("next_end")):
+                at = _timestamp(boundary)
+                if at is not None:
+                    self._push(at)
+        return {"done": done_ids, "ongoing": ongoing_ids, "surveys_done": survey_ids}
+
+    def stats(self) -> dict:
+        with self._cond:
+            pending = len(self._heap)
+            next_at = self._heap[0] if self._heap else None
+        return {
+            "running": self._thread is not None,
+            "pending": pending,
+            "next_wakeup": datetime.fromtimestamp(next_at) if next_at else None,
+            "sweeps": self.sweeps,
+            "failures": self.failures,
+            "events_updated": self.events_updated,
+            "surveys_updated": self.surveys_updated,
+        }
+
+
+def _bulk_update(cursor, table: str, status: str, ids: list, from_statuses: tuple) -> list:
+    """Move ``ids`` still in ``from_statuses`` to ``status``; return the ids that moved.
+
+    A row changed between the SELECT that found it and this UPDATE (e.g. archived)
+    is skipped by the guard, so the moved ids are re-read inside the transaction.
+    """
+    if not ids:
+        return []
+    id_marks = ", ".join(["%s"] * len(ids))
+    status_marks = ", ".join(["%s"] * len(from_statuses))
+    cursor.execute(
+        f"UPDATE {table} SET status = %s WHERE id IN ({id_marks}) AND status IN ({status_marks})",
+        (status, *ids, *from_statuses),
+    )
+    if cursor.rowcount == len(ids):
+        return ids
+    cursor.execute(f"SELECT id FROM {table} WHERE id IN ({id_marks}) AND status = %s", (*ids, status))
+    return [row["id"] for row in cursor.fetchall()]
+
+
+scheduler = StatusScheduler()
+
+
+def start():
+    if STATUS_SCHEDULER_ENABLED:
+        scheduler.start()
+
+
+def shutdown():
+    scheduler.stop()
+
+
+def schedule(*boundaries):
+    scheduler.schedule(*boundaries)
+
+
+def stats() -> dict:
+    return scheduler.stats()
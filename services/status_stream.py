@@ -0,0 +1,219 @@
+import asyncio
+import json
+import time
+from collections import deque
+
+from fastapi import HTTPException
+from jose import jwt
+
+from config.connect_db import after_commit
+from config.env import STATUS_STREAM_HISTORY, STATUS_STREAM_KEEPALIVE, STATUS_STREAM_RECHECK
+from model.user import UserInDB
+from services import auth_service
+
+_KEEPALIVE = b": keepalive\n\n"
+_RESYNC = b"event: resync\ndata: {}\n\n"
+
+
+class Message:
+    """One status change, encoded once and shared by every connection that may see it.
+
+    ``roles`` see it regardless of the row; ``users`` are the ids of the
+    remaining users entitled to it.
+    """
+
+    __slots__ = ("encoded", "roles", "users")
+
+    def __init__(self, kind: str, uuid: str, status: str, roles=(), users=()):
+        data = json.dumps({"type": kind, "uuid": uuid, "status": status}, separators=(",", ":"))
+        self.encoded = f"event: status\ndata: {data}\n\n".encode()
+        self.roles = frozenset(roles)
+        self.users = frozenset(users)
+
+    def visible_to(self, role: str, user_id: int) -> bool:
+        return role in self.roles or user_id in self.users
+
+
+class Broadcaster:
+    """Fan out status changes to Server-Sent Events connections.
+
+    Messages go into one bounded log shared by all connections. A connection
+    only keeps the sequence number it has read up to and waits on a future
+    shared by everyone, replaced on each publish, so an idle connection costs
+    one suspended generator. ``publish()`` may be called from any thread.
+
+    A connection that falls more than ``history`` messages behind receives a
+    ``resync`` event and should reload its listings. Only changes made in this
+    process are seen.
+
+    A connection ends at ``expires_at`` (epoch seconds), and on a keepalive at
+    most every ``recheck`` seconds it awaits ``still_valid()`` and ends if that
+    is False.
+    """
+
+    def __init__(self, history: int = STATUS_STREAM_HISTORY, keepalive: float = STATUS_STREAM_KEEPALIVE,
+                 recheck: float = STATUS_STREAM_RECHECK):
+        self.keepalive = keepalive
+        self.recheck = recheck
+        self._log = deque(maxlen=history)  # (seq, Message)
+        self._seq = 0
+        self._loop = None
+        self._wakeup = None
+        self._keepalive_task = None
+        self.subscribers = 0
+        self.published = 0
+
+    def _bind(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._wakeup = loop.create_future()
+            self._keepalive_task = loop.create_task(self._keepalive())
+
+    async def _keepalive(self):
+        # One timer for all connections; proxies drop streams that stay silent.
+        while True:
+            await asyncio.sleep(self.keepalive)
+            if self.subscribers:
+                self._append(None)
+
+    def _append(self, message):
+        if message is not None:
+            self._seq += 1
+            self._log.append((self._seq, message))
+            self.published += 1
+        wakeup, self._wakeup = self._wakeup, self._loop.create_future()
+        if not wakeup.done():
+            wakeup.set_result(message is None)
+
+    def publish(self, message: Message):
+        loop = self._loop
+        if loop is None or not self.subscribers or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._append, message)
+
+    async def listen(self, role: str, user_id: int, expires_at: float = None, still_valid=None):
+        self._bind()
+        self.subscribers += 1
+        seq = self._seq
+        checked = time.monotonic()
+        try:
+            yield b"retry: 5000\n\n"
+            while True:
+                keepalive = False
+                # The wakeup future is shared by every connection, so each wait is
+                # shielded: a timeout or a disconnecting client must not cancel it.
+                if self._seq == seq:
+                    remaining = expires_at - time.time() if expires_at is not None else None
+                    if remaining is not None and remaining <= self.keepalive:
+                        # Last wait before expiry: time out right at it.
+                        try:
+                            keepalive = await asyncio.wait_for(asyncio.shield(self._wakeup), max(remaining, 0))
+                        except asyncio.TimeoutError:
+                            return
+                    else:
+                        keepalive = await asyncio.shield(self._wakeup)
+                elif expires_at is not None and time.time() >= expires_at:
+                    return
+
+                # Sequence numbers are contiguous and the newest entry is the last,
+                # so the unread messages are the last ``end - seq`` entries; a
+                # keepalive reads none. They are copied out before yielding, as
+                # appends while this connection writes may shift the deque.
+                end = self._seq
+                unread = end - seq
+                if unread > len(self._log):
+                    yield _RESYNC
+                    seq = end
+                    continue
+                log = self._log
+                batch = [log[i][1] for i in range(len(log) - unread, len(log))]
+                seq = end
+                for message in batch:
+                    if message.visible_to(role, user_id):
+                        yield message.encoded
+                if keepalive:
+                    if still_valid is not None and time.monotonic() - checked >= self.recheck:
+                        checked = time.monotonic()
+                        if not await still_valid():
+                            return
+                    yield _KEEPALIVE
+        finally:
+            self.subscribers -= 1
+
+    def stats(self) -> dict:
+        return {"subscribers": self.subscribers, "published": self.published, "held": len(self._log)}
+
+
+broadcaster = Broadcaster()
+
+
+async def _still_valid(token: str, role: str, user_id: int) -> bool:
+    """Whether ``token`` still authenticates the same active user with the same role."""
+    try:
+        user = await auth_service.get_current_user(token, None)
+    except HTTPException:
+        # Expired, revoked, or its token version moved on.
+        return False
+    return user.id == user_id and user.role == role and user.status == 1
+
+
+def listen(current_user: UserInDB, token: str):
+    """Stream for ``current_user``, ending when ``token`` expires or stops being valid.
+
+    A user whose role changed is disconnected too and reconnects with the new scope.
+    """
+    # Only the token, role and id stay referenced for the life of the connection.
+    role, user_id = current_user.role, current_user.id
+    return broadcaster.listen(
+        role, user_id,
+        expires_at=jwt.get_unverified_claims(token).get("exp"),
+        still_valid=lambda: _still_valid(token, role, user_id),
+    )
+
+
+def _placeholders(ids) -> str:
+    return ", ".join(["%s"] * len(ids))
+
+
+def notify_events(db, event_ids: list, status: str):
+    """Tell the superadmins, the admins owning them and the members who can see them
+    that ``event_ids`` moved to ``status``, once the write through ``db`` commits."""
+    if not event_ids or not broadcaster.subscribers:
+        return
+    cursor = db.cursor()
+    try:
+        marks = _placeholders(event_ids)
+        cursor.execute(f"SELECT id, uuid FROM event WHERE id IN ({marks})", tuple(event_ids))
+        uuids = dict(cursor.fetchall())
+        audience = {event_id: set() for event_id in uuids}
+        cursor.execute(f"SELECT eventid, userid FROM user_event_access WHERE eventid IN ({marks})", tuple(event_ids))
+        rows = list(cursor.fetchall())
+        cursor.execute(f"SELECT eventid, userid FROM relation_user_event WHERE eventid IN ({marks})", tuple(event_ids))
+        rows.extend(cursor.fetchall())
+    finally:
+        cursor.close()
+    for event_id, user_id in rows:
+        audience[event_id].add(user_id)
+    messages = [Message("event", uuids[event_id], status, ("superadmin",), users) for event_id, users in audience.items()]
+    after_commit(db, lambda: [broadcaster.publish(message) for message in messages])
+
+
+def notify_surveys(db, survey_ids: list, status: str):
+    """Survey visibility depends on the role and status only: members see ongoing
+    surveys, so they are told when one becomes or stops being ongoing."""
+    if not survey_ids or not broadcaster.subscribers:
+        return
+    cursor = db.cursor()
+    try:
+        cursor.execute(f"SELECT uuid FROM survey WHERE id IN ({_placeholders(survey_ids)})", tuple(survey_ids))
+        uuids = [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+    roles = ("admin", "superadmin", "user") if status in ("ongoing", "done") else ("admin", "superadmin")
+    messages = [Message("survey", uuid, status, roles) for uuid in uuids]
+    after_commit(db, lambda: [broadcaster.publish(message) for message in messages])
+
+
+def stats() -> dict:
+    return broadcaster.stats()
@@ -3,42 +3,82 @@ from fastapi import HTTPException
 from model.survey import Survey, SurveyUpdate, UserInDB
 import uuid
 import json
+from utils.pagination import ListParams, where
+from services import bundle_service, status_stream
+from utils import data_version, service_cache, single_flight
 
 
-def get_all_surveys(current_user: UserInDB):
-    db = mydb()
-    cursor = db.cursor(dictionary=True)
+def _surveys_scope(current_user: UserInDB, db=None, params: ListParams = None, status: str = None):
+    # The listing depends on the role only: admins see every survey, members the ongoing ones.
+    return (current_user.role in ("admin", "superadmin"), (params or ListParams()).key(), status)
+
 
+def _surveys_key(current_user: UserInDB, *args, **kwargs):
+    # Members only see surveys of ongoing events; their listing is left uncached.
     if current_user.role in ("admin", "superadmin"):
-        cursor.execute("""
-            SELECT s.id, s.uuid, s.name, s.status, s.created_at, s.updated_at 
-            FROM survey s
-        """)
-    else:
-        cursor.execute("""
-            SELECT s.id, s.uuid, s.name, s.status, s.created_at, s.updated_at 
-            FROM survey s
-            JOIN relation_event_survey res ON s.id = res.surveyid
-            JOIN event e ON res.eventid = e.id
-            WHERE e.status = 'ongoing' AND s.status = 'ongoing'
-        """)
+        return _surveys_scope(current_user, *args, **kwargs)
+    return None
+
+
+def _survey_tags(result, survey_uuid: str, current_user: UserInDB, db=None):
+    if current_user.role in ("admin", "superadmin"):
+        return (f"survey:{survey_uuid}",)
+    # Members' access also depends on the status of the linked events.
+    return (f"survey:{survey_uuid}", "event:*")
+
+
+@service_cache.cached(
+    key=_surveys_key,
+    tags=lambda result, *args, **kwargs: ("survey:*",),
+    tables=("survey", "event", "relation_event_survey"),
+)
+@single_flight.coalesce(key=_surveys_scope)
+def get_all_surveys(current_user: UserInDB, db=None, params: ListParams = None, status: str = None):
+    params = params or ListParams()
+    db = db or mydb()
+    cursor = db.cursor(dictionary=True)
 
-    surveys = cursor.fetchall()
+    conditions, values = params.conditions("s")
+    if status is not None:
+        conditions.append("s.status = %s")
+        values.append(status)
+    if current_user.role not in ("admin", "superadmin"):
+        conditions[:0] = ["s.status = 'ongoing'", """EXISTS (
+                SELECT 1 FROM relation_event_survey res
+                JOIN event e ON res.eventid = e.id
+                WHERE res.surveyid = s.id AND e.status = 'ongoing'
+            )"""]
+    order_sql, order_values = params.order_by("s")
+
+    cursor.execute(f"""
+        SELECT s.id, s.uuid, s.name, s.status, s.created_at, s.updated_at 
+        FROM survey s
+        {where(conditions)}
+        {order_sql}
+    """, (*values, *order_values))
+
+    surveys, next_cursor = params.page(cursor.fetchall())
     cursor.close()
     db.close()
 
     if not surveys:
-        return {"success": False, "message": "No surveys found", "data": []}
+        return {"success": False, "message": "No surveys found", "data": [], "next_cursor": None}
 
     return {
         "success": True,
         "message": "Surveys retrieved successfully",
-        "data": surveys
+        "data": surveys,
+        "next_cursor": next_cursor
     }
 
 
-def get_survey_by_uuid(survey_uuid: str, current_user: UserInDB):
-    db = mydb()
+@service_cache.cached(
+    key=lambda survey_uuid, current_user, db=None: (survey_uuid, current_user.role in ("admin", "superadmin")),
+    tags=_survey_tags,
+    tables=("survey", "event", "relation_event_survey"),
+)
+def get_survey_by_uuid(survey_uuid: str, current_user: UserInDB, db=None):
+    db = db or mydb()
     cursor = db.cursor(dictionary=True)
 
     if current_user.role in ("admin", "superadmin"):
@@ -66,8 +106,8 @@ def get_survey_by_uuid(survey_uuid: str, current_user: UserInDB):
     }
 
 
-def create_survey(survey: Survey):
-    db = mydb()
+def create_survey(survey: Survey, db=None):
+    db = db or mydb()
     cursor = db.cursor()
     survey_uuid = str(uuid.uuid4())
 
@@ -81,7 +121,9 @@ def create_survey(survey: Survey):
         survey.status
     ))
 
+    data_version.bump(cursor, "survey")
     db.commit()
+    service_cache.invalidate(db, "survey:*")
     cursor.close()
     db.close()
 
@@ -96,8 +138,8 @@ def create_survey(survey: Survey):
     }
 
 
-def assign_survey_to_event(event_uuid: str, survey_uuid: str):
-    db = mydb()
+def assign_survey_to_event(event_uuid: str, survey_uuid: str, db=None):
+    db = db or mydb()
     cursor = db.cursor(dictionary=True)
 
     cursor.execute("SELECT id, status FROM event WHERE uuid = %s", (event_uuid,))
@@ -118,8 +160,12 @@ def assign_survey_to_event(event_uuid: str, survey_uuid: str):
         cursor.execute("""
             UPDATE survey SET status = 'ongoing' WHERE id = %s
         """, (survey["id"],))
+        status_stream.notify_surveys(db, [survey["id"]], "ongoing")
 
+    data_version.bump(cursor, "survey", "relation_event_survey")
     db.commit()
+    service_cache.invalidate(db, f"event:{event_uuid}", "event:*", f"survey:{survey_uuid}", "survey:*")
+    bundle_service.refresh(db, event_uuid)
     cursor.close()
     db.close()
 
@@ -133,8 +179,8 @@ def assign_survey_to_event(event_uuid: str, survey_uuid: str):
     }
 
 
-def update_survey_by_uuid(survey_uuid: str, update_data: SurveyUpdate):
-    db = mydb()
+def update_survey_by_uuid(survey_uuid: str, update_data: SurveyUpdate, db=None):
+    db = db or mydb()
     cursor = db.cursor()
 
     cursor.execute("SELECT id FROM survey WHERE uuid = %s", (survey_uuid,))
@@ -169,8 +215,13 @@ def update_survey_by_uuid(survey_uuid: str, update_data: SurveyUpdate):
     values.append(survey_id)
     sql = f"UPDATE survey SET {', '.join(update_fields)} WHERE id = %s"
     cursor.execute(sql, tuple(values))
+    if update_data.status is not None:
+        status_stream.notify_surveys(db, [survey_id], update_data.status)
 
+    data_version.bump(cursor, "survey")
     db.commit()
+    service_cache.invalidate(db, f"survey:{survey_uuid}", "survey:*")
+    bundle_service.refresh_survey(db, survey_uuid)
     cursor.close()
     db.close()
 
@@ -1,7 +1,150 @@
-blacklisted_tokens = set()
+import hashlib
+import heapq
+import threading
+import time
+from typing import Optional
+
+from jose import JWTError, jwt
+
+from utils.local_store import LocalStore
+from config.env import (
+    SECRET_KEY,
+    ALGORITHM,
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    TOKEN_BLACKLIST_BACKEND,
+    TOKEN_BLACKLIST_PATH,
+    TOKEN_BLACKLIST_PURGE_INTERVAL,
+)
+
+
+class MemoryBlacklist:
+    """Per-process blacklist; entries are dropped once their token has expired."""
+
+    def __init__(self):
+        self._entries = {}
+        self._expiries = []
+        self._lock = threading.Lock()
+        self.added = 0
+        self.evicted = 0
+
+    def add(self, key: str, exp: float):
+        with self._lock:
+            self._purge(time.time())
+            if key not in self._entries:
+                self.added += 1
+            self._entries[key] = exp
+            heapq.heappush(self._expiries, (exp, key))
+
+    def contains(self, key: str) -> bool:
+        now = time.time()
+        with self._lock:
+            if self._expiries and self._expiries[0][0] <= now:
+                self._purge(now)
+            exp = self._entries.get(key)
+            return exp is not None and exp > now
+
+    def purge(self):
+        with self._lock:
+            self._purge(time.time())
+
+    def _purge(self, now: float):
+        while self._expiries and self._expiries[0][0] <= now:
+            exp, key = heapq.heappop(self._expiries)
+            if self._entries.get(key) == exp:
+                del self._entries[key]
+                self.evicted += 1
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteBlacklist:
+    """Blacklist in a local SQLite file shared by every worker process on the host."""
+
+    def __init__(self, path: str, purge_interval: float = TOKEN_BLACKLIST_PURGE_INTERVAL):
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+        self.added = 0
+        self.evicted = 0
+        self._store = LocalStore(path, (
+            "CREATE TABLE IF NOT EXISTS revoked_token (jti TEXT PRIMARY KEY, exp REAL NOT NULL) WITHOUT ROWID",
+            "CREATE INDEX IF NOT EXISTS idx_revoked_token_exp ON revoked_token (exp)",
+        ))
+
+    def add(self, key: str, exp: float):
+        cursor = self._store.execute(
+            "INSERT OR REPLACE INTO revoked_token (jti, exp) VALUES (?, ?)", (key, exp)
+        )
+        self.added += cursor.rowcount
+        self._maybe_purge()
+
+    def contains(self, key: str) -> bool:
+        self._maybe_purge()
+        row = self._store.execute(
+            "SELECT 1 FROM revoked_token WHERE jti = ? AND exp > ?", (key, time.time())
+        ).fetchone()
+        return row is not None
+
+    def purge(self):
+        cursor = self._store.execute("DELETE FROM revoked_token WHERE exp <= ?", (time.time(),))
+        self.evicted += cursor.rowcount
+        self._next_purge = time.monotonic() + self.purge_interval
+
+    def _maybe_purge(self):
+        if time.monotonic() >= self._next_purge:
+            self.purge()
+
+    def size(self) -> int:
+        return self._store.execute("SELECT COUNT(*) FROM revoked_token").fetchone()[0]
+
+
+def _create_backend():
+    if TOKEN_BLACKLIST_BACKEND == "sqlite":
+        return SQLiteBlacklist(TOKEN_BLACKLIST_PATH)
+    return MemoryBlacklist()
+
+
+_backend = _create_backend()
+_stats = {"checks": 0, "hits": 0}
+
+
+def _claims(token: str) -> Optional[dict]:
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_exp": False})
+    except JWTError:
+        return None
+
+
+def _key(token: str, claims: dict) -> str:
+    # Tokens issued before jti was added are keyed by their digest.
+    return claims.get("jti") or "sha256:" + hashlib.sha256(token.encode()).hexdigest()
+
 
 def blacklist_token(token: str):
-    blacklisted_tokens.add(token)
+    claims = _claims(token)
+    if claims is None:
+        return
+    exp = claims.get("exp") or time.time() + ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    _backend.add(_key(token, claims), float(exp))
+
+
+def is_token_blacklisted(token: str, claims: Optional[dict] = None) -> bool:
+    if claims is None:
+        claims = _claims(token)
+        if claims is None:
+            return False
+    _stats["checks"] += 1
+    hit = _backend.contains(_key(token, claims))
+    if hit:
+        _stats["hits"] += 1
+    return hit
+
 
-def is_token_blacklisted(token: str) -> bool:
-    return token in blacklisted_tokens
+def stats() -> dict:
+    return {
+        "backend": TOKEN_BLACKLIST_BACKEND,
+        "size": _backend.size(),
+        "added": _backend.added,
+        "evicted": _backend.evicted,
+        **_stats,
+    }
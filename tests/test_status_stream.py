@@ -0,0 +1,33 @@
+import asyncio
+import os
+
+os.environ.setdefault("DB_BACKEND", "sqlite")
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("ALGORITHM", "HS256")
+
+from services.status_stream import Broadcaster, Message  # noqa: E402
+
+
+def test_cancelled_listener_does_not_break_the_others():
+    async def scenario():
+        broadcaster = Broadcaster(history=16, keepalive=60)
+        leaving = broadcaster.listen("superadmin", 1)
+        staying = broadcaster.listen("superadmin", 2)
+        for stream in (leaving, staying):
+            assert await stream.__anext__() == b"retry: 5000\n\n"
+
+        left = asyncio.ensure_future(leaving.__anext__())
+        received = asyncio.ensure_future(staying.__anext__())
+        await asyncio.sleep(0)
+        left.cancel()  # the client disconnects
+        await asyncio.sleep(0)
+        assert left.cancelled()
+        assert not received.done()
+
+        message = Message("event", "e-1", "done", roles=("superadmin",))
+        broadcaster._append(message)
+        assert await asyncio.wait_for(received, 1) == message.encoded
+        assert broadcaster.published == 1
+        await staying.aclose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,187 @@
+import gzip
+import hashlib
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from config.env import (
+    COMPRESSION_BROTLI_QUALITY,
+    COMPRESSION_CACHE_MAX_BODY,
+    COMPRESSION_CACHE_SIZE,
+    COMPRESSION_CACHE_TTL,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_MIN_SIZE,
+)
+from utils.cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+# Formats that are compressed already; running them through gzip only costs CPU.
+_SKIP_PREFIXES = ("image/", "video/", "audio/", "font/woff")
+_SKIP_TYPES = {
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/x-bzip2",
+    "application/x-7z-compressed",
+    "application/x-rar-compressed",
+    "application/pdf",
+    "application/octet-stream",
+    # Long-lived streams would each hold a compressor for their whole life.
+    "text/event-stream",
+}
+
+# Compressed bodies by (encoding, body digest): hot listings are compressed once.
+cache = TTLCache(maxsize=COMPRESSION_CACHE_SIZE, ttl=COMPRESSION_CACHE_TTL)
+
+
+def negotiate(accept_encoding: str):
+    """Preferred supported encoding in an ``Accept-Encoding`` header, or None."""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name:
+            accepted[name.lower()] = q
+    wildcard = accepted.get("*", 0.0)
+    if brotli is not None and accepted.get("br", 0.0) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+def compress(encoding: str, body: bytes) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+    # mtime=0 keeps the output identical for identical bodies.
+    return gzip.compress(body, compresslevel=COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self._brotli is not None:
+            out = self._brotli.process(data)
+            return out + self._brotli.finish() if final else out + self._brotli.flush()
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+def _compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    if not content_type:
+        return False
+    return content_type not in _SKIP_TYPES and not content_type.startswith(_SKIP_PREFIXES)
+
+
+def _cacheable(method: str, status: int, headers: Headers, body: bytes) -> bool:
+    return (
+        method == "GET"
+        and status == 200
+        and len(body) <= COMPRESSION_CACHE_MAX_BODY
+        and "no-store" not in headers.get("cache-control", "")
+    )
+
+
+def _compress_body(encoding: str, body: bytes, use_cache: bool) -> bytes:
+    if not use_cache:
+        return compress(encoding, body)
+    key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+    compressed = cache.get(key)
+    if compressed is None:
+        compressed = compress(encoding, body)
+        cache.set(key, compressed)
+    return compressed
+
+
+class CompressionMiddleware:
+    """gzip/brotli response compression negotiated through ``Accept-Encoding``.
+
+    Bodies under ``minimum_size`` and already-compressed media types are sent
+    as is. Single-message bodies of successful GETs are compressed through
+    ``cache``; streamed bodies are compressed chunk by chunk.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+        mode = None
+        streamer = None
+
+        async def send_compressed(message):
+            nonlocal start, mode, streamer
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or mode == "identity":
+                if start is not None and mode is None:
+                    mode = "identity"
+                    await send(start)
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if mode == "stream":
+                await send({**message, "body": streamer.compress(body, final=not more_body)})
+                return
+
+            headers = MutableHeaders(raw=list(start["headers"]))
+            if not _compressible(headers):
+                mode = "identity"
+                await send(start)
+                await send(message)
+                return
+            headers.add_vary_header("Accept-Encoding")
+            if not more_body and len(body) < self.minimum_size:
+                mode = "identity"
+                await send({**start, "headers": headers.raw})
+                await send(message)
+                return
+
+            headers["Content-Encoding"] = encoding
+            if more_body:
+                mode = "stream"
+                streamer = _StreamCompressor(encoding)
+                del headers["Content-Length"]
+                await send({**start, "headers": headers.raw})
+                await send({**message, "body": streamer.compress(body, final=False)})
+                return
+
+            mode = "identity"
+            use_cache = _cacheable(scope["method"], start["status"], headers, body)
+            compressed = _compress_body(encoding, body, use_cache)
+            headers["Content-Length"] = str(len(compressed))
+            await send({**start, "headers": headers.raw})
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,39 @@
+"""Per-table change counters kept in the ``data_version`` table.
+
+Every service that writes one of ``TABLES`` calls ``bump()`` with the same
+cursor, before it commits, so a version only moves together with the data it
+describes. Readers use the versions to tell whether anything they depend on
+changed without looking at the rows themselves (see utils/etag.py).
+"""
+
+TABLES = (
+    "user",
+    "group",
+    "event",
+    "survey",
+    "recap",
+    "relation_group_user",
+    "relation_group_event",
+    "relation_user_event",
+    "relation_event_survey",
+)
+
+
+def bump(cursor, *tables):
+    """Increment the version of each table in ``tables`` inside the caller's transaction."""
+    unknown = set(tables) - set(TABLES)
+    if unknown:
+        raise ValueError(f"No data version for table(s): {', '.join(sorted(unknown))}")
+    marks = ", ".join(["%s"] * len(tables))
+    cursor.execute(f"UPDATE data_version SET version = version + 1 WHERE name IN ({marks})", tables)
+
+
+def read(db, tables) -> dict:
+    """Current version of each table in ``tables``."""
+    cursor = db.cursor()
+    try:
+        marks = ", ".join(["%s"] * len(tables))
+        cursor.execute(f"SELECT name, version FROM data_version WHERE name IN ({marks})", tuple(tables))
+        return {name: version for name, version in cursor.fetchall()}
+    finally:
+        cursor.close()
@@ -0,0 +1,97 @@
+import hashlib
+
+from fastapi import Depends, Request
+
+from config.connect_db import DbSession
+from model.user import UserInDB
+from services.auth_service import get_current_active_user
+from utils import data_version
+
+
+class NotModified(Exception):
+    """The client's cached representation is current; answered with a bare 304."""
+
+    def __init__(self, etag: str):
+        self.etag = etag
+
+
+def _opaque(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison: W/"x" matches "x".
+    etag = _opaque(etag)
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or _opaque(candidate) == etag:
+            return True
+    return False
+
+
+def conditional(*tables, per_user: bool = True):
+    """Dependency giving a GET endpoint a weak ETag built from data versions.
+
+    The tag hashes the request path and query, the caller's role (and user id
+    with ``per_user``) and the ``data_version`` of every table the response is
+    read from, so it is computed with one primary-key lookup and changes with
+    any write to those tables. A matching ``If-None-Match`` raises
+    ``NotModified`` before the endpoint runs; otherwise the tag is left on
+    ``request.state`` for ``ConditionalGetMiddleware`` to send.
+
+    ``tables`` must also cover whatever decides access to the resource, e.g.
+    the event and relation tables for a user's view of a survey.
+
+    The tag is weak because ``CompressionMiddleware`` may send the same
+    representation gzip- or brotli-encoded, and a strong tag would promise
+    byte-identical bodies across those encodings.
+    """
+
+    def check(request: Request, current_user: UserInDB = Depends(get_current_active_user), db=DbSession):
+        versions = data_version.read(db, tables)
+        scope = f"{current_user.role}:{current_user.id}" if per_user else current_user.role
+        material = "|".join([
+            request.url.path,
+            request.url.query,
+            scope,
+            *(f"{table}={versions.get(table, 0)}" for table in tables),
+        ])
+        etag = 'W/"' + hashlib.blake2b(material.encode(), digest_size=16).hexdigest() + '"'
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and matches(if_none_match, etag):
+            raise NotModified(etag)
+        request.state.etag = etag
+        return etag
+
+    return check
+
+
+class ConditionalGetMiddleware:
+    """Send the ETag computed by ``conditional`` with successful GET responses.
+
+    Endpoints may return a ready-made Response, so the header is added here
+    rather than through the dependency's ``Response`` parameter. The
+    representation differs per user, hence ``Cache-Control: private``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            return await self.app(scope, receive, send)
+
+        async def send_with_etag(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                etag = scope.get("state", {}).get("etag")
+                if etag is not None:
+                    headers = list(message.get("headers", []))
+                    names = {name.lower() for name, _ in headers}
+                    if b"etag" not in names:
+                        headers.append((b"etag", etag.encode()))
+                    if b"cache-control" not in names:
+                        headers.append((b"cache-control", b"private, no-cache"))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
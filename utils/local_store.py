@@ -0,0 +1,30 @@
+import os
+import sqlite3
+import threading
+
+
+class LocalStore:
+    """Per-thread connections to a SQLite file shared by the worker processes on one host."""
+
+    def __init__(self, path: str, schema: tuple = ()):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self.conn()
+        for statement in schema:
+            conn.execute(statement)
+
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        return self.conn().execute(sql, params)
@@ -0,0 +1,213 @@
+import threading
+import time
+
+from utils.query_stats import route_template
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_lock = threading.Lock()
+_in_flight = 0
+_requests = {}    # (method, route, status) -> count
+_latency = {}     # (method, route) -> [bucket counts..., +Inf count, sum]
+
+
+class MetricsMiddleware:
+    """Count requests and observe their latency per route template.
+
+    Labels use the matched route's template, so cardinality is bounded by the
+    number of routes; unmatched paths share the ``(unmatched)`` label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _in_flight
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        with _lock:
+            _in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            observe(scope["method"], route_template(scope), status, time.perf_counter() - started)
+
+
+def observe(method: str, route: str, status: int, elapsed: float):
+    global _in_flight
+    with _lock:
+        _in_flight -= 1
+        key = (method, route, status)
+        _requests[key] = _requests.get(key, 0) + 1
+        buckets = _latency.get((method, route))
+        if buckets is None:
+            buckets = _latency[(method, route)] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if elapsed <= bound:
+                buckets[i] += 1
+                break
+        buckets[-2] += 1
+        buckets[-1] += elapsed
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class _Writer:
+    def __init__(self):
+        self.lines = []
+
+    def metric(self, name: str, kind: str, help_text: str, samples):
+        """``samples`` is an iterable of ``(labels, value)`` or ``(suffix, labels, value)``."""
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        for sample in samples:
+            suffix, labels, value = sample if len(sample) == 3 else ("", *sample)
+            self.lines.append(f"{name}{suffix}{_labels(labels)} {value!r}")
+
+    def histogram(self, name: str, help_text: str, series):
+        """``series`` yields ``(labels, bounds, per-bucket counts, count, sum)``."""
+        samples = []
+        for labels, bounds, counts, count, total in series:
+            cumulative = 0
+            for bound, n in zip(bounds, counts):
+                cumulative += n
+                samples.append(("_bucket", {**labels, "le": f"{bound:g}"}, cumulative))
+            samples.append(("_bucket", {**labels, "le": "+Inf"}, count))
+            samples.append(("_count", labels, count))
+            samples.append(("_sum", labels, float(total)))
+        self.metric(name, "histogram", help_text, samples)
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def _cache_metrics(writer: _Writer, caches: dict):
+    stats = {name: cache.stats() for name, cache in caches.items()}
+    writer.metric("app_cache_entries", "gauge", "Entries held by each in-process cache.",
+                  [({"cache": name}, s["size"]) for name, s in stats.items()])
+    for field in ("hits", "misses", "evictions", "expirations", "invalidations"):
+        writer.metric(f"app_cache_{field}_total", "counter", f"Cache {field} since startup.",
+                      [({"cache": name}, s[field]) for name, s in stats.items()])
+
+
+def render(threadpool: dict = None) -> str:
+    """Every metric in the Prometheus text exposition format."""
+    # Imported here: these modules pull in the database and service layers.
+    from config.connect_db import get_pool
+    from services import auth_service, bundle_service, hash_service, status_scheduler, status_stream, token_blacklist
+    from utils import compression, query_stats, service_cache, single_flight
+
+    writer = _Writer()
+    with _lock:
+        in_flight = _in_flight
+        requests = dict(_requests)
+        latency = {key: list(value) for key, value in _latency.items()}
+
+    writer.metric("http_requests_total", "counter", "HTTP requests by route template and status.", [
+        ({"method": method, "route": route, "status": status}, count)
+        for (method, route, status), count in sorted(requests.items())
+    ])
+    writer.histogram("http_request_duration_seconds", "HTTP request latency by route template.", [
+        ({"method": method, "route": route}, LATENCY_BUCKETS, buckets[:-2], buckets[-2], buckets[-1])
+        for (method, route), buckets in sorted(latency.items())
+    ])
+    writer.metric("http_requests_in_flight", "gauge", "Requests currently being served.", [({}, in_flight)])
+
+    if threadpool:
+        writer.metric("threadpool_busy_threads", "gauge", "Worker threads running sync endpoints.",
+                      [({}, threadpool["busy"])])
+        writer.metric("threadpool_max_threads", "gauge", "Worker thread limit for sync endpoints.",
+                      [({}, threadpool["limit"])])
+
+    pool = get_pool().stats()
+    writer.metric("db_pool_connections", "gauge", "Database pool connections by state.", [
+        ({"state": "in_use"}, pool["in_use"]), ({"state": "idle"}, pool["idle"]),
+    ])
+    writer.metric("db_pool_max_connections", "gauge", "Database pool size limit.", [({}, pool["max_size"])])
+    for field in ("checkouts", "created", "discarded", "timeouts", "waits"):
+        writer.metric(f"db_pool_{field}_total", "counter", f"Database pool {field} since startup.", [({}, pool[field])])
+
+    queries = query_stats.stats(top=0)
+    writer.metric("db_queries_total", "counter", "Database statements executed, by route template.", [
+        ({"route": route}, entry["queries"]) for route, entry in sorted(queries["routes"].items())
+    ])
+    writer.metric("db_query_seconds_total", "counter", "Time spent in database statements, by route template.", [
+        ({"route": route}, float(entry["duration"])) for route, entry in sorted(queries["routes"].items())
+    ])
+    writer.metric("db_duplicate_queries_total", "counter", "Statements repeated with identical parameters in one request.", [
+        ({"route": route}, entry["duplicates"]) for route, entry in sorted(queries["routes"].items())
+    ])
+    writer.metric("db_n_plus_one_requests_total", "counter", "Requests that ran one statement past the repeat threshold.", [
+        ({"route": route}, entry["n_plus_one"]) for route, entry in sorted(queries["routes"].items())
+    ])
+    writer.metric("db_slow_queries_total", "counter", "Statements slower than SLOW_QUERY_MS.", [({}, queries["slow"])])
+
+    hashes = hash_service.stats()
+    writer.metric("hash_queue_depth", "gauge", "Interactive password hashing tasks queued or running.", [({}, hashes["queue_depth"])])
+    writer.metric("hash_bulk_in_flight", "gauge", "Bulk import hashing slices in the pool.", [({}, hashes["bulk_in_flight"])])
+    writer.metric("hash_workers", "gauge", "Password hashing worker processes.", [({}, hashes["workers"])])
+    for field in ("submitted", "completed", "rejected", "failed"):
+        writer.metric(f"hash_tasks_{field}_total", "counter", f"Password hashing tasks {field}.", [({}, hashes[field])])
+    writer.histogram("hash_duration_seconds", "Password hash/verify latency including queueing.", [
+        ({}, hash_service.LATENCY_BUCKETS, hashes["latency_buckets"].values(), hashes["hashes"], hashes["latency_sum"]),
+    ])
+
+    _cache_metrics(writer, {
+        "user": auth_service.user_cache,
+        "token_version": auth_service.token_versions,
+        "compressed_body": compression.cache,
+        "service": service_cache.cache,
+        "event_bundle": bundle_service.bundles,
+    })
+    service = service_cache.cache.stats()
+    writer.metric("app_service_cache_bytes", "gauge", "Estimated memory held by the service result cache.",
+                  [({}, service["bytes"])])
+    writer.metric("app_service_cache_max_bytes", "gauge", "Memory cap of the service result cache.",
+                  [({}, service["max_bytes"])])
+
+    flights = single_flight.stats()
+    writer.metric("single_flight_in_flight", "gauge", "Coalesced reads currently executing.", [({}, flights["in_flight"])])
+    writer.metric("single_flight_executions_total", "counter", "Reads executed by a single-flight leader.", [
+        ({"function": name}, entry["executions"]) for name, entry in sorted(flights["functions"].items())
+    ])
+    writer.metric("single_flight_coalesced_total", "counter", "Reads served from a concurrent identical call.", [
+        ({"function": name}, entry["coalesced"]) for name, entry in sorted(flights["functions"].items())
+    ])
+
+    blacklist = token_blacklist.stats()
+    writer.metric("token_blacklist_entries", "gauge", "Revoked tokens held until they expire.",
+                  [({"backend": blacklist["backend"]}, blacklist["size"])])
+    writer.metric("token_blacklist_checks_total", "counter", "Blacklist lookups.", [({}, blacklist.get("checks", 0))])
+    writer.metric("token_blacklist_hits_total", "counter", "Blacklist lookups that found a revoked token.",
+                  [({}, blacklist.get("hits", 0))])
+
+    scheduler = status_scheduler.stats()
+    writer.metric("status_scheduler_sweeps_total", "counter", "Status scheduler sweeps.", [({}, scheduler["sweeps"])])
+    writer.metric("status_scheduler_failures_total", "counter", "Status scheduler sweeps that raised.",
+                  [({}, scheduler["failures"])])
+    writer.metric("status_scheduler_pending", "gauge", "Upcoming boundaries queued.", [({}, scheduler["pending"])])
+
+    stream = status_stream.stats()
+    writer.metric("status_stream_subscribers", "gauge", "Open status-change event streams.", [({}, stream["subscribers"])])
+    writer.metric("status_stream_messages_total", "counter", "Status changes published to the event streams.",
+                  [({}, stream["published"])])
+    return writer.render()
@@ -0,0 +1,97 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, Query
+
+from config.env import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+class ListParams:
+    """Keyset pagination over ``(created_at, id)``, newest first.
+
+    Services add ``conditions()`` to their WHERE clause, finish the query with
+    ``order_by()`` and pass the fetched rows through ``page()``.
+    """
+
+    def __init__(
+        self,
+        limit: int = PAGE_SIZE_DEFAULT,
+        cursor: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.after = decode_cursor(cursor) if cursor else None
+        self.created_from = created_from
+        self.created_to = created_to
+
+    def key(self) -> tuple:
+        """Hashable identity of the requested page, for caching."""
+        return (self.limit, self.cursor, self.created_from, self.created_to)
+
+    def conditions(self, alias: Optional[str] = None) -> tuple:
+        col = f"{alias}." if alias else ""
+        conditions, values = [], []
+        if self.created_from is not None:
+            conditions.append(f"{col}created_at >= %s")
+            values.append(self.created_from)
+        if self.created_to is not None:
+            conditions.append(f"{col}created_at <= %s")
+            values.append(self.created_to)
+        if self.after is not None:
+            created_at, row_id = self.after
+            conditions.append(f"({col}created_at < %s OR ({col}created_at = %s AND {col}id < %s))")
+            values.extend((created_at, created_at, row_id))
+        return conditions, values
+
+    def order_by(self, alias: Optional[str] = None, limit: bool = True) -> tuple:
+        col = f"{alias}." if alias else ""
+        clause = f"ORDER BY {col}created_at DESC, {col}id DESC"
+        if not limit:
+            return clause, []
+        # One extra row tells us whether another page exists.
+        return clause + " LIMIT %s", [self.limit + 1]
+
+    def page(self, rows: list, id_key: str = "id", created_key: str = "created_at") -> tuple:
+        """Trim ``rows`` to ``limit`` items and return ``(rows, next_cursor)``.
+
+        Rows sharing an id (one item joined to several relations) count once.
+        """
+        seen = []
+        for index, row in enumerate(rows):
+            if not seen or seen[-1] != row[id_key]:
+                if len(seen) == self.limit:
+                    last = rows[index - 1]
+                    return rows[:index], encode_cursor(last[created_key], last[id_key])
+                seen.append(row[id_key])
+        return rows, None
+
+
+def where(conditions: list) -> str:
+    return f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+
+def list_params(
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    created_from: Optional[datetime] = Query(None),
+    created_to: Optional[datetime] = Query(None),
+) -> ListParams:
+    return ListParams(limit, cursor, created_from, created_to)
@@ -0,0 +1,232 @@
+import contextvars
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+
+from config.env import (
+    QUERY_STATS_ENABLED,
+    QUERY_STATS_HEADERS,
+    QUERY_STATS_MAX_STATEMENTS,
+    QUERY_REPEAT_THRESHOLD,
+    SLOW_QUERY_MS,
+)
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND = "(background)"
+OTHER = "(other)"
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s|\?")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize(sql: str) -> str:
+    """SQL with literals and placeholders replaced by ``?`` and ``IN`` lists collapsed."""
+    sql = _LITERAL.sub("?", sql)
+    sql = _LIST.sub("(?, ...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+class RequestQueries:
+    """Queries executed while serving one request."""
+
+    __slots__ = ("count", "duration", "statements", "identical", "slow")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+        self.identical = Counter()
+        self.slow = []
+
+    def add(self, sql: str, params, elapsed: float):
+        statement = normalize(sql)
+        self.count += 1
+        self.duration += elapsed
+        self.statements[statement] += 1
+        try:
+            self.identical[(sql, tuple(params or ()))] += 1
+        except TypeError:
+            self.identical[(sql, repr(params))] += 1
+        if elapsed * 1000 >= SLOW_QUERY_MS:
+            self.slow.append((statement, elapsed))
+
+    @property
+    def duplicates(self) -> int:
+        """Executions that repeated an earlier statement with the same parameters."""
+        return sum(n - 1 for n in self.identical.values() if n > 1)
+
+    def repeated(self, threshold: int = QUERY_REPEAT_THRESHOLD) -> dict:
+        """Statements run ``threshold`` times or more, the usual shape of an N+1."""
+        return {statement: n for statement, n in self.statements.items() if n >= threshold}
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.2f};desc="{self.count} queries, {self.duplicates} duplicates"'
+
+
+_current = contextvars.ContextVar("request_queries", default=None)
+_lock = threading.Lock()
+_routes = {}
+_statements = {}
+_totals = {"queries": 0, "duration": 0.0, "slow": 0, "n_plus_one": 0}
+
+
+def _record_statement(statement: str, elapsed: float, slow: bool):
+    with _lock:
+        _totals["queries"] += 1
+        _totals["duration"] += elapsed
+        if slow:
+            _totals["slow"] += 1
+        entry = _statements.get(statement)
+        if entry is None:
+            if len(_statements) >= QUERY_STATS_MAX_STATEMENTS:
+                statement = OTHER
+            entry = _statements.setdefault(statement, {"count": 0, "duration": 0.0, "max": 0.0, "slow": 0})
+        entry["count"] += 1
+        entry["duration"] += elapsed
+        entry["max"] = max(entry["max"], elapsed)
+        if slow:
+            entry["slow"] += 1
+
+
+def record(sql: str, params, elapsed: float):
+    statement = normalize(sql)
+    slow = elapsed * 1000 >= SLOW_QUERY_MS
+    _record_statement(statement, elapsed, slow)
+    queries = _current.get()
+    if queries is not None:
+        queries.add(sql, params, elapsed)
+    elif slow:
+        logger.warning("slow query (%.1f ms) in %s: %s", elapsed * 1000, BACKGROUND, statement)
+
+
+def _finish_request(route: str, queries: RequestQueries):
+    repeated = queries.repeated()
+    with _lock:
+        entry = _routes.setdefault(route, {
+            "requests": 0, "queries": 0, "duration": 0.0, "max_queries": 0, "duplicates": 0, "n_plus_one": 0,
+        })
+        entry["requests"] += 1
+        entry["queries"] += queries.count
+        entry["duration"] += queries.duration
+        entry["max_queries"] = max(entry["max_queries"], queries.count)
+        entry["duplicates"] += queries.duplicates
+        if repeated:
+            entry["n_plus_one"] += 1
+            _totals["n_plus_one"] += 1
+    for statement, elapsed in queries.slow:
+        logger.warning("slow query (%.1f ms) in %s: %s", elapsed * 1000, route, statement)
+    for statement, n in repeated.items():
+        logger.warning("possible N+1 in %s: %d executions of %s", route, n, statement)
+
+
+class InstrumentedCursor:
+    """Cursor proxy timing every ``execute``/``executemany`` call."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, sql, params=None, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            if params is None:
+                result = self._cursor.execute(sql, *args, **kwargs)
+            else:
+                result = self._cursor.execute(sql, params, *args, **kwargs)
+        finally:
+            record(sql, params, time.perf_counter() - started)
+        return self if result is self._cursor else result
+
+    def executemany(self, sql, seq_of_params, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = self._cursor.executemany(sql, seq_of_params, *args, **kwargs)
+        finally:
+            # Batches are never "identical" repeats of each other.
+            record(sql, (id(seq_of_params),), time.perf_counter() - started)
+        return self if result is self._cursor else result
+
+
+def instrument(cursor):
+    return InstrumentedCursor(cursor) if QUERY_STATS_ENABLED else cursor
+
+
+def current() -> RequestQueries:
+    return _current.get()
+
+
+def route_template(scope) -> str:
+    """Path template of the matched route, e.g. ``/api/v1/events/{event_uuid}``.
+
+    Routes of included routers may only know their own part of the path; the
+    prefix is then taken from the request path, one segment per segment.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "(unmatched)"
+    segments = scope["path"].split("/")
+    own = template.split("/")
+    if len(own) > len(segments):
+        return template
+    return "/".join(segments[:len(segments) - len(own) + 1]) + template
+
+
+class QueryStatsMiddleware:
+    """Collect per-request query counts and DB time, aggregated by route template.
+
+    With ``QUERY_STATS_HEADERS`` on (development), each response carries a
+    ``Server-Timing: db;dur=...`` header with the request's numbers.
+    """
+
+    def __init__(self, app, headers: bool = QUERY_STATS_HEADERS):
+        self.app = app
+        self.headers = headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not QUERY_STATS_ENABLED:
+            return await self.app(scope, receive, send)
+
+        queries = RequestQueries()
+        token = _current.set(queries)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and self.headers:
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", queries.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            _finish_request(route_template(scope), queries)
+
+
+def stats(top: int = 20) -> dict:
+    with _lock:
+        statements = sorted(_statements.items(), key=lambda item: item[1]["duration"], reverse=True)
+        return {
+            **_totals,
+            "routes": {route: dict(entry) for route, entry in _routes.items()},
+            "statements": [{"sql": statement, **entry} for statement, entry in statements[:top]],
+        }
+
+
+def reset():
+    with _lock:
+        _routes.clear()
+        _statements.clear()
+        _totals.update(queries=0, duration=0.0, slow=0, n_plus_one=0)
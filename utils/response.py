@@ -1,3 +1,15 @@
+import json
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
 def success_response(message: str, data=None):
     return {
         "success": True,
@@ -11,3 +23,34 @@ def error_response(message: str, status_code: int = 400):
         "message": message,
         "status_code": status_code
     }
+
+def paginated_response(message: str, data, next_cursor=None):
+    return {
+        **success_response(message, data),
+        "next_cursor": next_cursor
+    }
+
+
+def _default(value):
+    # Types orjson does not know natively; anything else goes through FastAPI's encoder.
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    return jsonable_encoder(value)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when it is installed.
+
+    Datetimes, UUIDs and dataclasses are serialized natively, so endpoints returning
+    large row lists can hand their dict straight to this class and skip
+    ``jsonable_encoder``. Without orjson it falls back to the stdlib encoder.
+    """
+
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(
+            content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
@@ -0,0 +1,196 @@
+import functools
+import inspect
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from config.env import SERVICE_CACHE_ENABLED, SERVICE_CACHE_MAX_BYTES, SERVICE_CACHE_SIZE, SERVICE_CACHE_TTL
+from utils import data_version, single_flight
+
+_MISSING = object()
+
+
+def _sizeof(value) -> int:
+    """Rough deep size of a service result: dicts, lists and scalars."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_sizeof(k) + _sizeof(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_sizeof(item) for item in value)
+    return size
+
+
+class TaggedCache:
+    """Thread-safe LRU cache with a TTL, a byte budget and tag-based invalidation.
+
+    Each entry carries tags naming what it was read from, ``event:<uuid>`` for
+    one row and ``event:*`` for a listing of the table. ``invalidate()`` drops
+    every entry holding any of the given tags. Entries are evicted oldest-used
+    first once either ``maxsize`` entries or ``max_bytes`` is exceeded.
+
+    ``generation`` moves on every invalidation; ``set()`` with the generation
+    read before the lookup started refuses results that may predate a write.
+    """
+
+    def __init__(self, maxsize: int = SERVICE_CACHE_SIZE, ttl: float = SERVICE_CACHE_TTL,
+                 max_bytes: int = SERVICE_CACHE_MAX_BYTES):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.generation = 0
+        self._data = OrderedDict()  # key -> (expires_at, value, tags, size)
+        self._tags = {}             # tag -> set of keys
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _remove(self, key):
+        _, _, tags, size = self._data.pop(key)
+        self._bytes -= size
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self.misses += 1
+                return default
+            if item[0] <= now:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key, value, tags=(), generation: int = None):
+        if self.maxsize <= 0:
+            return
+        size = _sizeof(value)
+        if size > self.max_bytes:
+            return
+        tags = frozenset(tags)
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (expires_at, value, tags, size)
+            self._bytes += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._data) > self.maxsize or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+
+    def invalidate(self, *tags):
+        with self._lock:
+            self.generation += 1
+            stale = set()
+            for tag in tags:
+                stale.update(self._tags.get(tag, ()))
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self.invalidations += len(self._data)
+            self._data.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+# Results of the read services. Each worker process holds its own copy and only
+# sees its own writes, so the TTL bounds how stale another worker's entries get.
+cache = TaggedCache()
+
+
+def cached(key, tags, tables):
+    """Cache a service function's result.
+
+    ``key(*args, **kwargs)`` returns the hashable part of the call that decides
+    the result (never the ``db`` handle), or None to bypass the cache.
+    ``tags(result, *args, **kwargs)`` returns the entry's tags. Exceptions are
+    not cached. Cached results are shared between callers and must not be
+    modified.
+
+    ``tables`` are the ``data_version`` tables the result is read from, the same
+    ones its endpoint's ETag covers. Their versions, read through the call's
+    ``db``, are part of the key: a write made by another worker changes them,
+    so this process never serves a result older than the ETag it is sent with.
+    Calls made without a ``db`` bypass the cache.
+    """
+
+    def decorate(fn):
+        name = fn.__qualname__
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            call_key = key(*args, **kwargs) if SERVICE_CACHE_ENABLED else None
+            db = signature.bind_partial(*args, **kwargs).arguments.get("db") if call_key is not None else None
+            if db is None:
+                return fn(*args, **kwargs)
+            versions = data_version.read(db, tables)
+            call_key = (fn.__module__, name, call_key, tuple(versions.get(table, 0) for table in tables))
+            result = cache.get(call_key, _MISSING)
+            if result is not _MISSING:
+                return result
+            generation = cache.generation
+            joins = single_flight.flights.joins()
+            result = fn(*args, **kwargs)
+            # A coalesced follower's result comes from a query that may predate
+            # the generation (and versions) read above; only the leader stores it.
+            if single_flight.flights.joins() == joins:
+                cache.set(call_key, result, tags(result, *args, **kwargs), generation)
+            return result
+
+        wrapper.uncached = fn
+        return wrapper
+
+    return decorate
+
+
+def invalidate(db, *tags):
+    """Drop the entries tagged with any of ``tags`` after a write through ``db``.
+
+    They are dropped right away and, when ``db`` is a request's unit of work,
+    once more after it commits, so a read racing the commit cannot leave the
+    old rows cached.
+    """
+    cache.invalidate(*tags)
+    on_commit = getattr(db, "on_commit", None)
+    if on_commit is not None:
+        on_commit(lambda: cache.invalidate(*tags))
@@ -0,0 +1,99 @@
+import functools
+import threading
+
+from config.env import SINGLE_FLIGHT_ENABLED
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run at most one call per key at a time and hand its outcome to every caller.
+
+    The first caller for a key (the leader) executes the function; callers
+    arriving while it runs block until it finishes and receive the same
+    result, or the same exception. Nothing is kept once the call returns.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {}  # name -> {"executions": n, "coalesced": n}
+
+    def do(self, name: str, key, fn):
+        with self._lock:
+            stats = self._stats.setdefault(name, {"executions": 0, "coalesced": 0})
+            call = self._calls.get((name, key))
+            leader = call is None
+            if leader:
+                call = self._calls[(name, key)] = _Call()
+                stats["executions"] += 1
+            else:
+                stats["coalesced"] += 1
+
+        if not leader:
+            self._local.joins = self.joins() + 1
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[(name, key)]
+            call.done.set()
+        return call.result
+
+    def joins(self) -> int:
+        """How many results the calling thread has taken from calls other callers
+        started, possibly before a write this thread already saw."""
+        return getattr(self._local, "joins", 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "functions": {name: dict(entry) for name, entry in self._stats.items()},
+            }
+
+
+flights = SingleFlight()
+
+
+def coalesce(key):
+    """Share one execution between concurrent identical calls of a service function.
+
+    ``key(*args, **kwargs)`` returns the hashable part of the call that decides
+    the result (never the ``db`` handle). Followers reuse the leader's result
+    instead of running the query on their own connection, so only read-only
+    functions may be coalesced, and their results must not be modified.
+    """
+
+    def decorate(fn):
+        name = fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not SINGLE_FLIGHT_ENABLED:
+                return fn(*args, **kwargs)
+            return flights.do(name, key(*args, **kwargs), lambda: fn(*args, **kwargs))
+
+        return wrapper
+
+    return decorate
+
+
+def stats() -> dict:
+    return flights.stats()